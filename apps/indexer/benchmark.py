@@ -0,0 +1,175 @@
+"""
+Benchmark Qdrant collection profiles
+
+For each profile: build a scratch collection from the same vectors, then
+report estimated RAM, build time, query latency (p50/p95) and recall@k
+against exact brute-force search.
+
+    python benchmark.py --points 50000 --queries 200 --profiles exact,balanced,compact
+    python benchmark.py --from-collection repos --points 20000
+    python benchmark.py --local        # embedded LocalVectorStore instead of Qdrant
+"""
+import os
+import time
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, CollectionStatus
+
+from collection_profiles import PROFILES, CollectionProfile, create_collection
+from embeddings import EMBEDDING_DIM
+from local_store import LocalVectorStore
+
+load_dotenv()
+
+
+UPSERT_BATCH = 512
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def synthetic_vectors(points: int, dim: int, clusters: int = 64, seed: int = 7) -> np.ndarray:
+    """Clustered unit vectors; uniform noise would make every profile look perfect or useless"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, points)
+    noise = rng.standard_normal((points, dim)).astype(np.float32) * 0.6
+    return normalize(centers[labels] + noise).astype(np.float32)
+
+
+def sample_collection(client: QdrantClient, collection: str, points: int) -> np.ndarray:
+    """Real vectors scrolled out of an existing collection"""
+    vectors, offset = [], None
+    while len(vectors) < points:
+        records, offset = client.scroll(
+            collection_name=collection,
+            limit=min(1000, points - len(vectors)),
+            offset=offset,
+            with_vectors=True,
+            with_payload=False,
+        )
+        vectors.extend(record.vector for record in records)
+        if offset is None:
+            break
+    return normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force cosine top-k ids (vectors are unit length)"""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def wait_for_index(client: QdrantClient, collection: str, timeout: float = 1800.0):
+    """Block until Qdrant has finished optimizing (HNSW + quantization built)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(collection).status == CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+    raise TimeoutError(f"Collection '{collection}' still optimizing after {timeout:.0f}s")
+
+
+def bench_profile(
+    client: QdrantClient,
+    profile: CollectionProfile,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    keep: bool = False
+) -> Dict:
+    name = f"bench_{profile.name}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    started = time.monotonic()
+    create_collection(client, name, corpus.shape[1], profile)
+    for start in range(0, len(corpus), UPSERT_BATCH):
+        client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=i, vector=corpus[i].tolist(), payload={"source": "benchmark"})
+                for i in range(start, min(start + UPSERT_BATCH, len(corpus)))
+            ],
+            wait=True,
+        )
+    wait_for_index(client, name)
+    build_seconds = time.monotonic() - started
+
+    params = profile.search_params()
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        result = client.query_points(
+            collection_name=name, query=query.tolist(), limit=k, search_params=params, with_payload=False
+        ).points
+        latencies.append((time.perf_counter() - t0) * 1000)
+        hits += len({point.id for point in result} & set(expected.tolist()))
+
+    if not keep:
+        client.delete_collection(name)
+
+    return {
+        "profile": profile.name,
+        "ram_mb": profile.bytes_per_vector(corpus.shape[1]) * len(corpus) / 1e6,
+        "build_s": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": hits / (len(queries) * k),
+    }
+
+
+def print_report(rows: List[Dict], points: int, dim: int, k: int):
+    print(f"\n{points} points x {dim} dims, recall@{k} vs exact brute force (RAM is estimated)\n")
+    print(f"{'profile':<10} {'RAM MB':>9} {'build s':>9} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7}")
+    for row in rows:
+        print(
+            f"{row['profile']:<10} {row['ram_mb']:>9.1f} {row['build_s']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['recall']:>7.3f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--from-collection", help="Sample real vectors from this collection")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench_* collections")
+    parser.add_argument("--local", action="store_true", help="Benchmark the embedded LocalVectorStore")
+    args = parser.parse_args(argv)
+
+    if args.local:
+        client = LocalVectorStore()
+    else:
+        client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
+
+    if args.from_collection:
+        vectors = sample_collection(client, args.from_collection, args.points + args.queries)
+    else:
+        vectors = synthetic_vectors(args.points + args.queries, args.dim)
+    corpus, queries = vectors[:-args.queries], vectors[-args.queries:]
+    truth = exact_top_k(corpus, queries, args.k)
+
+    rows = []
+    for name in args.profiles.split(","):
+        profile = PROFILES[name.strip()]
+        print(f"Benchmarking '{profile.name}'...")
+        rows.append(bench_profile(client, profile, corpus, queries, truth, args.k, keep=args.keep))
+
+    print_report(rows, len(corpus), corpus.shape[1], args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Change-driven indexing
+
+Consumes change events from the per-source Redis streams the API's
+webhooks feed. Only sources the indexer lists in SOURCES are read
+(repos so far; the API only publishes those). Events are coalesced per
+document and debounced, so a burst of pushes to one branch becomes a
+single incremental index run seconds after the last one. Entries are
+acked only once indexed; anything left unacked by a crash is
+redelivered on restart, and the nightly run reconciles the rest.
+"""
+import os
+import time
+import socket
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from repo_index import configured_repos
+
+
+# Written by src/tools/index_events.py in the API
+STREAM_PREFIX = "indexer:changes"
+GROUP = "indexer"
+
+# Retry backoff for a document whose index run failed
+MAX_RETRY_DELAY = 300.0
+
+
+def stream_for(source: str) -> str:
+    return f"{STREAM_PREFIX}:{source}"
+
+
+@dataclass
+class PendingChange:
+    """Coalesced events for one document, waiting out the debounce"""
+    source: str
+    key: str
+    first_seen: float
+    last_seen: float
+    entry_ids: List[str] = field(default_factory=list)
+    events: int = 0
+    attempts: int = 0
+    not_before: float = 0.0
+
+
+@dataclass
+class FeedStats:
+    events: int = 0
+    runs: int = 0
+    failures: int = 0
+    lag_total: float = 0.0
+    last_lag: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "runs": self.runs,
+            "coalesced": self.events - self.runs,
+            "failures": self.failures,
+            "avg_lag_s": round(self.lag_total / self.runs, 2) if self.runs else 0.0,
+            "last_lag_s": round(self.last_lag, 2),
+        }
+
+
+class ChangeFeed:
+    """
+    Re-indexes documents seconds after they change.
+
+    Args:
+        indexer: DraftedIndexer doing the work
+        debounce: Quiet seconds after a document's last event before indexing it
+        max_delay: Index a document at the latest this long after its first event
+        lease: Held for each dispatched batch; while someone else holds
+            it (the nightly run), events keep coalescing but nothing is
+            dispatched, so the two never index the same state at once
+    """
+
+    def __init__(
+        self,
+        indexer,
+        redis_url: Optional[str] = None,
+        debounce: Optional[float] = None,
+        max_delay: float = 60.0,
+        lease: Optional[threading.Lock] = None
+    ):
+        self.indexer = indexer
+        self.redis = redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.debounce = debounce if debounce is not None else float(os.getenv("INDEXER_DEBOUNCE_SECONDS", "5"))
+        self.max_delay = max_delay
+        self.lease = lease or threading.Lock()
+        self.consumer = os.getenv("INDEXER_CONSUMER", socket.gethostname())
+        self.sources = tuple(indexer.SOURCES)
+        self.streams = [stream_for(source) for source in self.sources]
+        self.stats = FeedStats()
+        self._pending: Dict[Tuple[str, str], PendingChange] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _setup(self):
+        for stream in self.streams:
+            try:
+                self.redis.xgroup_create(stream, GROUP, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            self._claim_stale(stream)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._setup()
+                break
+            except redis.RedisError as e:
+                print(f"Change feed setup failed: {e}")
+                self._stop.wait(5.0)
+
+        # Entries delivered to this consumer before a restart, never acked
+        cursors = {stream: "0-0" for stream in self.streams}
+        while not self._stop.is_set():
+            try:
+                block = int(max(0.05, min(1.0, self._next_due() - time.monotonic())) * 1000)
+                response = self.redis.xreadgroup(GROUP, self.consumer, cursors, count=500, block=block)
+                read = {(s.decode() if isinstance(s, bytes) else s): e for s, e in response or []}
+                for stream in self.streams:
+                    entries = read.get(stream, [])
+                    if cursors[stream] != ">":
+                        cursors[stream] = entries[-1][0] if entries else ">"
+                    for entry_id, fields in entries:
+                        self._add(entry_id, fields)
+            except redis.RedisError as e:
+                print(f"Change feed read failed: {e}")
+                self._stop.wait(5.0)
+
+            self._flush()
+
+    def _claim_stale(self, stream: str, min_idle_ms: int = 60000):
+        """Take over entries a previous consumer (old container) read but never acked"""
+        start = "0-0"
+        while True:
+            response = self.redis.xautoclaim(
+                stream, GROUP, self.consumer, min_idle_time=min_idle_ms, start_id=start, count=500
+            )
+            start = response[0]
+            if start in (b"0-0", "0-0"):
+                return
+
+    # ------------------------------------------------------------------
+    # Coalescing
+    # ------------------------------------------------------------------
+
+    def _add(self, entry_id: Any, fields: Dict[Any, Any]):
+        decode = lambda v: v.decode() if isinstance(v, bytes) else v
+        fields = {decode(k): decode(v) for k, v in fields.items()}
+        self._note(fields.get("source", ""), fields.get("key", ""), decode(entry_id))
+
+    def _note(self, source: str, key: str, entry_id: Optional[str] = None):
+        now = time.monotonic()
+        change = self._pending.get((source, key))
+        if change is None:
+            change = self._pending[(source, key)] = PendingChange(source, key, now, now)
+        change.last_seen = now
+        change.events += 1
+        if entry_id:
+            change.entry_ids.append(entry_id)
+        self.stats.events += 1
+
+    def _due_at(self, change: PendingChange) -> float:
+        return max(min(change.last_seen + self.debounce, change.first_seen + self.max_delay), change.not_before)
+
+    def _next_due(self) -> float:
+        return min((self._due_at(c) for c in self._pending.values()), default=time.monotonic() + 1.0)
+
+    def _flush(self):
+        # Held for the whole batch; busy while the nightly run is active
+        if not self._pending or not self.lease.acquire(blocking=False):
+            return
+        try:
+            self._dispatch()
+        finally:
+            self.lease.release()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        due = [c for c in self._pending.values() if self._due_at(c) <= now]
+        by_source: Dict[str, List[PendingChange]] = {}
+        for change in due:
+            by_source.setdefault(change.source, []).append(change)
+
+        for source, changes in by_source.items():
+            handler = {"repos": self._index_repos}.get(source)
+            if handler is None or source not in self.sources:
+                # Not indexed, so not counted or acked
+                print(f"Ignoring change for unhandled source '{source}'")
+                for change in changes:
+                    self._pending.pop((change.source, change.key), None)
+                continue
+            try:
+                handler([c.key for c in changes])
+                self._done(changes)
+            except Exception as e:
+                print(f"Change-driven {source} index failed: {e}")
+                self.stats.failures += 1
+                for change in changes:
+                    change.attempts += 1
+                    change.not_before = time.monotonic() + min(
+                        MAX_RETRY_DELAY, self.debounce * 2 ** change.attempts
+                    )
+
+    def _done(self, changes: List[PendingChange]):
+        now = time.monotonic()
+        entry_ids: Dict[str, List[str]] = {}
+        for change in changes:
+            self._pending.pop((change.source, change.key), None)
+            entry_ids.setdefault(stream_for(change.source), []).extend(change.entry_ids)
+            self.stats.runs += 1
+            self.stats.last_lag = now - change.first_seen
+            self.stats.lag_total += self.stats.last_lag
+        for stream, ids in entry_ids.items():
+            if not ids:
+                continue
+            try:
+                self.redis.xack(stream, GROUP, *ids)
+            except redis.RedisError as e:
+                # Redelivered after a restart; re-indexing is idempotent
+                print(f"Failed to ack change entries: {e}")
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    def _index_repos(self, keys: List[str]):
+        configured = {f"{repo}@{branch}" for repo, branch in configured_repos()}
+        for key in keys:
+            if key not in configured:
+                continue
+            repo, branch = key.rsplit("@", 1)
+            stats = self.indexer.repo_indexer.index(repo, branch)
+            print(stats.summary())
@@ -0,0 +1,126 @@
+"""
+Qdrant collection profiles
+
+A profile fixes how a collection trades memory for latency and recall:
+quantization, what lives on disk, and HNSW graph parameters. Every
+collection also gets keyword payload indexes for the fields we filter
+on.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, HnswConfigDiff, PayloadSchemaType, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    ProductQuantization, ProductQuantizationConfig, CompressionRatio, VectorParamsDiff, Disabled
+)
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    quantization: str = "none"          # none | scalar | product
+    pq_compression: str = "x16"         # product quantization ratio
+    on_disk_vectors: bool = False       # original float32 vectors mmapped from disk
+    on_disk_payload: bool = True
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: int = 128
+    oversampling: float = 2.0           # candidates re-scored with full vectors
+
+    def bytes_per_vector(self, dim: int) -> float:
+        """Approximate RAM per point for vectors plus the HNSW graph"""
+        if self.quantization == "scalar":
+            quantized = dim
+        elif self.quantization == "product":
+            quantized = dim * 4 / int(self.pq_compression.lstrip("x"))
+        else:
+            quantized = 0
+        original = 0 if self.on_disk_vectors else dim * 4
+        # Layer-0 links dominate the graph: 2*m neighbour ids of 4 bytes
+        return quantized + original + self.hnsw_m * 2 * 4
+
+    def vectors_config(self, dim: int) -> VectorParams:
+        return VectorParams(size=dim, distance=Distance.COSINE, on_disk=self.on_disk_vectors)
+
+    def hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8, quantile=0.99, always_ram=True
+            ))
+        if self.quantization == "product":
+            return ProductQuantization(product=ProductQuantizationConfig(
+                compression=CompressionRatio(self.pq_compression), always_ram=True
+            ))
+        return None
+
+    def search_params(self) -> SearchParams:
+        if self.quantization == "none":
+            return SearchParams(hnsw_ef=self.search_ef)
+        return SearchParams(
+            hnsw_ef=self.search_ef,
+            quantization=QuantizationSearchParams(rescore=True, oversampling=self.oversampling),
+        )
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    # Full float32 vectors in RAM; the recall baseline
+    "exact": CollectionProfile("exact", hnsw_m=16, hnsw_ef_construct=100),
+    # int8 copies in RAM, originals on disk for rescoring (~4x less RAM)
+    "balanced": CollectionProfile("balanced", quantization="scalar", on_disk_vectors=True),
+    # Product-quantized codes in RAM (~16x+ less RAM); lowest footprint, lower recall
+    "compact": CollectionProfile(
+        "compact", quantization="product", on_disk_vectors=True, hnsw_m=12, oversampling=3.0
+    ),
+    # int8 in RAM with a denser graph for the lowest latency
+    "fast": CollectionProfile("fast", quantization="scalar", hnsw_m=32, hnsw_ef_construct=200, search_ef=96),
+}
+
+# Keyword fields every collection filters on
+PAYLOAD_INDEXES = ("repo", "path", "source")
+
+COLLECTIONS = ("repos", "docs", "tickets", "conversations")
+
+
+def get_profile(name: Optional[str] = None) -> CollectionProfile:
+    name = name or os.getenv("INDEXER_COLLECTION_PROFILE", "balanced")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}' (expected one of {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+def create_collection(client: QdrantClient, name: str, dim: int, profile: CollectionProfile):
+    client.create_collection(
+        collection_name=name,
+        vectors_config=profile.vectors_config(dim),
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config(),
+        on_disk_payload=profile.on_disk_payload,
+    )
+    ensure_payload_indexes(client, name)
+
+
+def ensure_payload_indexes(client: QdrantClient, name: str):
+    """Idempotent: Qdrant accepts re-creating an existing index"""
+    for field in PAYLOAD_INDEXES:
+        client.create_payload_index(
+            collection_name=name,
+            field_name=field,
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
+
+def apply_profile(client: QdrantClient, name: str, profile: CollectionProfile):
+    """Move an existing collection onto `profile`; Qdrant rebuilds in the background"""
+    client.update_collection(
+        collection_name=name,
+        vectors_config={"": VectorParamsDiff(on_disk=profile.on_disk_vectors)},
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config() or Disabled.DISABLED,
+    )
+    ensure_payload_indexes(client, name)
@@ -0,0 +1,228 @@
+"""
+Content-addressed embedding cache
+
+Vectors live in one memory-mapped float32 matrix (one row per slot); a
+SQLite index maps (model, normalized chunk hash) to a slot and tracks
+last use for eviction. Shared by every indexer source, so moved files,
+vendored docs and copied pages are embedded once.
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "drafted-embedding-cache")
+
+# Rows added each time the matrix file has to grow
+GROW_ROWS = 4096
+
+# Fraction of entries dropped at once when the cache is full
+EVICT_FRACTION = 0.05
+
+
+def normalized_hash(text: str) -> str:
+    """Hash that ignores whitespace-only differences"""
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Memory-mapped vector store keyed by (model, content hash).
+
+    Slots are allocated inside SQLite transactions, so several indexer
+    processes can share one cache directory.
+    """
+
+    def __init__(self, dim: int, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.dim = dim
+        self.path = path or os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000"))
+        os.makedirs(self.path, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(self.path, f"vectors-{dim}.f32")
+        self._matrix: Optional[np.memmap] = None
+        self._db = sqlite3.connect(
+            os.path.join(self.path, f"index-{dim}.sqlite"), check_same_thread=False, timeout=30
+        )
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                slot INTEGER NOT NULL UNIQUE,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, hash)
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+        """)
+        if not os.path.exists(self._vectors_path):
+            open(self._vectors_path, "wb").close()
+
+    # ------------------------------------------------------------------
+    # Matrix file
+    # ------------------------------------------------------------------
+
+    def _rows_on_disk(self) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * self.dim)
+
+    def _matrix_for(self, slot: int) -> np.memmap:
+        """The mapped matrix, grown or remapped so `slot` is addressable"""
+        if self._matrix is None or slot >= self._matrix.shape[0]:
+            rows = self._rows_on_disk()
+            if slot >= rows:
+                rows = (slot // GROW_ROWS + 1) * GROW_ROWS
+                with open(self._vectors_path, "r+b") as f:
+                    f.truncate(rows * 4 * self.dim)
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+        return self._matrix
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors in input order (None for misses)"""
+        hashes = [normalized_hash(text) for text in texts]
+        with self._lock:
+            # Slot lookup and vector read share one write transaction: WAL
+            # readers don't block writers, so a plain read could see a slot
+            # another process evicts and refills before the row is copied
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                slots = {}
+                unique = list(dict.fromkeys(hashes))
+                for start in range(0, len(unique), 500):
+                    part = unique[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT hash, slot FROM entries WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                        [model, *part]
+                    ).fetchall()
+                    slots.update(rows)
+
+                vectors = {digest: np.array(self._matrix_for(slot)[slot]) for digest, slot in slots.items()}
+
+                if slots:
+                    now = time.time()
+                    self._db.executemany(
+                        "UPDATE entries SET last_used = ? WHERE model = ? AND hash = ?",
+                        [(now, model, digest) for digest in slots]
+                    )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+            result = [vectors.get(digest) for digest in hashes]
+            found = sum(vector is not None for vector in result)
+            self.hits += found
+            self.misses += len(result) - found
+            return result
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store vectors for texts not already cached"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for text, vector in zip(texts, vectors):
+                    digest = normalized_hash(text)
+                    if self._db.execute(
+                        "SELECT 1 FROM entries WHERE model = ? AND hash = ?", (model, digest)
+                    ).fetchone():
+                        continue
+                    slot = self._allocate_slot()
+                    self._matrix_for(slot)[slot] = np.asarray(vector, dtype=np.float32)
+                    self._db.execute(
+                        "INSERT INTO entries (model, hash, slot, last_used) VALUES (?, ?, ?, ?)",
+                        (model, digest, slot, now)
+                    )
+                if self._matrix is not None:
+                    self._matrix.flush()
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def _allocate_slot(self) -> int:
+        # Runs inside put_many's transaction
+        row = self._db.execute("SELECT slot FROM free_slots LIMIT 1").fetchone()
+        if row is None:
+            count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count >= self.max_entries:
+                self._evict(max(1, int(self.max_entries * EVICT_FRACTION)))
+                row = self._db.execute("SELECT slot FROM free_slots LIMIT 1").fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM free_slots WHERE slot = ?", (row[0],))
+            return row[0]
+
+        next_row = self._db.execute("SELECT value FROM meta WHERE key = 'next_slot'").fetchone()
+        slot = next_row[0] if next_row else 0
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_slot', ?)", (slot + 1,))
+        return slot
+
+    def _evict(self, count: int):
+        victims = self._db.execute(
+            "SELECT model, hash, slot FROM entries ORDER BY last_used ASC LIMIT ?", (count,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM entries WHERE model = ? AND hash = ?", [(m, h) for m, h, _ in victims])
+        self._db.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(s,) for _, _, s in victims])
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": os.path.getsize(self._vectors_path),
+        }
+
+
+class CachedEmbedder:
+    """Embedding backend wrapper that only sends cache misses upstream"""
+
+    def __init__(self, backend, cache: EmbeddingCache):
+        self.backend = backend
+        self.cache = cache
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    @property
+    def dim(self) -> int:
+        return self.backend.dim
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(self.name, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        # Identical texts within a batch are embedded once
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        if unique:
+            fresh = dict(zip(unique, self.backend.embed(unique)))
+            self.cache.put_many(self.name, unique, [fresh[text] for text in unique])
+            for i in missing:
+                cached[i] = fresh[texts[i]]
+
+        return [vector.tolist() if isinstance(vector, np.ndarray) else list(vector) for vector in cached]
@@ -0,0 +1,76 @@
+"""
+Embedding backends for the indexer
+"""
+import os
+import re
+import math
+import hashlib
+from typing import List
+
+
+# Vector size of the Qdrant collections (text-embedding-3-small)
+EMBEDDING_DIM = 1536
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API"""
+
+    def __init__(self, model: str = None, dim: int = EMBEDDING_DIM):
+        self.model = model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        self.dim = dim
+        # Imported lazily so the hash backend works without the SDK or a key
+        from openai import OpenAI
+        self.client = OpenAI()
+
+    @property
+    def name(self) -> str:
+        return f"openai:{self.model}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, preserving order"""
+        if not texts:
+            return []
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class HashEmbedder:
+    """
+    Deterministic local stand-in: signed feature hashing of words and
+    word bigrams, L2-normalized.
+
+    No network and no model, so tests, CI and local runs get stable
+    vectors where lexical overlap still means nearby.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    @property
+    def name(self) -> str:
+        return f"hash:{self.dim}"
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        words = re.findall(r"\w+", text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+
+def get_embedder():
+    """
+    Backend from EMBEDDING_BACKEND ("openai" or "hash"); defaults to
+    OpenAI when an API key is configured
+    """
+    backend = os.getenv("EMBEDDING_BACKEND") or ("openai" if os.getenv("OPENAI_API_KEY") else "hash")
+    if backend == "hash":
+        return HashEmbedder()
+    if backend == "openai":
+        return OpenAIEmbedder()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'")
@@ -0,0 +1,595 @@
+"""
+Embedded vector store with a Qdrant-compatible interface
+
+Implements the subset of QdrantClient the indexer uses, so local
+development, CI and single-node deploys can run without a Qdrant
+server. Each collection is a directory holding a memory-mapped vector
+matrix (float32, or int8 when the profile asks for scalar
+quantization) and a SQLite table of ids, payloads and IVF list
+assignments.
+
+Small collections are searched by vectorized brute force; past
+`ivf_min_points` an IVF index (spherical k-means lists) limits each
+query to the lists nearest to it.
+
+Several processes may open the same collection (the runtime's source
+workers and the change feed do). Writes take an exclusive flock on the
+collection directory and bump a generation counter in SQLite; any
+process that sees a generation other than its own reloads its
+in-memory mirrors before reading or writing.
+"""
+import os
+import json
+import fcntl
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.models import (
+    CollectionStatus, Distance, Filter, FieldCondition, FilterSelector, PointIdsList, PointStruct,
+    Record, ScoredPoint, ScalarQuantization, SetPayloadOperation
+)
+
+
+DEFAULT_STORE_PATH = os.path.join(tempfile.gettempdir(), "drafted-vectors")
+
+GROW_ROWS = 8192
+SCORE_BLOCK = 65536             # rows scored per matrix product
+INT8_SCALE = 127.0              # unit vectors quantize to [-127, 127]
+
+
+def _payload_value(payload: Dict[str, Any], key: str) -> Any:
+    value = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _match_condition(payload: Dict[str, Any], condition) -> bool:
+    if isinstance(condition, Filter):
+        return matches_filter(payload, condition)
+    if not isinstance(condition, FieldCondition):
+        raise NotImplementedError(f"Unsupported filter condition: {type(condition).__name__}")
+
+    value = _payload_value(payload, condition.key)
+    values = value if isinstance(value, list) else [value]
+
+    if condition.match is not None:
+        match = condition.match
+        if hasattr(match, "value"):
+            return match.value in values
+        if hasattr(match, "any"):
+            return any(v in values for v in match.any)
+        if hasattr(match, "except_"):
+            return not any(v in values for v in match.except_)
+        if hasattr(match, "text"):
+            return any(isinstance(v, str) and match.text in v for v in values)
+    if condition.range is not None:
+        r = condition.range
+        return any(
+            isinstance(v, (int, float))
+            and (r.gt is None or v > r.gt) and (r.gte is None or v >= r.gte)
+            and (r.lt is None or v < r.lt) and (r.lte is None or v <= r.lte)
+            for v in values
+        )
+    raise NotImplementedError(f"Unsupported field condition on '{condition.key}'")
+
+
+def matches_filter(payload: Dict[str, Any], query_filter: Optional[Filter]) -> bool:
+    """Qdrant filter semantics: all must, any should, no must_not"""
+    if query_filter is None:
+        return True
+    if query_filter.must and not all(_match_condition(payload, c) for c in query_filter.must):
+        return False
+    if query_filter.should and not any(_match_condition(payload, c) for c in query_filter.should):
+        return False
+    if query_filter.must_not and any(_match_condition(payload, c) for c in query_filter.must_not):
+        return False
+    return True
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-length centroids maximizing cosine similarity to their members"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists from random points
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class LocalCollection:
+    """One collection on disk; thread- and process-safe"""
+
+    def __init__(self, path: str, ivf_min_points: int, nprobe: Optional[int] = None):
+        self.path = path
+        self.ivf_min_points = ivf_min_points
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._lock_path = os.path.join(path, "write.lock")
+
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.dim = self.meta["dim"]
+        self.dtype = np.int8 if self.meta["dtype"] == "int8" else np.float32
+
+        self._db = sqlite3.connect(os.path.join(path, "points.sqlite"), check_same_thread=False, timeout=30)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS points (
+                id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                list INTEGER NOT NULL DEFAULT -1
+            );
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+
+        self._vectors_path = os.path.join(path, "vectors.bin")
+        if not os.path.exists(self._vectors_path):
+            open(self._vectors_path, "wb").close()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Cross-process consistency
+    # ------------------------------------------------------------------
+
+    def _stored_generation(self) -> int:
+        row = self._db.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _load(self):
+        """(Re)build the in-memory mirrors from disk"""
+        # Read first: a write landing mid-load only causes one more reload
+        self._generation = self._stored_generation()
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self._matrix: Optional[np.memmap] = None
+
+        # In-memory mirrors of the table for vectorized search
+        self._ids: Dict[int, Any] = {}
+        self._rows: Dict[Any, int] = {}
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        capacity = self._rows_on_disk()
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._lists = np.full(capacity, -1, dtype=np.int32)
+        for id_json, row, payload, list_id in self._db.execute("SELECT id, row, payload, list FROM points"):
+            point_id = json.loads(id_json)
+            self._ids[row] = point_id
+            self._rows[point_id] = row
+            self._payloads[row] = json.loads(payload)
+            self._alive[row] = True
+            self._lists[row] = list_id
+
+        centroids_path = os.path.join(self.path, "centroids.npy")
+        self._centroids = np.load(centroids_path) if os.path.exists(centroids_path) else None
+
+    def _refresh(self):
+        """Pick up writes made by other processes"""
+        if self._stored_generation() != self._generation:
+            self._load()
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive write access across threads and processes, with current mirrors"""
+        with self._lock:
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _commit(self):
+        """Commit a write and tell other processes their mirrors are stale"""
+        self._db.execute(
+            "INSERT INTO state (key, value) VALUES ('generation', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+        self._db.commit()
+        # Our mirrors already include this write
+        self._generation = self._stored_generation()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _rows_on_disk(self) -> int:
+        return os.path.getsize(self._vectors_path) // (np.dtype(self.dtype).itemsize * self.dim)
+
+    def _matrix_rows(self, rows: int) -> np.memmap:
+        """Map the vector file, growing it to at least `rows` rows"""
+        current = self._rows_on_disk()
+        if rows > current:
+            current = (rows // GROW_ROWS + 1) * GROW_ROWS
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(current * np.dtype(self.dtype).itemsize * self.dim)
+            self._matrix = None
+        if self._matrix is None and current:
+            self._matrix = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(current, self.dim))
+        if len(self._alive) < current:
+            self._alive = np.concatenate([self._alive, np.zeros(current - len(self._alive), dtype=bool)])
+            self._lists = np.concatenate([self._lists, np.full(current - len(self._lists), -1, dtype=np.int32)])
+        return self._matrix
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.dtype == np.int8:
+            return np.clip(np.round(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+        return vectors.astype(np.float32)
+
+    def _free_rows(self, count: int) -> List[int]:
+        free = np.flatnonzero(~self._alive[:self._high_water()])
+        rows = free[:count].tolist()
+        start = self._high_water()
+        rows.extend(range(start, start + count - len(rows)))
+        return rows
+
+    def _high_water(self) -> int:
+        return max(self._ids) + 1 if self._ids else 0
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, points: List[PointStruct]):
+        if not points:
+            return
+        # Rows are picked from mirrors refreshed under the lock, so they
+        # match SQLite and no other process can claim them meanwhile
+        with self._writing():
+            vectors = self._encode(np.asarray([p.vector for p in points], dtype=np.float32))
+            new = [p for p in points if p.id not in self._rows]
+            fresh_rows = iter(self._free_rows(len(new)))
+            rows = [self._rows[p.id] if p.id in self._rows else next(fresh_rows) for p in points]
+
+            matrix = self._matrix_rows(max(rows) + 1)
+            matrix[rows] = vectors
+            matrix.flush()
+
+            lists = self._assign(vectors) if self._centroids is not None else [-1] * len(rows)
+            for point, row, list_id in zip(points, rows, lists):
+                payload = dict(point.payload or {})
+                self._ids[row] = point.id
+                self._rows[point.id] = row
+                self._payloads[row] = payload
+                self._alive[row] = True
+                self._lists[row] = list_id
+            self._db.executemany(
+                "INSERT OR REPLACE INTO points (id, row, payload, list) VALUES (?, ?, ?, ?)",
+                [
+                    (json.dumps(p.id), row, json.dumps(self._payloads[row], default=str), int(list_id))
+                    for p, row, list_id in zip(points, rows, lists)
+                ]
+            )
+            self._commit()
+            self._maybe_train()
+
+    def delete(self, selector):
+        with self._writing():
+            if isinstance(selector, PointIdsList):
+                ids = [i for i in selector.points if i in self._rows]
+            elif isinstance(selector, FilterSelector):
+                ids = [self._ids[row] for row, payload in self._payloads.items() if matches_filter(payload, selector.filter)]
+            else:
+                ids = [i for i in selector if i in self._rows]
+            for point_id in ids:
+                row = self._rows.pop(point_id)
+                del self._ids[row]
+                del self._payloads[row]
+                self._alive[row] = False
+                self._lists[row] = -1
+            self._db.executemany("DELETE FROM points WHERE id = ?", [(json.dumps(i),) for i in ids])
+            self._commit()
+
+    def set_payload(self, payload: Dict[str, Any], points: List[Any]):
+        with self._writing():
+            updated = []
+            for point_id in points:
+                row = self._rows.get(point_id)
+                if row is None:
+                    continue
+                self._payloads[row].update(payload)
+                updated.append((json.dumps(self._payloads[row], default=str), json.dumps(point_id)))
+            self._db.executemany("UPDATE points SET payload = ? WHERE id = ?", updated)
+            self._commit()
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _assign(self, encoded: np.ndarray) -> List[int]:
+        return np.argmax(encoded.astype(np.float32) @ self._centroids.T, axis=1).tolist()
+
+    def _maybe_train(self):
+        count = len(self._rows)
+        trained = self.meta.get("ivf_trained_points", 0)
+        if count < self.ivf_min_points or (trained and count < 2 * trained):
+            return
+        self._train_ivf()
+
+    def train_ivf(self):
+        """(Re)build IVF lists; retrained whenever the collection doubles"""
+        with self._writing():
+            self._train_ivf()
+
+    def _train_ivf(self):
+        # Caller holds _writing()
+        rows = np.flatnonzero(self._alive)
+        if len(rows) == 0:
+            return
+        nlist = int(np.clip(np.sqrt(len(rows)), 16, 4096))
+        nlist = min(nlist, len(rows))
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(rows, size=min(len(rows), nlist * 64), replace=False))
+        matrix = self._matrix_rows(0)
+        self._centroids = spherical_kmeans(np.asarray(matrix[sample], dtype=np.float32), nlist)
+        np.save(os.path.join(self.path, "centroids.npy"), self._centroids)
+
+        for start in range(0, len(rows), SCORE_BLOCK):
+            block = rows[start:start + SCORE_BLOCK]
+            self._lists[block] = self._assign(np.asarray(matrix[block]))
+        self._db.executemany(
+            "UPDATE points SET list = ? WHERE row = ?",
+            [(int(self._lists[row]), int(row)) for row in rows]
+        )
+        self.meta["ivf_trained_points"] = int(len(rows))
+        self._write_meta()
+        self._commit()
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _candidate_rows(self, query: np.ndarray, query_filter: Optional[Filter], limit: int, exact: bool) -> np.ndarray:
+        mask = self._alive.copy()
+        if query_filter is not None:
+            allowed = [row for row, payload in self._payloads.items() if matches_filter(payload, query_filter)]
+            mask[:] = False
+            mask[allowed] = True
+
+        # A selective filter leaves few enough rows to score exactly
+        if exact or self._centroids is None or mask.sum() <= self.ivf_min_points:
+            return np.flatnonzero(mask)
+
+        nlist = len(self._centroids)
+        nprobe = self.nprobe or max(8, nlist // 16)
+        probes = np.argsort(-(self._centroids @ query))[:nprobe]
+        rows = np.flatnonzero(mask & np.isin(self._lists, probes))
+        # Widen the probe if the nearest lists can't fill the result
+        return rows if len(rows) >= limit else np.flatnonzero(mask)
+
+    def search(
+        self,
+        query: List[float],
+        limit: int = 10,
+        query_filter: Optional[Filter] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        score_threshold: Optional[float] = None,
+        exact: bool = False
+    ) -> List[ScoredPoint]:
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            q = np.asarray(query, dtype=np.float32)
+            q = q / max(float(np.linalg.norm(q)), 1e-12)
+            rows = self._candidate_rows(q, query_filter, limit, exact)
+            if len(rows) == 0:
+                return []
+
+            matrix = self._matrix_rows(0)
+            scale = INT8_SCALE if self.dtype == np.int8 else 1.0
+            best_rows, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            for start in range(0, len(rows), SCORE_BLOCK):
+                block = rows[start:start + SCORE_BLOCK]
+                scores = (np.asarray(matrix[block], dtype=np.float32) @ q) / scale
+                best_rows = np.concatenate([best_rows, block])
+                best_scores = np.concatenate([best_scores, scores])
+                if len(best_rows) > limit:
+                    top = np.argpartition(-best_scores, limit)[:limit]
+                    best_rows, best_scores = best_rows[top], best_scores[top]
+
+            order = np.argsort(-best_scores)
+            result = []
+            for i in order[:limit]:
+                score = float(best_scores[i])
+                if score_threshold is not None and score < score_threshold:
+                    break
+                row = int(best_rows[i])
+                result.append(ScoredPoint(
+                    id=self._ids[row],
+                    version=0,
+                    score=score,
+                    payload=dict(self._payloads[row]) if with_payload else None,
+                    vector=(np.asarray(matrix[row], dtype=np.float32) / scale).tolist() if with_vectors else None,
+                ))
+            return result
+
+    def scroll(
+        self,
+        limit: int = 10,
+        offset: Optional[Any] = None,
+        scroll_filter: Optional[Filter] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False
+    ) -> Tuple[List[Record], Optional[Any]]:
+        """Pages in row order; the offset is the id of the next point"""
+        with self._lock:
+            self._refresh()
+            start = self._rows.get(offset, 0) if offset is not None else 0
+            matrix = self._matrix_rows(0)
+            scale = INT8_SCALE if self.dtype == np.int8 else 1.0
+            records = []
+            for row in sorted(r for r in self._ids if r >= start):
+                payload = self._payloads[row]
+                if not matches_filter(payload, scroll_filter):
+                    continue
+                if len(records) == limit:
+                    return records, self._ids[row]
+                records.append(Record(
+                    id=self._ids[row],
+                    payload=dict(payload) if with_payload else None,
+                    vector=(np.asarray(matrix[row], dtype=np.float32) / scale).tolist() if with_vectors else None,
+                ))
+            return records, None
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+
+class LocalVectorStore:
+    """
+    Drop-in for the QdrantClient calls the indexer makes.
+
+    Search is exact below `ivf_min_points` points per collection and
+    IVF-approximate above it.
+    """
+
+    def __init__(self, path: Optional[str] = None, ivf_min_points: int = 50_000, nprobe: Optional[int] = None):
+        self.path = path or os.getenv("INDEXER_LOCAL_STORE_PATH", DEFAULT_STORE_PATH)
+        self.ivf_min_points = ivf_min_points
+        self.nprobe = nprobe
+        os.makedirs(self.path, exist_ok=True)
+        self._collections: Dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+
+    def _collection_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _get(self, name: str) -> LocalCollection:
+        with self._lock:
+            if name not in self._collections:
+                if not os.path.exists(os.path.join(self._collection_path(name), "meta.json")):
+                    raise ValueError(f"Collection '{name}' not found")
+                self._collections[name] = LocalCollection(
+                    self._collection_path(name), self.ivf_min_points, self.nprobe
+                )
+            return self._collections[name]
+
+    # ------------------------------------------------------------------
+    # Collections
+    # ------------------------------------------------------------------
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self._collection_path(collection_name), "meta.json"))
+
+    def get_collection(self, collection_name: str):
+        collection = self._get(collection_name)
+        return SimpleNamespace(
+            status=CollectionStatus.GREEN,
+            points_count=collection.count(),
+            vectors_count=collection.count(),
+            config=SimpleNamespace(params=SimpleNamespace(vectors=SimpleNamespace(size=collection.dim))),
+        )
+
+    def create_collection(self, collection_name: str, vectors_config, quantization_config=None, **kwargs) -> bool:
+        if vectors_config.distance not in (Distance.COSINE, Distance.DOT):
+            raise NotImplementedError("Local store supports cosine/dot distance only")
+        path = self._collection_path(collection_name)
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            "dim": vectors_config.size,
+            "distance": str(vectors_config.distance),
+            # Scalar quantization maps to int8 storage; anything else stays float32
+            "dtype": "int8" if isinstance(quantization_config, ScalarQuantization) else "float32",
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        return True
+
+    def delete_collection(self, collection_name: str) -> bool:
+        with self._lock:
+            self._collections.pop(collection_name, None)
+        shutil.rmtree(self._collection_path(collection_name), ignore_errors=True)
+        return True
+
+    def update_collection(self, collection_name: str, **kwargs) -> bool:
+        # Storage layout is fixed at creation; HNSW/on-disk settings don't apply
+        self._get(collection_name)
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema=None, **kwargs):
+        # Payloads are filtered in memory; nothing to build
+        self._get(collection_name)
+
+    # ------------------------------------------------------------------
+    # Points
+    # ------------------------------------------------------------------
+
+    def upsert(self, collection_name: str, points: List[PointStruct], wait: bool = True, **kwargs):
+        self._get(collection_name).upsert(points)
+
+    def delete(self, collection_name: str, points_selector, wait: bool = True, **kwargs):
+        self._get(collection_name).delete(points_selector)
+
+    def set_payload(self, collection_name: str, payload: Dict[str, Any], points: List[Any], **kwargs):
+        self._get(collection_name).set_payload(payload, points)
+
+    def batch_update_points(self, collection_name: str, update_operations: List[Any], **kwargs):
+        collection = self._get(collection_name)
+        for operation in update_operations:
+            if not isinstance(operation, SetPayloadOperation):
+                raise NotImplementedError(f"Unsupported update operation: {type(operation).__name__}")
+            collection.set_payload(operation.set_payload.payload, operation.set_payload.points)
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: List[float],
+        limit: int = 10,
+        query_filter: Optional[Filter] = None,
+        search_params=None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        score_threshold: Optional[float] = None,
+        **kwargs
+    ):
+        exact = bool(search_params is not None and getattr(search_params, "exact", False))
+        points = self._get(collection_name).search(
+            query, limit, query_filter, with_payload, with_vectors, score_threshold, exact
+        )
+        # Same shape as QueryResponse (.points)
+        return SimpleNamespace(points=points)
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 10,
+        query_filter: Optional[Filter] = None,
+        with_payload: bool = True,
+        **kwargs
+    ) -> List[ScoredPoint]:
+        return self.query_points(collection_name, query_vector, limit, query_filter, with_payload=with_payload).points
+
+    def scroll(
+        self,
+        collection_name: str,
+        limit: int = 10,
+        offset: Optional[Any] = None,
+        scroll_filter: Optional[Filter] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        **kwargs
+    ):
+        return self._get(collection_name).scroll(limit, offset, scroll_filter, with_payload, with_vectors)
@@ -4,10 +4,20 @@ Ingests repos, docs, tickets into vector store
 """
 import os
 from dotenv import load_dotenv
+from github import Github
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
 import schedule
 import time
+from typing import List, Optional
+
+from collection_profiles import get_profile, create_collection, apply_profile, ensure_payload_indexes
+from embeddings import get_embedder
+from embedding_cache import EmbeddingCache, CachedEmbedder
+from local_store import LocalVectorStore
+from pipeline import IngestPipeline
+from repo_index import RepoIndexer, IndexState, configured_repos
+from runtime import IndexerRuntime, Checkpoint, Progress
+from change_feed import ChangeFeed
 
 load_dotenv()
 
@@ -15,73 +25,166 @@ load_dotenv()
 class DraftedIndexer:
     """Main indexer service"""
     
-    def __init__(self):
-        self.qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.client = QdrantClient(url=self.qdrant_url)
-        self.setup_collections()
+    # Sources with a working indexer; the runtime and change feed only run
+    # these. docs and tickets join once index_docs/index_tickets exist
+    SOURCES = ("repos",)
+    
+    def __init__(self, setup: bool = True):
+        self.qdrant_url = os.getenv("QDRANT_URL")
+        if self.qdrant_url:
+            self.client = QdrantClient(url=self.qdrant_url)
+        else:
+            # No Qdrant server: embedded store with the same interface
+            self.client = LocalVectorStore()
+            print(f"QDRANT_URL not set; using local vector store at {self.client.path}")
+        
+        # Sources embed through the shared content-addressed cache. Only
+        # index_repos has chunks to embed so far; docs and tickets are
+        # still stubs and pick the cache up via self.pipeline() once written
+        backend = get_embedder()
+        self.embedder = CachedEmbedder(backend, EmbeddingCache(backend.dim))
+        
+        self.profile = get_profile()
+        if setup:
+            # Runtime workers skip this; the service process already did it
+            self.setup_collections()
+        self.state = IndexState()
+        self.repo_indexer = RepoIndexer(
+            Github(os.getenv("GITHUB_TOKEN"), per_page=100),
+            self.client,
+            self.pipeline("repos"),
+            state=self.state
+        )
+    
+    def pipeline(self, collection: str) -> IngestPipeline:
+        """Chunk/embed/upsert pipeline writing to `collection`"""
+        return IngestPipeline(self.client, self.embedder, collection)
     
     def setup_collections(self):
-        """Initialize Qdrant collections"""
+        """Initialize Qdrant collections with the configured profile"""
         collections = [
-            ("repos", 1536),      # Code and repository content
-            ("docs", 1536),       # Documentation
-            ("tickets", 1536),    # Linear/Jira tickets
-            ("conversations", 1536)  # Slack/chat history
+            "repos",          # Code and repository content
+            "docs",           # Documentation
+            "tickets",        # Linear/Jira tickets
+            "conversations"   # Slack/chat history
         ]
         
-        for collection_name, vector_size in collections:
+        for collection_name in collections:
             try:
                 self.client.get_collection(collection_name)
-                print(f"Collection '{collection_name}' already exists")
             except Exception:
-                self.client.create_collection(
-                    collection_name=collection_name,
-                    vectors_config=VectorParams(
-                        size=vector_size,
-                        distance=Distance.COSINE
-                    )
-                )
-                print(f"Created collection '{collection_name}'")
+                create_collection(self.client, collection_name, self.embedder.dim, self.profile)
+                print(f"Created collection '{collection_name}' ({self.profile.name} profile)")
+                continue
+            
+            if os.getenv("INDEXER_APPLY_PROFILE") == "1":
+                apply_profile(self.client, collection_name, self.profile)
+                print(f"Collection '{collection_name}' moved to {self.profile.name} profile")
+            else:
+                ensure_payload_indexes(self.client, collection_name)
+                print(f"Collection '{collection_name}' already exists")
     
-    def index_repos(self):
-        """Index GitHub repositories"""
+    def index_repos(self, progress: Optional[Progress] = None, checkpoint: Optional[Checkpoint] = None):
+        """
+        Index GitHub repositories (only what changed since the last run).
+        
+        Resumes within a repo from the per-file state; the checkpoint
+        records each repo's last fully indexed commit ("repo@branch").
+        """
         print("Indexing repositories...")
-        # TODO: Implement GitHub repo indexing
-        pass
+        repos = configured_repos()
+        failed = []
+        for i, (repo, branch) in enumerate(repos):
+            if progress:
+                progress.update(done=i, total=len(repos), phase=f"{repo}@{branch}")
+            
+            def on_progress(files_done: int, files_total: int, chunks: int):
+                if progress:
+                    progress.update(items=chunks, phase=f"{repo}@{branch} {files_done}/{files_total} files")
+            
+            try:
+                stats = self.repo_indexer.index(repo, branch, on_progress=on_progress)
+                print(stats.summary())
+                if checkpoint:
+                    checkpoint.set(f"{repo}@{branch}", stats.head)
+            except Exception as e:
+                # One broken repo shouldn't stop the rest; its commit isn't advanced
+                print(f"Failed to index {repo}@{branch}: {e}")
+                failed.append(f"{repo}@{branch}")
+        
+        if progress:
+            progress.update(done=len(repos), total=len(repos), phase="")
+        if failed:
+            # Leaves the source unfinished so the next run retries it
+            raise RuntimeError(f"Failed to index {', '.join(failed)}")
     
-    def index_docs(self):
-        """Index documentation"""
+    def index_docs(
+        self,
+        progress: Optional[Progress] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        changed: Optional[List[str]] = None
+    ):
+        """
+        Index documentation.
+        
+        Checkpoint contract: persist the last completed page id and the
+        edit-time cursor ("cursor") after each page, and start from them.
+        `changed` (page ids from the change feed) limits the run to those
+        pages; None is a full reconciliation sweep. Chunks go through
+        self.pipeline("docs"), so they embed via the shared cache.
+        """
         print("Indexing documentation...")
         # TODO: Implement doc indexing (Notion, etc.)
         pass
     
-    def index_tickets(self):
-        """Index Linear/Jira tickets"""
+    def index_tickets(
+        self,
+        progress: Optional[Progress] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        changed: Optional[List[str]] = None
+    ):
+        """
+        Index Linear/Jira tickets.
+        
+        Checkpoint contract: persist the tracker's pagination cursor
+        ("cursor") after each page of tickets, and start from it.
+        `changed` ("owner/repo#N" or "linear:KEY" from the change feed)
+        limits the run to those tickets; None is a full reconciliation sweep.
+        Chunks go through self.pipeline("tickets"), so they embed via the
+        shared cache.
+        """
         print("Indexing tickets...")
         # TODO: Implement ticket indexing
         pass
     
     def run_nightly_index(self):
-        """Run full indexing job"""
+        """Run the nightly indexing job in-process, one source after another"""
         print("Starting nightly indexing job...")
-        self.index_repos()
-        self.index_docs()
-        self.index_tickets()
+        for source in self.SOURCES:
+            getattr(self, f"index_{source}")()
         print("Nightly indexing complete")
 
 
 def main():
     """Main entry point"""
+    # Create collections once; runtime workers build their own indexers
     indexer = DraftedIndexer()
+    runtime = IndexerRuntime(sources=DraftedIndexer.SOURCES)
+    
+    # Changes are indexed as they happen; the nightly run reconciles
+    # whatever the feed missed. The two share the run lease.
+    if os.getenv("INDEXER_CHANGE_FEED", "1" if os.getenv("REDIS_URL") else "0") == "1":
+        ChangeFeed(indexer, lease=runtime.lease).start()
+        print("Change feed started")
     
-    # Schedule nightly indexing at 2 AM
-    schedule.every().day.at("02:00").do(indexer.run_nightly_index)
+    # Schedule the nightly reconciliation sweep at 2 AM; sources run in worker processes
+    schedule.every().day.at("02:00").do(runtime.start)
     
     print("Indexer service started")
     print("Scheduled nightly indexing at 02:00")
     
-    # Run once on startup
-    indexer.run_nightly_index()
+    # Run once on startup (resumes an interrupted run)
+    runtime.start()
     
     # Keep running
     while True:
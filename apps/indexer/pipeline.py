@@ -0,0 +1,243 @@
+"""
+Streaming chunk -> embed -> upsert pipeline
+
+    items --(process pool)--> chunks --(batcher)--> embed queue
+          --(N embed threads)--> upsert queue --(M writer threads)--> Qdrant
+
+Both queues are bounded, so a slow embedding API or Qdrant slows the
+stages feeding it instead of buffering the whole corpus in memory.
+"""
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+
+# Rough chars-per-token for batch sizing; errs towards smaller batches
+CHARS_PER_TOKEN = 4
+
+# Group key plus the chunks produced for it (objects with id/text/payload)
+ChunkGroup = Tuple[str, List[Any]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class PipelineStats:
+    items: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    embed_batches: int = 0
+    upserts: int = 0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.embedded / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.items} items, {self.chunks} chunks, {self.embedded} embedded in "
+            f"{self.embed_batches} batches / {self.upserts} upserts, "
+            f"{self.seconds:.1f}s ({self.chunks_per_second:.1f} chunks/s)"
+        )
+
+
+class IngestPipeline:
+    """
+    Embeds and upserts chunks into one Qdrant collection.
+
+    run() takes raw items plus a top-level (picklable) `chunker` that
+    turns one item into a ChunkGroup in a worker process. The caller's
+    `select` hook sees each group on the calling thread and returns the
+    chunks that actually need embedding (e.g. after a content-hash
+    diff). `on_group_done` fires once every selected chunk of a group is
+    in Qdrant, which is when it's safe to record the group as indexed.
+    """
+
+    def __init__(
+        self,
+        qdrant: QdrantClient,
+        embedder,
+        collection: str,
+        chunk_workers: Optional[int] = None,
+        embed_workers: int = 4,
+        max_batch_items: int = 128,
+        max_batch_tokens: int = 50_000,
+        upsert_workers: int = 2,
+        upsert_batch: int = 256
+    ):
+        self.qdrant = qdrant
+        self.embedder = embedder
+        self.collection = collection
+        self.chunk_workers = chunk_workers if chunk_workers is not None else int(
+            os.getenv("INDEXER_CHUNK_WORKERS", str(os.cpu_count() or 1))
+        )
+        self.embed_workers = embed_workers
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.upsert_workers = upsert_workers
+        self.upsert_batch = upsert_batch
+
+    # ------------------------------------------------------------------
+    # Chunking
+    # ------------------------------------------------------------------
+
+    def _chunk(self, items: Iterable[Any], chunker: Callable[[Any], ChunkGroup]):
+        """Yield ChunkGroups in input order, keeping a bounded number in flight"""
+        if self.chunk_workers <= 1:
+            for item in items:
+                yield chunker(item)
+            return
+
+        window = self.chunk_workers * 4
+        # The embed/upsert threads are already running; forking now could
+        # copy a lock one of them holds into the children
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.chunk_workers, mp_context=spawn) as pool:
+            pending = deque()
+            for item in items:
+                pending.append(pool.submit(chunker, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        items: Iterable[Any],
+        chunker: Callable[[Any], ChunkGroup],
+        select: Optional[Callable[[str, List[Any]], List[Any]]] = None,
+        on_group_done: Optional[Callable[[str], None]] = None
+    ) -> PipelineStats:
+        stats = PipelineStats()
+        started = time.monotonic()
+
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.embed_workers * 2)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.upsert_workers * 4)
+        remaining: Dict[str, int] = {}
+        lock = threading.Lock()
+        errors: List[BaseException] = []
+
+        def group_done(group: str):
+            if on_group_done:
+                on_group_done(group)
+
+        def embed_worker():
+            while True:
+                batch = embed_queue.get()
+                if batch is None:
+                    return
+                if errors:
+                    continue
+                try:
+                    t0 = time.monotonic()
+                    vectors = self.embedder.embed([chunk.text for _, chunk in batch])
+                    with lock:
+                        stats.embed_seconds += time.monotonic() - t0
+                        stats.embed_batches += 1
+                    upsert_queue.put(list(zip(batch, vectors)))
+                except BaseException as e:
+                    errors.append(e)
+
+        def upsert_worker():
+            while True:
+                rows = upsert_queue.get()
+                if rows is None:
+                    return
+                # Merge whatever else is already waiting into one request
+                while len(rows) < self.upsert_batch:
+                    try:
+                        more = upsert_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is None:
+                        upsert_queue.put(None)
+                        break
+                    rows.extend(more)
+                if errors:
+                    continue
+                try:
+                    t0 = time.monotonic()
+                    self.qdrant.upsert(
+                        collection_name=self.collection,
+                        points=[
+                            PointStruct(id=chunk.id, vector=vector, payload=chunk.payload)
+                            for (_, chunk), vector in rows
+                        ],
+                        wait=True,
+                    )
+                    finished = []
+                    with lock:
+                        stats.upsert_seconds += time.monotonic() - t0
+                        stats.upserts += 1
+                        stats.embedded += len(rows)
+                        for (group, _), _ in rows:
+                            remaining[group] -= 1
+                            if remaining[group] == 0:
+                                del remaining[group]
+                                finished.append(group)
+                    for group in finished:
+                        group_done(group)
+                except BaseException as e:
+                    errors.append(e)
+
+        embedders = [threading.Thread(target=embed_worker, daemon=True) for _ in range(self.embed_workers)]
+        writers = [threading.Thread(target=upsert_worker, daemon=True) for _ in range(self.upsert_workers)]
+        for thread in embedders + writers:
+            thread.start()
+
+        batch: List[Tuple[str, Any]] = []
+        tokens = 0
+        try:
+            for group, chunks in self._chunk(items, chunker):
+                if errors:
+                    break
+                stats.items += 1
+                stats.chunks += len(chunks)
+                todo = select(group, chunks) if select else chunks
+                if not todo:
+                    group_done(group)
+                    continue
+
+                with lock:
+                    remaining[group] = remaining.get(group, 0) + len(todo)
+                for chunk in todo:
+                    chunk_tokens = estimate_tokens(chunk.text)
+                    if batch and (len(batch) >= self.max_batch_items or tokens + chunk_tokens > self.max_batch_tokens):
+                        embed_queue.put(batch)
+                        batch, tokens = [], 0
+                    batch.append((group, chunk))
+                    tokens += chunk_tokens
+            if batch and not errors:
+                embed_queue.put(batch)
+        finally:
+            for _ in embedders:
+                embed_queue.put(None)
+            for thread in embedders:
+                thread.join()
+            for _ in writers:
+                upsert_queue.put(None)
+            for thread in writers:
+                thread.join()
+
+        stats.seconds = time.monotonic() - started
+        if errors:
+            raise errors[0]
+        return stats
@@ -0,0 +1,474 @@
+"""
+Incremental repository indexing
+
+Each (repo, branch) remembers the last commit it indexed plus, per file,
+the blob sha and the hashes of its chunks. A run diffs that commit to
+HEAD, re-chunks only changed files, embeds only chunks whose content
+hash is new, and deletes vectors for chunks and files that went away.
+"""
+import os
+import re
+import json
+import base64
+import time
+import uuid
+import sqlite3
+import hashlib
+import tarfile
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Iterator
+
+import requests
+from github import Github
+from github.GithubException import GithubException
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    PointIdsList, FilterSelector, Filter, FieldCondition, MatchValue,
+    SetPayload, SetPayloadOperation
+)
+
+from pipeline import IngestPipeline, PipelineStats
+
+
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), "drafted-indexer-state.sqlite")
+
+# Namespace for deterministic point ids
+POINT_NAMESPACE = uuid.UUID("5b0d3c1e-8f4a-4c55-9a63-2f3e7c1d9a10")
+
+# GitHub's compare API lists at most 300 files
+COMPARE_FILE_LIMIT = 300
+# Above this many changed files, one tarball beats per-file blob fetches
+TARBALL_THRESHOLD = 100
+
+MAX_FILE_BYTES = 200_000
+CHUNK_MIN_CHARS = 400
+CHUNK_MAX_CHARS = 2000
+
+INDEXED_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs", ".json", ".md", ".mdx", ".txt",
+    ".yml", ".yaml", ".toml", ".sql", ".css", ".scss", ".html", ".sh", ".go", ".rs",
+    ".java", ".kt", ".swift", ".rb", ".php", ".graphql", ".prisma",
+}
+
+SKIPPED_DIRS = {"node_modules", "dist", "build", ".next", "vendor", "__pycache__", ".git", "coverage"}
+SKIPPED_FILES = {"package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock"}
+
+
+def should_index(path: str, size: Optional[int] = None) -> bool:
+    """Source and docs only; no lockfiles, build output or huge files"""
+    parts = path.split("/")
+    if any(part in SKIPPED_DIRS for part in parts[:-1]) or parts[-1] in SKIPPED_FILES:
+        return False
+    if size is not None and size > MAX_FILE_BYTES:
+        return False
+    return os.path.splitext(path)[1].lower() in INDEXED_EXTENSIONS
+
+
+def chunk_text(text: str, min_chars: int = CHUNK_MIN_CHARS, max_chars: int = CHUNK_MAX_CHARS) -> List[Tuple[int, str]]:
+    """
+    Split text into chunks at blank lines.
+
+    Boundaries depend only on nearby content, so an edit changes the
+    chunks around it and leaves the rest of the file hashing the same.
+
+    Returns:
+        List of (start_line, chunk) with 1-based line numbers
+    """
+    chunks = []
+    current: List[str] = []
+    size = 0
+    start = 1
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not current:
+            start = number
+        current.append(line)
+        size += len(line) + 1
+        if (size >= min_chars and not line.strip()) or size >= max_chars:
+            chunk = "\n".join(current).strip()
+            if chunk:
+                chunks.append((start, chunk))
+            current, size = [], 0
+    chunk = "\n".join(current).strip()
+    if chunk:
+        chunks.append((start, chunk))
+    return chunks
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash, insensitive to trailing whitespace"""
+    normalized = "\n".join(line.rstrip() for line in text.strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def point_id(repo: str, branch: str, path: str, digest: str, occurrence: int = 0) -> str:
+    """Deterministic Qdrant id for one chunk of one file"""
+    return str(uuid.uuid5(POINT_NAMESPACE, f"{repo}@{branch}:{path}:{digest}:{occurrence}"))
+
+
+def decode_source(data: bytes) -> Optional[str]:
+    """Text content, or None for binary files"""
+    if b"\x00" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+@dataclass
+class FileChunk:
+    """A chunk ready to embed and upsert"""
+    id: str
+    text: str
+    payload: Dict
+
+
+def chunk_file(item: Tuple[str, str, str, str, bytes]) -> Tuple[str, List[FileChunk]]:
+    """
+    (repo, branch, head, path, data) -> (path, chunks)
+
+    Top-level so the ingest pipeline can run it in a worker process.
+    """
+    repo, branch, head, path, data = item
+    # Compare doesn't report sizes, so oversized files are caught here
+    text = decode_source(data) if len(data) <= MAX_FILE_BYTES else None
+    chunks, seen = [], {}
+    for start_line, chunk in chunk_text(text or ""):
+        digest = chunk_hash(chunk)
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        chunks.append(FileChunk(
+            id=point_id(repo, branch, path, digest, occurrence),
+            text=chunk,
+            payload={
+                "repo": repo,
+                "branch": branch,
+                "path": path,
+                "start_line": start_line,
+                "commit": head,
+                "hash": digest,
+                "source": "github",
+                "text": chunk,
+            },
+        ))
+    return path, chunks
+
+
+@dataclass
+class RepoIndexStats:
+    repo: str
+    branch: str
+    base: Optional[str] = None
+    head: Optional[str] = None
+    mode: str = "noop"
+    pipeline: Optional[PipelineStats] = None
+    files_changed: int = 0
+    files_removed: int = 0
+    chunks_embedded: int = 0
+    chunks_skipped: int = 0
+    chunks_deleted: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.repo}@{self.branch} [{self.mode}] {(self.base or '-')[:7]}..{(self.head or '-')[:7]}: "
+            f"{self.files_changed} changed, {self.files_removed} removed, "
+            f"{self.chunks_embedded} embedded, {self.chunks_skipped} unchanged, "
+            f"{self.chunks_deleted} deleted in {self.seconds:.1f}s"
+            + (f" ({self.pipeline.chunks_per_second:.1f} chunks/s)" if self.pipeline else "")
+        )
+
+
+class IndexState:
+    """SQLite record of what has been indexed per (repo, branch)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("INDEXER_STATE_PATH", DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS commits (
+                repo TEXT NOT NULL,
+                branch TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                indexed_at REAL NOT NULL,
+                PRIMARY KEY (repo, branch)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                repo TEXT NOT NULL,
+                branch TEXT NOT NULL,
+                path TEXT NOT NULL,
+                blob_sha TEXT NOT NULL,
+                chunks TEXT NOT NULL,
+                PRIMARY KEY (repo, branch, path)
+            );
+        """)
+
+    def last_commit(self, repo: str, branch: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha FROM commits WHERE repo = ? AND branch = ?", (repo, branch)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_commit(self, repo: str, branch: str, sha: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO commits (repo, branch, sha, indexed_at) VALUES (?, ?, ?, ?)",
+                (repo, branch, sha, time.time())
+            )
+            self._db.commit()
+
+    def files(self, repo: str, branch: str) -> Dict[str, str]:
+        """path -> blob sha"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, blob_sha FROM files WHERE repo = ? AND branch = ?", (repo, branch)
+            ).fetchall()
+        return dict(rows)
+
+    def file(self, repo: str, branch: str, path: str) -> Tuple[Optional[str], Dict[str, str]]:
+        """(blob sha, {point id: chunk hash}) for one file"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob_sha, chunks FROM files WHERE repo = ? AND branch = ? AND path = ?",
+                (repo, branch, path)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, {})
+
+    def set_file(self, repo: str, branch: str, path: str, blob_sha: str, chunks: Dict[str, str]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (repo, branch, path, blob_sha, chunks) VALUES (?, ?, ?, ?, ?)",
+                (repo, branch, path, blob_sha, json.dumps(chunks))
+            )
+            self._db.commit()
+
+    def remove_file(self, repo: str, branch: str, path: str):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM files WHERE repo = ? AND branch = ? AND path = ?", (repo, branch, path)
+            )
+            self._db.commit()
+
+
+class RepoIndexer:
+    """
+    Commit-diff-driven indexing of one GitHub repo branch into Qdrant.
+
+    Chunking, embedding and upserts go through `pipeline`, whose
+    collection is the one indexed. The stored commit only
+    advances once every change up to HEAD is in Qdrant; files are
+    recorded as they land, so a retried run skips what's already done.
+    """
+
+    def __init__(
+        self,
+        github: Github,
+        qdrant: QdrantClient,
+        pipeline: IngestPipeline,
+        state: Optional[IndexState] = None
+    ):
+        self.github = github
+        self.qdrant = qdrant
+        self.pipeline = pipeline
+        self.state = state or IndexState()
+        self.collection = pipeline.collection
+
+    # ------------------------------------------------------------------
+    # Diffing
+    # ------------------------------------------------------------------
+
+    def _changes(self, gh_repo, repo: str, branch: str, base: Optional[str], head: str, stats: RepoIndexStats):
+        """
+        Returns:
+            ({path: blob sha} to (re)index, [paths] to remove)
+        """
+        if base:
+            try:
+                comparison = gh_repo.compare(base, head)
+                # "diverged"/"behind" means history was rewritten; the file
+                # list would be relative to the merge base, not our commit
+                if comparison.status in ("ahead", "identical") and len(comparison.files) < COMPARE_FILE_LIMIT:
+                    stats.mode = "compare"
+                    changed, removed = {}, []
+                    for f in comparison.files:
+                        if f.status == "removed":
+                            removed.append(f.filename)
+                            continue
+                        if f.status == "renamed" and f.previous_filename:
+                            removed.append(f.previous_filename)
+                        if should_index(f.filename):
+                            changed[f.filename] = f.sha
+                    return changed, removed
+            except GithubException as e:
+                print(f"Compare {repo} {base[:7]}..{head[:7]} failed ({e.status}); diffing trees")
+
+        # Full tree listing, diffed against the blob shas we stored
+        stats.mode = "tree" if base else "full"
+        tree = gh_repo.get_git_tree(head, recursive=True)
+        current = {
+            item.path: item.sha for item in tree.tree
+            if item.type == "blob" and should_index(item.path, item.size)
+        }
+        known = self.state.files(repo, branch)
+        changed = {path: sha for path, sha in current.items() if known.get(path) != sha}
+        removed = [path for path in known if path not in current]
+        return changed, removed
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _iter_blobs(self, gh_repo, paths: Dict[str, str]) -> Iterator[Tuple[str, str, bytes]]:
+        for path, sha in paths.items():
+            blob = gh_repo.get_git_blob(sha)
+            data = base64.b64decode(blob.content) if blob.encoding == "base64" else blob.content.encode()
+            yield path, sha, data
+
+    def _iter_tarball(self, gh_repo, head: str, paths: Dict[str, str]) -> Iterator[Tuple[str, str, bytes]]:
+        url = gh_repo.get_archive_link("tarball", head)
+        with requests.get(url, stream=True, timeout=300) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    # Strip the "<owner>-<repo>-<sha>/" root directory
+                    path = member.name.split("/", 1)[-1]
+                    if path in paths:
+                        yield path, paths[path], archive.extractfile(member).read()
+
+    def _fetch(self, gh_repo, head: str, paths: Dict[str, str]) -> Iterator[Tuple[str, str, bytes]]:
+        if len(paths) > TARBALL_THRESHOLD:
+            return self._iter_tarball(gh_repo, head, paths)
+        return self._iter_blobs(gh_repo, paths)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _delete_ids(self, ids: List[str]):
+        if ids:
+            self.qdrant.delete(collection_name=self.collection, points_selector=PointIdsList(points=ids))
+
+    def _delete_path(self, repo: str, branch: str, path: str):
+        self.qdrant.delete(
+            collection_name=self.collection,
+            points_selector=FilterSelector(filter=Filter(must=[
+                FieldCondition(key="repo", match=MatchValue(value=repo)),
+                FieldCondition(key="branch", match=MatchValue(value=branch)),
+                FieldCondition(key="path", match=MatchValue(value=path)),
+            ])),
+        )
+
+    def _select(self, repo: str, branch: str, head: str, path: str, chunks: List[FileChunk], stats: RepoIndexStats) -> List[FileChunk]:
+        """Diff a file's chunks against the stored hashes; returns the ones to embed"""
+        _, old_chunks = self.state.file(repo, branch, path)
+        new = [chunk for chunk in chunks if chunk.id not in old_chunks]
+        kept = [chunk for chunk in chunks if chunk.id in old_chunks]
+        current_ids = {chunk.id for chunk in chunks}
+        stale = [pid for pid in old_chunks if pid not in current_ids]
+
+        if kept:
+            # Unchanged text may have moved; refresh position without re-embedding
+            self.qdrant.batch_update_points(
+                collection_name=self.collection,
+                update_operations=[
+                    SetPayloadOperation(set_payload=SetPayload(
+                        payload={"start_line": chunk.payload["start_line"], "commit": head},
+                        points=[chunk.id],
+                    ))
+                    for chunk in kept
+                ],
+            )
+        self._delete_ids(stale)
+
+        stats.files_changed += 1
+        stats.chunks_embedded += len(new)
+        stats.chunks_skipped += len(kept)
+        stats.chunks_deleted += len(stale)
+        return new
+
+    def index(
+        self,
+        repo: str,
+        branch: str = "main",
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> RepoIndexStats:
+        """
+        Bring the index for `repo@branch` up to its HEAD commit.
+
+        `on_progress(files_done, files_total, chunks)` is called as each
+        changed file's chunks finish upserting.
+        """
+        started = time.monotonic()
+        stats = RepoIndexStats(repo=repo, branch=branch)
+
+        gh_repo = self.github.get_repo(repo)
+        head = gh_repo.get_branch(branch).commit.sha
+        base = self.state.last_commit(repo, branch)
+        stats.base, stats.head = base, head
+
+        if base == head:
+            stats.seconds = time.monotonic() - started
+            return stats
+
+        changed, removed = self._changes(gh_repo, repo, branch, base, head, stats)
+
+        # Files recorded by an interrupted earlier run are already current
+        known = self.state.files(repo, branch)
+        changed = {path: sha for path, sha in changed.items() if known.get(path) != sha}
+
+        for path in removed:
+            if path in known:
+                self._delete_path(repo, branch, path)
+                self.state.remove_file(repo, branch, path)
+                stats.files_removed += 1
+
+        # Chunk maps wait here until every new chunk of the file is upserted
+        pending: Dict[str, Dict[str, str]] = {}
+        files_done = 0
+        progress_lock = threading.Lock()
+
+        def items():
+            for path, _, data in self._fetch(gh_repo, head, changed):
+                yield repo, branch, head, path, data
+
+        def select(path: str, chunks: List[FileChunk]) -> List[FileChunk]:
+            pending[path] = {chunk.id: chunk.payload["hash"] for chunk in chunks}
+            return self._select(repo, branch, head, path, chunks, stats)
+
+        def done(path: str):
+            nonlocal files_done
+            chunks = pending.pop(path)
+            self.state.set_file(repo, branch, path, changed[path], chunks)
+            # Upsert workers finish groups concurrently
+            with progress_lock:
+                files_done += 1
+                if on_progress:
+                    on_progress(files_done, len(changed), len(chunks))
+
+        stats.pipeline = self.pipeline.run(items(), chunk_file, select=select, on_group_done=done)
+
+        self.state.set_commit(repo, branch, head)
+        stats.seconds = time.monotonic() - started
+        return stats
+
+
+def configured_repos() -> List[Tuple[str, str]]:
+    """
+    INDEXER_REPOS="drafted/drafted-web@main,drafted/drafted-mobile"
+    (branch defaults to main)
+    """
+    spec = os.getenv("INDEXER_REPOS")
+    if not spec:
+        org = os.getenv("GITHUB_ORG", "drafted")
+        spec = f"{org}/{os.getenv('GITHUB_DEFAULT_REPO', 'drafted-web')}"
+    repos = []
+    for item in re.split(r"[,\s]+", spec.strip()):
+        if not item:
+            continue
+        name, _, branch = item.partition("@")
+        repos.append((name, branch or "main"))
+    return repos
@@ -0,0 +1,315 @@
+"""
+Indexer runtime: concurrent, resumable source runs
+
+Each source (repos, docs, tickets) runs in its own worker process and
+reports progress over a queue. Runs and per-source checkpoints are kept
+in the indexer state database, so a run interrupted by a crash or
+restart resumes with only the sources that hadn't finished, and each of
+those picks up from its own checkpoint. The runtime supervises from a
+background thread, leaving the scheduler free.
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional, Tuple
+
+from repo_index import DEFAULT_STATE_PATH
+
+
+# Every source DraftedIndexer knows; the service runs the implemented subset
+SOURCES = ("repos", "docs", "tickets")
+
+# Minimum seconds between progress messages from one source
+PROGRESS_INTERVAL = 1.0
+# Seconds between progress summaries in the log
+LOG_INTERVAL = 30.0
+
+
+class RunStore:
+    """Runs, per-source run status and checkpoints (SQLite, multi-process safe)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("INDEXER_STATE_PATH", DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS source_runs (
+                run_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT,
+                error TEXT,
+                PRIMARY KEY (run_id, source)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, key)
+            );
+        """)
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+        return rows
+
+    def unfinished_run(self) -> Optional[str]:
+        rows = self._execute(
+            "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+        )
+        return rows[0][0] if rows else None
+
+    def start_run(self, sources: Tuple[str, ...]) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        self._execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, time.time()))
+        for source in sources:
+            self.set_source(run_id, source, "pending")
+        return run_id
+
+    def finish_run(self, run_id: str):
+        self._execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def source_statuses(self, run_id: str) -> Dict[str, str]:
+        return dict(self._execute("SELECT source, status FROM source_runs WHERE run_id = ?", (run_id,)))
+
+    def set_source(self, run_id: str, source: str, status: str, progress: Optional[Dict] = None, error: Optional[str] = None):
+        self._execute(
+            "INSERT OR REPLACE INTO source_runs (run_id, source, status, progress, error) VALUES (?, ?, ?, ?, ?)",
+            (run_id, source, status, json.dumps(progress) if progress else None, error)
+        )
+
+    def get_checkpoint(self, source: str, key: str) -> Any:
+        rows = self._execute("SELECT value FROM checkpoints WHERE source = ? AND key = ?", (source, key))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set_checkpoint(self, source: str, key: str, value: Any):
+        self._execute(
+            "INSERT OR REPLACE INTO checkpoints (source, key, value, updated_at) VALUES (?, ?, ?, ?)",
+            (source, key, json.dumps(value), time.time())
+        )
+
+
+class Checkpoint:
+    """Durable resume point for one source (cursor, commit, page id, ...)"""
+
+    def __init__(self, store: RunStore, source: str):
+        self.store = store
+        self.source = source
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.store.get_checkpoint(self.source, key)
+        return default if value is None else value
+
+    def set(self, key: str, value: Any):
+        self.store.set_checkpoint(self.source, key, value)
+
+
+class Progress:
+    """Reports a source's progress back to the runtime; throttled"""
+
+    def __init__(self, source: str, channel=None):
+        self.source = source
+        self.channel = channel
+        self.done = 0
+        self.total: Optional[int] = None
+        self.items = 0
+        self.phase = ""
+        self._sent = 0.0
+
+    def update(
+        self,
+        done: Optional[int] = None,
+        total: Optional[int] = None,
+        items: int = 0,
+        phase: Optional[str] = None
+    ):
+        """
+        Args:
+            done/total: Units of work (repos, files, pages) finished/known
+            items: Chunks indexed since the last update (for throughput)
+            phase: Short label of what's running now
+        """
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if phase is not None:
+            self.phase = phase
+        self.items += items
+        now = time.monotonic()
+        if self.channel is not None and now - self._sent >= PROGRESS_INTERVAL:
+            self._sent = now
+            self.channel.put((self.source, "progress", self.snapshot()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"done": self.done, "total": self.total, "items": self.items, "phase": self.phase}
+
+
+def _source_main(source: str, channel):
+    """Worker process entry point: index one source"""
+    # Imported here so spawned workers don't import main twice at top level
+    from main import DraftedIndexer
+
+    progress = Progress(source, channel)
+    try:
+        indexer = DraftedIndexer(setup=False)
+        getattr(indexer, f"index_{source}")(progress=progress, checkpoint=Checkpoint(RunStore(), source))
+        channel.put((source, "done", progress.snapshot()))
+    except BaseException as e:
+        channel.put((source, "failed", {**progress.snapshot(), "error": f"{type(e).__name__}: {e}"}))
+        raise
+
+
+class IndexerRuntime:
+    """
+    Runs sources concurrently in worker processes.
+
+    start() returns immediately; a run already in progress makes it a
+    no-op. An unfinished earlier run is resumed rather than restarted.
+    """
+
+    def __init__(self, sources: Tuple[str, ...] = SOURCES, store: Optional[RunStore] = None):
+        self.sources = tuple(sources)
+        self.store = store or RunStore()
+        self.run_id: Optional[str] = None
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Held for a whole run; the change feed takes it per batch so the
+        # two never index the same state concurrently
+        self.lease = threading.Lock()
+        # spawn: the supervisor is a thread, and forking a threaded process is unsafe
+        self._ctx = mp.get_context("spawn")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Begin (or resume) a run in the background; False if one is active"""
+        if self.running:
+            print(f"Indexer run {self.run_id} still in progress; not starting another")
+            return False
+
+        run_id = self.store.unfinished_run()
+        if run_id:
+            statuses = self.store.source_statuses(run_id)
+            todo = tuple(s for s in self.sources if statuses.get(s) != "done")
+            print(f"Resuming indexer run {run_id}: {', '.join(todo) or 'nothing left'}")
+        else:
+            run_id = self.store.start_run(self.sources)
+            todo = self.sources
+            print(f"Starting indexer run {run_id}: {', '.join(todo)}")
+
+        self.run_id = run_id
+        with self._lock:
+            self._status = {
+                source: {"status": "done" if source not in todo else "pending"} for source in self.sources
+            }
+        self._thread = threading.Thread(target=self._supervise, args=(run_id, todo), daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread:
+            self._thread.join(timeout)
+        return not self.running
+
+    def _supervise(self, run_id: str, sources: Tuple[str, ...]):
+        # Waits out an in-flight change-feed batch
+        with self.lease:
+            self._run(run_id, sources)
+
+    def _run(self, run_id: str, sources: Tuple[str, ...]):
+        channel = self._ctx.Queue()
+        processes = {}
+        for source in sources:
+            # Not daemonic: the ingest pipeline starts its own chunking pool
+            process = self._ctx.Process(target=_source_main, args=(source, channel), name=f"index-{source}")
+            process.start()
+            processes[source] = process
+            self._update(run_id, source, "running", {"started_at": time.time()})
+
+        finished = set()
+        last_log = time.monotonic()
+        while len(finished) < len(processes):
+            try:
+                source, kind, data = channel.get(timeout=1.0)
+                if kind == "progress":
+                    self._update(run_id, source, "running", data)
+                else:
+                    self._update(run_id, source, kind, data, data.get("error"))
+                    finished.add(source)
+            except queue.Empty:
+                pass
+
+            # A worker killed hard (OOM, signal) never reports back
+            for source, process in processes.items():
+                if source not in finished and not process.is_alive() and channel.empty():
+                    self._update(run_id, source, "failed", {}, f"worker exited with code {process.exitcode}")
+                    finished.add(source)
+
+            if time.monotonic() - last_log >= LOG_INTERVAL:
+                last_log = time.monotonic()
+                self.log_status()
+
+        for process in processes.values():
+            process.join()
+
+        self.log_status()
+        if all(s["status"] == "done" for s in self.status().values()):
+            self.store.finish_run(run_id)
+            print(f"Indexer run {run_id} complete")
+        else:
+            print(f"Indexer run {run_id} incomplete; failed sources resume on the next start")
+
+    def _update(self, run_id: str, source: str, status: str, data: Dict[str, Any], error: Optional[str] = None):
+        with self._lock:
+            entry = self._status.setdefault(source, {})
+            entry.update(data)
+            entry["status"] = status
+            entry.setdefault("started_at", time.time())
+            if status in ("done", "failed"):
+                entry["finished_at"] = time.time()
+            if error:
+                entry["error"] = error
+            snapshot = dict(entry)
+        self.store.set_source(run_id, source, status, snapshot, error)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source status, progress and throughput"""
+        now = time.time()
+        with self._lock:
+            result = {}
+            for source, entry in self._status.items():
+                entry = dict(entry)
+                if "started_at" in entry:
+                    elapsed = entry.get("finished_at", now) - entry["started_at"]
+                    entry["elapsed"] = round(elapsed, 1)
+                    entry["items_per_second"] = round(entry.get("items", 0) / elapsed, 2) if elapsed > 0 else 0.0
+                result[source] = entry
+        return result
+
+    def log_status(self):
+        for source, entry in self.status().items():
+            total = entry.get("total")
+            done = f"{entry.get('done', 0)}/{total}" if total is not None else str(entry.get("done", 0))
+            print(
+                f"  {source:<8} {entry['status']:<8} {done:>9} "
+                f"{entry.get('items', 0)} items ({entry.get('items_per_second', 0.0)}/s) {entry.get('phase', '')}"
+                + (f" error: {entry['error']}" if entry.get("error") else "")
+            )
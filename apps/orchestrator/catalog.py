@@ -0,0 +1,220 @@
+"""
+Persona, skill and workflow catalog
+
+Loaded and validated once into an immutable snapshot with each listing
+pre-serialized to JSON and tagged with an ETag. A background task polls
+the workflow directories and swaps in a new snapshot when a file
+changes, so requests never touch the filesystem.
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+
+WORKFLOWS_DIR = os.getenv("WORKFLOWS_DIR", "/app/workflows")
+
+# Listing name -> (directory under WORKFLOWS_DIR, required keys)
+SECTIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "personas": ("personas", ("name", "goal")),
+    "skills": ("skills", ("name", "description")),
+    "workflows": ("templates", ("name", "steps")),
+}
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class CatalogSection:
+    """One listing, ready to serve"""
+    name: str
+    items: Tuple[Mapping[str, Any], ...]
+    paths: Tuple[str, ...]
+    body: bytes
+    etag: str
+    available: bool = True
+    errors: Tuple[str, ...] = ()
+
+    def item_for(self, path: str) -> Optional[Mapping[str, Any]]:
+        for item_path, item in zip(self.paths, self.items):
+            if item_path == path:
+                return item
+        return None
+
+
+@dataclass(frozen=True)
+class Catalog:
+    sections: Mapping[str, CatalogSection]
+    fingerprint: Fingerprint
+    loaded_at: float = field(default_factory=time.time)
+
+    def section(self, name: str) -> CatalogSection:
+        return self.sections[name]
+
+
+def _files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith((".yml", ".yaml"))
+    )
+
+
+def fingerprint(root: str = WORKFLOWS_DIR) -> Fingerprint:
+    """(path, mtime, size) of every catalog file; any edit, add or delete changes it"""
+    entries = []
+    for directory, _ in SECTIONS.values():
+        path = os.path.join(root, directory)
+        if not os.path.isdir(path):
+            continue
+        for file_path in _files(path):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            entries.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _load_section(root: str, name: str, previous: Optional[CatalogSection] = None) -> CatalogSection:
+    directory, required = SECTIONS[name]
+    path = os.path.join(root, directory)
+    documents, paths, errors = [], [], []
+
+    if not os.path.isdir(path):
+        errors.append(f"{path}: directory not found")
+        files = []
+    else:
+        files = _files(path)
+
+    for file_path in files:
+        error = None
+        try:
+            with open(file_path, "r") as f:
+                document = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            error = str(e)
+        else:
+            if not isinstance(document, dict):
+                error = "expected a mapping"
+            else:
+                missing = [key for key in required if key not in document]
+                if missing:
+                    error = f"missing {', '.join(missing)}"
+
+        if error:
+            errors.append(f"{file_path}: {error}")
+            # Keep serving the last valid version (e.g. while it's mid-save)
+            last_good = previous.item_for(file_path) if previous else None
+            if last_good is None:
+                continue
+            document = _thaw(last_good)
+        documents.append(document)
+        paths.append(file_path)
+
+    body = json.dumps({name: documents}, default=str).encode()
+    return CatalogSection(
+        name=name,
+        items=tuple(_freeze(document) for document in documents),
+        paths=tuple(paths),
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        available=os.path.isdir(path),
+        errors=tuple(errors),
+    )
+
+
+def load_catalog(root: str = WORKFLOWS_DIR, previous: Optional[Catalog] = None) -> Catalog:
+    """
+    Load and validate every section.
+
+    Invalid files are reported and skipped, or keep their last valid
+    version from `previous`.
+    """
+    files = fingerprint(root)
+    sections = {}
+    for name in SECTIONS:
+        section = _load_section(root, name, previous.section(name) if previous else None)
+        for error in section.errors:
+            print(f"Catalog: {error}")
+        sections[name] = section
+    return Catalog(sections=MappingProxyType(sections), fingerprint=files)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class CatalogStore:
+    """
+    Holds the current catalog and keeps it fresh.
+
+    Readers take `store.catalog` once per request; reloads build a whole
+    new Catalog and replace the reference, so a request never sees a mix
+    of old and new files.
+    """
+
+    def __init__(self, root: str = WORKFLOWS_DIR, poll_interval: Optional[float] = None):
+        self.root = root
+        self.poll_interval = poll_interval if poll_interval is not None else \
+            float(os.getenv("CATALOG_POLL_SECONDS", "2"))
+        self.catalog = load_catalog(root)
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the files' fingerprint moved; True if swapped"""
+        if fingerprint(self.root) == self.catalog.fingerprint:
+            return False
+        self.catalog = load_catalog(self.root, previous=self.catalog)
+        self.reloads += 1
+        print(f"Catalog reloaded ({', '.join(f'{n}: {len(s.items)}' for n, s in self.catalog.sections.items())})")
+        return True
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                print(f"Catalog reload failed: {e}")
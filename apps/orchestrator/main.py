@@ -1,17 +1,20 @@
 """
 Orchestrator API - LangGraph Brain for Drafted Agents
 """
-import os
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-import yaml
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from catalog import CatalogStore, etag_matches
+
 app = FastAPI(title="Drafted Orchestrator API", version="0.1.0")
 
+# Personas, skills and workflow templates, loaded once and hot-reloaded
+catalog_store = CatalogStore()
+
 
 class TaskRequest(BaseModel):
     """Task request model"""
@@ -87,58 +90,45 @@ async def get_task_status(task_id: str):
     }
 
 
+def serve_catalog(name: str, request: Request) -> Response:
+    """Serve a precomputed catalog listing; 304 when the client's copy is current"""
+    section = catalog_store.catalog.section(name)
+    if not section.available:
+        raise HTTPException(status_code=500, detail="; ".join(section.errors))
+    
+    headers = {"ETag": section.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), section.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=section.body, media_type="application/json", headers=headers)
+
+
+@app.on_event("startup")
+async def watch_catalog():
+    """Reload the catalog when workflow files change"""
+    catalog_store.start()
+
+
+@app.on_event("shutdown")
+async def stop_catalog():
+    await catalog_store.stop()
+
+
 @app.get("/personas")
-async def list_personas():
+async def list_personas(request: Request):
     """List available personas"""
-    personas_dir = "/app/workflows/personas"
-    personas = []
-    
-    try:
-        for filename in os.listdir(personas_dir):
-            if filename.endswith('.yml'):
-                with open(os.path.join(personas_dir, filename), 'r') as f:
-                    persona = yaml.safe_load(f)
-                    personas.append(persona)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    return {"personas": personas}
+    return serve_catalog("personas", request)
 
 
 @app.get("/skills")
-async def list_skills():
+async def list_skills(request: Request):
     """List available skills"""
-    skills_dir = "/app/workflows/skills"
-    skills = []
-    
-    try:
-        for filename in os.listdir(skills_dir):
-            if filename.endswith('.yml'):
-                with open(os.path.join(skills_dir, filename), 'r') as f:
-                    skill = yaml.safe_load(f)
-                    skills.append(skill)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    return {"skills": skills}
+    return serve_catalog("skills", request)
 
 
 @app.get("/workflows")
-async def list_workflows():
+async def list_workflows(request: Request):
     """List available workflow templates"""
-    workflows_dir = "/app/workflows/templates"
-    workflows = []
-    
-    try:
-        for filename in os.listdir(workflows_dir):
-            if filename.endswith('.yml'):
-                with open(os.path.join(workflows_dir, filename), 'r') as f:
-                    workflow = yaml.safe_load(f)
-                    workflows.append(workflow)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    return {"workflows": workflows}
+    return serve_catalog("workflows", request)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Local fake OpenHands server for exercising the executor supervisor
+
+Implements the run API OpenHandsExecutor talks to. Each run is queued
+briefly, "works" for --duration seconds while emitting log lines, then
+completes with a canned patch and PR URL.
+
+Usage:
+    python scripts/fake_openhands.py --port 8000 --duration 20
+    python scripts/fake_openhands.py --no-stream      # force the polling fallback
+    python scripts/fake_openhands.py --fail-rate 0.3  # some runs fail
+
+    OPENHANDS_URL=http://localhost:8000 python -m src.openhands.supervisor
+"""
+
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from typing import Dict, Any
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+
+app = FastAPI(title="Fake OpenHands")
+runs: Dict[str, Dict[str, Any]] = {}
+settings = argparse.Namespace(duration=10.0, queue_delay=1.0, no_stream=False, fail_rate=0.0)
+
+
+def _status(run: Dict[str, Any]) -> str:
+    if run["status"] == "cancelled":
+        return "cancelled"
+    elapsed = time.monotonic() - run["created"]
+    if elapsed < settings.queue_delay:
+        return "queued"
+    if elapsed < settings.queue_delay + settings.duration:
+        return "running"
+    return "failed" if run["fails"] else "completed"
+
+
+def _run(run_id: str) -> Dict[str, Any]:
+    run = runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return run
+
+
+@app.post("/api/runs")
+async def create_run(request: Request):
+    task = await request.json()
+    run_id = uuid.uuid4().hex[:12]
+    runs[run_id] = {
+        "task": task,
+        "created": time.monotonic(),
+        "status": "queued",
+        "fails": random.random() < settings.fail_rate,
+    }
+    return {"run_id": run_id}
+
+
+@app.get("/api/runs/{run_id}")
+async def get_run(run_id: str):
+    run = _run(run_id)
+    return {"run_id": run_id, "status": _status(run)}
+
+
+@app.get("/api/runs/{run_id}/logs")
+async def run_logs(run_id: str):
+    if settings.no_stream:
+        raise HTTPException(status_code=404, detail="Log streaming not available")
+    run = _run(run_id)
+
+    async def lines():
+        step = 0
+        while _status(run) in ("queued", "running"):
+            yield f"[{_status(run)}] step {step}: working on {run['task'].get('repository')}\n"
+            step += 1
+            await asyncio.sleep(0.5)
+        yield f"[{_status(run)}] done\n"
+
+    return StreamingResponse(lines(), media_type="text/plain")
+
+
+@app.get("/api/runs/{run_id}/artifacts")
+async def run_artifacts(run_id: str):
+    run = _run(run_id)
+    if _status(run) != "completed":
+        return {"logs": [f"run {_status(run)}"]}
+    repo = run["task"].get("repository", "example/repo")
+    return {
+        "patch": "diff --git a/README.md b/README.md\n+Fixed by fake OpenHands\n",
+        "pr_url": f"https://github.com/{repo}/pull/{random.randint(100, 999)}",
+        "logs": ["cloned", "edited README.md", "tests passed"],
+        "test_report": {"passed": True, "total": 3, "failed": 0},
+        "files_changed": ["README.md"],
+    }
+
+
+@app.post("/api/runs/{run_id}/cancel")
+async def cancel_run(run_id: str):
+    _run(run_id)["status"] = "cancelled"
+    return {"run_id": run_id, "status": "cancelled"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds each run spends running")
+    parser.add_argument("--queue-delay", type=float, default=1.0, help="Seconds each run spends queued")
+    parser.add_argument("--no-stream", action="store_true", help="404 the log stream (polling fallback)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of runs that fail")
+    args = parser.parse_args()
+
+    settings.duration = args.duration
+    settings.queue_delay = args.queue_delay
+    settings.no_stream = args.no_stream
+    settings.fail_rate = args.fail_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
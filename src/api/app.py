@@ -3,15 +3,21 @@ FastAPI application - Job submission and status API
 """
 
 import os
+import json
 import uuid
+import asyncio
 from datetime import datetime
 from typing import Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 import redis
 from rq import Queue
 
 from src.interfaces import TaskContext
+from src.tools.github_cache import GitHubCache, verify_signature, replay_missed_deliveries
+from src.tools import netlify_events
+from src.tools import index_events
+from src.openhands.supervisor import resume_job_id
 
 
 # Initialize FastAPI
@@ -26,6 +32,9 @@ redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
 redis_conn = redis.from_url(redis_url)
 job_queue = Queue("agent-jobs", connection=redis_conn)
 
+# Webhook-fed GitHub cache shared with workers through Redis
+github_cache = GitHubCache(redis_url=redis_url)
+
 
 # Request/Response models
 class JobRequest(BaseModel):
@@ -50,6 +59,7 @@ class JobStatus(BaseModel):
     job_id: str
     status: str
     result: Optional[dict] = None
+    executor_run: Optional[dict] = None
     error: Optional[str] = None
     created_at: Optional[str] = None
     started_at: Optional[str] = None
@@ -82,6 +92,16 @@ async def health():
     }
 
 
+@app.get("/stats/prefetch")
+async def prefetch_metrics():
+    """Speculative prefetch hit/waste counters across jobs"""
+    from src.worker.prefetch import prefetch_stats
+    try:
+        return prefetch_stats(redis_url)
+    except redis.RedisError as e:
+        raise HTTPException(status_code=503, detail=f"Redis unavailable: {str(e)}")
+
+
 @app.post("/jobs", response_model=JobResponse)
 async def create_job(job_request: JobRequest):
     """
@@ -125,6 +145,7 @@ async def get_job_status(job_id: str):
     Get status of a job.
     """
     from rq.job import Job
+    from rq.exceptions import NoSuchJobError
     
     try:
         job = Job.fetch(job_id, connection=redis_conn)
@@ -137,11 +158,37 @@ async def get_job_status(job_id: str):
             "canceled": "cancelled"
         }
         
+        status = status_map.get(job.get_status(), "unknown")
+        result = job.result if job.is_finished else None
+        error = str(job.exc_info) if job.is_failed else None
+        executor_run = job.meta.get("executor_run")
+        if isinstance(result, dict) and result.get("status") == "awaiting_executor":
+            # Handed to the executor supervisor; still running until it
+            # reports back, and then until the continuation it queued ends
+            status = "running"
+            if executor_run:
+                try:
+                    resume = Job.fetch(resume_job_id(job_id, executor_run["request_id"]), connection=redis_conn)
+                except NoSuchJobError:
+                    # Nothing left to run after the executor
+                    status = "completed" if executor_run.get("status") == "completed" else "failed"
+                else:
+                    if resume.is_finished:
+                        result = resume.result
+                        if not (isinstance(result, dict) and result.get("status") == "awaiting_executor"):
+                            status = "completed"
+                    elif resume.is_failed:
+                        status = "failed"
+                        error = str(resume.exc_info)
+                    elif resume.get_status() == "canceled":
+                        status = "cancelled"
+        
         return JobStatus(
             job_id=job_id,
-            status=status_map.get(job.get_status(), "unknown"),
-            result=job.result if job.is_finished else None,
-            error=str(job.exc_info) if job.is_failed else None,
+            status=status,
+            result=result,
+            executor_run=executor_run,
+            error=error,
             created_at=job.created_at.isoformat() if job.created_at else None,
             started_at=job.started_at.isoformat() if job.started_at else None,
             ended_at=job.ended_at.isoformat() if job.ended_at else None
@@ -178,6 +225,88 @@ async def list_jobs(limit: int = 10):
     return {"jobs": jobs[:limit]}
 
 
+@app.post("/webhooks/github")
+async def github_webhook(request: Request):
+    """
+    Receive GitHub webhooks (issues, pull_request, push).
+    
+    Keeps the shared GitHub cache current so jobs don't re-fetch state,
+    and queues the changes for the indexer.
+    """
+    body = await request.body()
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+    if not verify_signature(secret, body, request.headers.get("X-Hub-Signature-256")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    event = request.headers.get("X-GitHub-Event", "")
+    delivery_id = request.headers.get("X-GitHub-Delivery", "")
+    
+    if event == "ping":
+        # Recorded so startup replay doesn't ask for it again
+        if delivery_id:
+            github_cache.mark_delivery(delivery_id)
+        return {"status": "pong"}
+    
+    if delivery_id and github_cache.seen_delivery(delivery_id):
+        return {"status": "duplicate", "delivery": delivery_id}
+    
+    payload = json.loads(body)
+    handled = github_cache.apply_event(event, payload)
+    try:
+        queued = len(index_events.publish_changes(redis_conn, index_events.github_changes(event, payload)))
+    except redis.RedisError as e:
+        # The nightly sweep reconciles anything missed here
+        print(f"Failed to queue index changes: {e}")
+        queued = 0
+    if delivery_id:
+        github_cache.mark_delivery(delivery_id)
+    
+    return {"status": "applied" if handled else "ignored", "event": event, "index_changes": queued}
+
+
+@app.post("/webhooks/github/replay")
+async def replay_github_webhooks():
+    """Request redelivery of GitHub webhooks we never processed"""
+    try:
+        requested = await replay_missed_deliveries(github_cache)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Replay failed: {str(e)}")
+    
+    return {"redeliveries_requested": requested}
+
+
+@app.post("/webhooks/netlify")
+async def netlify_webhook(request: Request):
+    """
+    Receive Netlify deploy notifications (created/building/ready/error).
+    
+    Each deploy is re-published on Redis so waiting jobs resolve immediately.
+    """
+    body = await request.body()
+    secret = os.getenv("NETLIFY_WEBHOOK_SECRET", "")
+    if not netlify_events.verify_signature(secret, body, request.headers.get("X-Webhook-Signature")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    deploy = json.loads(body)
+    if not deploy.get("id") or not deploy.get("site_id"):
+        raise HTTPException(status_code=400, detail="Payload is not a deploy")
+    
+    subscribers = netlify_events.publish_deploy_event(redis_conn, deploy)
+    return {"status": "published", "state": deploy.get("state"), "subscribers": subscribers}
+
+
+@app.on_event("startup")
+async def replay_on_startup():
+    """Catch up on deliveries missed while the API was down"""
+    async def _replay():
+        try:
+            await replay_missed_deliveries(github_cache)
+        except Exception as e:
+            print(f"GitHub webhook replay failed: {e}")
+    
+    asyncio.create_task(_replay())
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 7000))
@@ -0,0 +1,41 @@
+"""OpenHands runtime configuration (runtimes/openhands/config.yml)"""
+
+import os
+import re
+from typing import Dict, Any, Optional
+
+import yaml
+
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "runtimes", "openhands", "config.yml"
+)
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Parsed runtime config; empty if the file isn't there"""
+    path = path or os.getenv("OPENHANDS_CONFIG", DEFAULT_CONFIG_PATH)
+    try:
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def parse_duration(value: Any, default: float) -> float:
+    """Seconds from "30m" / "90s" / "2h" / a bare number"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value))
+    if not match:
+        return default
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def run_timeout(config: Dict[str, Any]) -> float:
+    """Sandbox run timeout (sandbox.resources.timeout)"""
+    resources = (config.get("sandbox") or {}).get("resources") or {}
+    return parse_duration(resources.get("timeout"), 1800.0)
@@ -2,8 +2,10 @@
 
 import os
 import httpx
-from typing import Dict, Any, AsyncIterator
+from dataclasses import asdict
+from typing import Dict, Any, AsyncIterator, Optional
 from src.interfaces import Executor, ExecutorStatus, ExecutorArtifacts
+from src.openhands.pool import WarmPool, Workspace
 
 
 class OpenHandsExecutor(Executor):
@@ -12,11 +14,18 @@ class OpenHandsExecutor(Executor):
     
     Implements the standard Executor interface.
     Can be swapped with ClaudeCodeExecutor or CodexExecutor later.
+    
+    With a WarmPool, runs start in a pre-warmed workspace when one is
+    ready; release() removes it once the run is over. workspace_of()
+    describes it for the caller to persist, since a restarted process
+    no longer knows which run had which workspace.
     """
     
-    def __init__(self, url: str = None):
+    def __init__(self, url: str = None, pool: Optional[WarmPool] = None):
         self.url = url or os.getenv("OPENHANDS_URL", "http://localhost:8000")
         self.client = httpx.AsyncClient(base_url=self.url, timeout=300.0)
+        self.pool = pool
+        self._workspaces: Dict[str, Workspace] = {}
     
     @property
     def name(self) -> str:
@@ -31,21 +40,38 @@ class OpenHandsExecutor(Executor):
                 "repo": "drafted/drafted-web",
                 "instruction": "Fix the mobile layout bug",
                 "constraints": ["no breaking changes", "add tests"],
-                "branch_base": "main"
+                "branch_base": "main"  # optional; the repo's default branch
             }
         
         Returns:
             run_id for tracking
         """
-        response = await self.client.post("/api/runs", json={
+        branch_base = task.get("branch_base")
+        workspace = self.pool.acquire(task["repo"], branch_base) if self.pool else None
+        if not branch_base:
+            default = self.pool.default_branch(task["repo"]) if self.pool else None
+            branch_base = workspace.branch if workspace else default or "main"
+        
+        payload = {
             "repository": task["repo"],
             "instruction": task["instruction"],
             "constraints": task.get("constraints", []),
-            "branch_base": task.get("branch_base", "main"),
-        })
-        response.raise_for_status()
+            "branch_base": branch_base,
+        }
+        if workspace:
+            payload["workspace"] = workspace.describe()
+        
+        try:
+            response = await self.client.post("/api/runs", json=payload)
+            response.raise_for_status()
+        except Exception:
+            if workspace:
+                await self.pool.discard(workspace)
+            raise
         
         data = response.json()
+        if workspace:
+            self._workspaces[data["run_id"]] = workspace
         return data["run_id"]
     
     async def get_status(self, run_id: str) -> ExecutorStatus:
@@ -70,6 +96,7 @@ class OpenHandsExecutor(Executor):
     async def stream_logs(self, run_id: str) -> AsyncIterator[str]:
         """Stream logs from the executor"""
         async with self.client.stream("GET", f"/api/runs/{run_id}/logs") as response:
+            response.raise_for_status()
             async for line in response.aiter_lines():
                 yield line
     
@@ -98,6 +125,25 @@ class OpenHandsExecutor(Executor):
         except Exception:
             return False
     
+    def workspace_of(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """The warm workspace `run_id` started in, as a plain dict (None if cold)"""
+        workspace = self._workspaces.get(run_id)
+        return asdict(workspace) if workspace else None
+    
+    async def release(self, run_id: str, workspace: Optional[Dict[str, Any]] = None):
+        """
+        Remove the warm workspace a finished run used, if any.
+        
+        Args:
+            workspace: workspace_of() for the run, for runs started
+                       before this process did
+        """
+        used = self._workspaces.pop(run_id, None)
+        if used is None and workspace and self.pool:
+            used = Workspace(**workspace)
+        if used:
+            await self.pool.discard(used)
+    
     async def close(self):
         """Close the HTTP client"""
         await self.client.aclose()
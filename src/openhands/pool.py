@@ -0,0 +1,434 @@
+"""
+Warm workspace pool
+
+Cold OpenHands runs spend minutes cloning and installing dependencies
+before doing any work. The pool keeps `size_per_repo` workspaces per
+allowed repo ready ahead of time. Each is checked out at the latest
+default-branch commit with dependencies installed, so start() can take
+one instantly. Taken workspaces are replaced in the background, and
+idle ones are fast-forwarded when the default branch moves.
+
+Workspaces are created through a Sandbox. LocalProcessSandbox builds
+them with git and the package managers on the local machine, which is
+enough for development and tests.
+"""
+
+import os
+import sys
+import time
+import uuid
+import base64
+import shutil
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Deque, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from src.openhands.config import load_config, parse_duration
+
+
+# (lockfile, tool, command); the first matching JavaScript entry wins
+JS_INSTALLERS = [
+    ("pnpm-lock.yaml", "pnpm", ["pnpm", "install", "--frozen-lockfile"]),
+    ("yarn.lock", "yarn", ["yarn", "install", "--frozen-lockfile"]),
+    ("package-lock.json", "npm", ["npm", "ci"]),
+    ("package.json", "npm", ["npm", "install"]),
+]
+PYTHON_LOCKFILES = ["requirements.txt", "pyproject.toml"]
+
+# Workspaces built at once across all repos
+WARM_CONCURRENCY = 2
+
+# The only environment git and the package managers see: install scripts
+# are repo-controlled, so tokens and API keys must not reach them
+ENV_ALLOWLIST = [
+    "PATH", "HOME", "USER", "LANG", "LC_ALL", "TMPDIR", "TZ",
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "no_proxy",
+    "SSL_CERT_FILE", "SSL_CERT_DIR",
+    "NPM_CONFIG_CACHE", "NPM_CONFIG_REGISTRY", "YARN_CACHE_FOLDER", "PNPM_HOME", "PNPM_STORE_DIR",
+    "PIP_CACHE_DIR", "PIP_INDEX_URL", "PIP_EXTRA_INDEX_URL",
+]
+
+
+def _without_credentials(url: str) -> str:
+    """`url` minus any user:password@ part"""
+    parts = urlsplit(url)
+    if "@" not in parts.netloc:
+        return url
+    return urlunsplit(parts._replace(netloc=parts.netloc.rsplit("@", 1)[1]))
+
+
+@dataclass
+class Workspace:
+    """A checked-out, dependency-installed repository"""
+    id: str
+    repo: str
+    branch: str
+    commit: str
+    path: str
+    lock_hash: str
+    created_at: float = field(default_factory=time.time)
+    warm_seconds: float = 0.0
+
+    def describe(self) -> Dict[str, Any]:
+        return {"id": self.id, "path": self.path, "branch": self.branch, "commit": self.commit}
+
+
+class Sandbox(ABC):
+    """Where workspaces live (local processes, containers, remote VMs)"""
+
+    @abstractmethod
+    async def head(self, repo: str) -> Tuple[str, str]:
+        """(default branch, latest commit) of the remote"""
+        pass
+
+    @abstractmethod
+    async def create(self, repo: str, branch: str, commit: str) -> Workspace:
+        """Check out `commit` and install dependencies"""
+        pass
+
+    @abstractmethod
+    async def refresh(self, workspace: Workspace, commit: str) -> Workspace:
+        """Move an idle workspace to `commit`, reinstalling only if lockfiles changed"""
+        pass
+
+    @abstractmethod
+    async def destroy(self, workspace: Workspace):
+        pass
+
+
+class LocalProcessSandbox(Sandbox):
+    """
+    Workspaces as directories under `root`, built with local processes.
+
+    Args:
+        root: Directory holding every workspace
+        allowed_commands: Package managers that may run (config allowed_commands)
+        git_url: Remote URL template, "{repo}" replaced by owner/name
+        timeout: Seconds allowed for one command
+
+    GITHUB_TOKEN is sent as an HTTP header on the git commands that talk
+    to github.com, never written into the URL or the workspace's config.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        allowed_commands: Optional[List[str]] = None,
+        git_url: Optional[str] = None,
+        timeout: float = 900.0
+    ):
+        self.root = root
+        self.allowed = set(allowed_commands) if allowed_commands is not None else None
+        self.timeout = timeout
+        self.git_url = git_url or "https://github.com/{repo}.git"
+        self.token = os.getenv("GITHUB_TOKEN")
+
+    def _allowed(self, tool: str) -> bool:
+        return self.allowed is None or tool in self.allowed
+
+    def _auth_env(self) -> Dict[str, str]:
+        """Git config for one command, passed through the environment to stay out of argv"""
+        if not self.token:
+            return {}
+        credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+        return {
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.https://github.com/.extraHeader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        }
+
+    async def _exec(self, *argv: str, cwd: Optional[str] = None, auth: bool = False) -> str:
+        env = {name: os.environ[name] for name in ENV_ALLOWLIST if name in os.environ}
+        env.update({"GIT_TERMINAL_PROMPT": "0", "CI": "1"})
+        if auth:
+            env.update(self._auth_env())
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(f"{argv[0]} timed out after {self.timeout:.0f}s")
+        if process.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv[:3])} failed: {stderr.decode(errors='replace')[-500:]}")
+        return stdout.decode(errors="replace")
+
+    async def head(self, repo: str) -> Tuple[str, str]:
+        output = await self._exec("git", "ls-remote", "--symref", self.git_url.format(repo=repo), "HEAD", auth=True)
+        branch, commit = "main", None
+        for line in output.splitlines():
+            if line.startswith("ref: refs/heads/"):
+                branch = line[len("ref: refs/heads/"):].split("\t")[0]
+            elif line.endswith("\tHEAD"):
+                commit = line.split("\t")[0]
+        if not commit:
+            raise RuntimeError(f"No HEAD for {repo}")
+        return branch, commit
+
+    def _lock_hash(self, path: str) -> str:
+        digest = hashlib.sha256()
+        for name in [lockfile for lockfile, _, _ in JS_INSTALLERS] + PYTHON_LOCKFILES:
+            file_path = os.path.join(path, name)
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    digest.update(name.encode() + b"\0" + f.read())
+        return digest.hexdigest()
+
+    async def _install(self, path: str):
+        for lockfile, tool, command in JS_INSTALLERS:
+            if os.path.exists(os.path.join(path, lockfile)):
+                if self._allowed(tool):
+                    await self._exec(*command, cwd=path)
+                break
+
+        if self._allowed("pip"):
+            venv_pip = os.path.join(path, ".venv", "bin", "pip")
+            if os.path.exists(os.path.join(path, "requirements.txt")):
+                await self._exec(sys.executable, "-m", "venv", ".venv", cwd=path)
+                await self._exec(venv_pip, "install", "-q", "-r", "requirements.txt", cwd=path)
+            elif os.path.exists(os.path.join(path, "pyproject.toml")):
+                await self._exec(sys.executable, "-m", "venv", ".venv", cwd=path)
+                await self._exec(venv_pip, "install", "-q", "-e", ".", cwd=path)
+
+    async def create(self, repo: str, branch: str, commit: str) -> Workspace:
+        started = time.monotonic()
+        workspace_id = uuid.uuid4().hex[:12]
+        path = os.path.join(self.root, repo.replace("/", "__"), workspace_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            url = self.git_url.format(repo=repo)
+            await self._exec("git", "clone", "--quiet", "--depth", "1", "--branch", branch, url, path, auth=True)
+            # Runs get the workspace as-is; no credentials may stay in .git/config
+            await self._exec("git", "remote", "set-url", "origin", _without_credentials(url), cwd=path)
+            commit = (await self._exec("git", "rev-parse", "HEAD", cwd=path)).strip()
+            await self._install(path)
+        except BaseException:
+            await asyncio.to_thread(shutil.rmtree, path, True)
+            raise
+        return Workspace(
+            id=workspace_id,
+            repo=repo,
+            branch=branch,
+            commit=commit,
+            path=path,
+            lock_hash=self._lock_hash(path),
+            warm_seconds=time.monotonic() - started,
+        )
+
+    async def refresh(self, workspace: Workspace, commit: str) -> Workspace:
+        started = time.monotonic()
+        path = workspace.path
+        # origin carries no credentials, so fetch from the configured URL
+        await self._exec(
+            "git", "fetch", "--quiet", "--depth", "1", self.git_url.format(repo=workspace.repo), workspace.branch,
+            cwd=path, auth=True
+        )
+        await self._exec("git", "reset", "--quiet", "--hard", "FETCH_HEAD", cwd=path)
+        # Keep installed dependencies; drop anything else untracked
+        await self._exec("git", "clean", "-fdq", "-e", "node_modules", "-e", ".venv", cwd=path)
+        lock_hash = self._lock_hash(path)
+        if lock_hash != workspace.lock_hash:
+            await self._install(path)
+        workspace.commit = (await self._exec("git", "rev-parse", "HEAD", cwd=path)).strip()
+        workspace.lock_hash = lock_hash
+        workspace.warm_seconds += time.monotonic() - started
+        return workspace
+
+    async def destroy(self, workspace: Workspace):
+        await asyncio.to_thread(shutil.rmtree, workspace.path, True)
+
+
+class WarmPool:
+    """
+    Ready workspaces per repo, refilled in the background.
+
+    Args:
+        sandbox: Builds and removes workspaces
+        repos: Repos to keep warm ("owner/name")
+        size: Ready workspaces per repo
+        refresh_interval: Seconds between default-branch checks
+    """
+
+    def __init__(self, sandbox: Sandbox, repos: List[str], size: int = 2, refresh_interval: float = 300.0):
+        self.sandbox = sandbox
+        self.repos = list(repos)
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self._ready: Dict[str, Deque[Workspace]] = {repo: deque() for repo in self.repos}
+        self._heads: Dict[str, Tuple[str, str]] = {}
+        self._checked: Dict[str, float] = {}
+        self._building: Dict[str, int] = {repo: 0 for repo in self.repos}
+        self._wake = asyncio.Event()
+        self._builds = asyncio.Semaphore(WARM_CONCURRENCY)
+        self._tasks: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["WarmPool"]:
+        """Pool for runtimes/openhands/config.yml allowed_repos; None if disabled"""
+        config = config if config is not None else load_config()
+        settings = config.get("pool") or {}
+        if not settings.get("enabled") or not config.get("allowed_repos"):
+            return None
+        sandbox = LocalProcessSandbox(
+            root=os.getenv("POOL_WORKSPACE_ROOT", settings.get("workspace_root", "/workspace/pool")),
+            allowed_commands=config.get("allowed_commands"),
+            git_url=os.getenv("POOL_GIT_URL"),
+            timeout=parse_duration(settings.get("warm_timeout"), 900.0),
+        )
+        return cls(
+            sandbox,
+            config["allowed_repos"],
+            size=int(settings.get("size_per_repo", 2)),
+            refresh_interval=parse_duration(settings.get("refresh_interval"), 300.0),
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._maintain())
+
+    async def stop(self):
+        """Stop refilling and remove idle workspaces"""
+        for task in [self._task, *self._tasks]:
+            if task:
+                task.cancel()
+        await asyncio.gather(*(t for t in [self._task, *self._tasks] if t), return_exceptions=True)
+        self._task = None
+        for ready in self._ready.values():
+            while ready:
+                await self.sandbox.destroy(ready.popleft())
+
+    # ------------------------------------------------------------------
+    # Hand-out
+    # ------------------------------------------------------------------
+
+    def acquire(self, repo: str, branch: Optional[str] = None) -> Optional[Workspace]:
+        """
+        A ready workspace at the latest known commit, or None (cold start).
+
+        Workspaces track the default branch, so a run based on any other
+        `branch` always starts cold. No `branch` means the default branch.
+        """
+        ready = self._ready.get(repo)
+        head = self._heads.get(repo)
+        workspace = None
+        if ready:
+            for candidate in ready:
+                if branch and candidate.branch != branch:
+                    break
+                if head is None or candidate.commit == head[1]:
+                    workspace = candidate
+                    break
+            if workspace:
+                ready.remove(workspace)
+
+        if workspace:
+            self.hits += 1
+        elif repo in self._ready:
+            self.misses += 1
+        self._wake.set()
+        return workspace
+
+    def default_branch(self, repo: str) -> Optional[str]:
+        """`repo`'s default branch as of the last check (None before the first)"""
+        head = self._heads.get(repo)
+        return head[0] if head else None
+
+    async def discard(self, workspace: Workspace):
+        """Remove a used workspace (runs leave them dirty)"""
+        await self.sandbox.destroy(workspace)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def _maintain(self):
+        while True:
+            for repo in self.repos:
+                try:
+                    await self._check_head(repo)
+                except Exception as e:
+                    print(f"Pool: couldn't check {repo}: {e}")
+                    continue
+                missing = self.size - len(self._ready[repo]) - self._building[repo]
+                for _ in range(max(missing, 0)):
+                    self._spawn(self._warm(repo))
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _check_head(self, repo: str):
+        if time.monotonic() - self._checked.get(repo, 0.0) < self.refresh_interval and repo in self._heads:
+            return
+        head = await self.sandbox.head(repo)
+        self._checked[repo] = time.monotonic()
+        if self._heads.get(repo) != head:
+            self._heads[repo] = head
+            stale = [w for w in self._ready[repo] if w.commit != head[1]]
+            for workspace in stale:
+                self._ready[repo].remove(workspace)
+                self._building[repo] += 1
+                self._spawn(self._refresh(workspace, head))
+
+    async def _warm(self, repo: str):
+        self._building[repo] += 1
+        try:
+            async with self._builds:
+                branch, commit = self._heads[repo]
+                workspace = await self.sandbox.create(repo, branch, commit)
+            self._ready[repo].append(workspace)
+            print(f"Pool: warmed {repo}@{workspace.commit[:8]} in {workspace.warm_seconds:.1f}s")
+        except Exception as e:
+            self.failures += 1
+            print(f"Pool: warming {repo} failed: {e}")
+        finally:
+            self._building[repo] -= 1
+
+    async def _refresh(self, workspace: Workspace, head: Tuple[str, str]):
+        try:
+            async with self._builds:
+                workspace = await self.sandbox.refresh(workspace, head[1])
+            self._ready[workspace.repo].append(workspace)
+        except Exception as e:
+            self.failures += 1
+            print(f"Pool: refreshing {workspace.repo} failed, replacing it: {e}")
+            await self.sandbox.destroy(workspace)
+            self._wake.set()
+        finally:
+            self._building[workspace.repo] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "ready": {repo: len(ready) for repo, ready in self._ready.items()},
+            "building": dict(self._building),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "failures": self.failures,
+        }
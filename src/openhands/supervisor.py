@@ -0,0 +1,372 @@
+"""
+Executor run supervisor
+
+Jobs hand executor runs (OpenHands sandboxes) to this service instead of
+waiting on them in a worker slot. One event loop tracks every run:
+logs are followed through `stream_logs` where the executor supports it,
+with status polling that backs off while nothing changes as the
+fallback. Sandboxes are capped per executor; runs beyond the cap wait
+their turn here rather than in a worker. When a run finishes, its
+artifacts are attached to the owning RQ job and a continuation job is
+queued to run the job's remaining skills.
+
+    python -m src.openhands.supervisor
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+from collections import deque
+from dataclasses import asdict
+from typing import Dict, Any, Optional
+
+import httpx
+import redis
+import redis.asyncio as aioredis
+from rq import Queue
+from rq.job import Job
+from rq.exceptions import NoSuchJobError
+
+from src.interfaces import Executor, ExecutorStatus
+from src.openhands.config import load_config, run_timeout
+
+
+PENDING_KEY = "executor:runs:pending"
+PROCESSING_KEY = "executor:runs:processing"
+RECORD_PREFIX = "executor:run"
+RECORD_TTL = 7 * 24 * 3600
+
+# Continuation jobs land on the workers' queue
+JOB_QUEUE = "agent-jobs"
+RESUME_FUNCTION = "src.worker.processor.resume_job"
+
+TERMINAL = {ExecutorStatus.COMPLETED, ExecutorStatus.FAILED, ExecutorStatus.CANCELLED}
+
+POLL_MIN = 1.0
+POLL_MAX = 30.0
+POLL_BACKOFF = 1.5
+# Consecutive status errors before a run is given up on
+MAX_STATUS_ERRORS = 10
+# Log lines kept with the run record
+LOG_TAIL = 200
+SAVE_INTERVAL = 5.0
+
+
+def record_key(request_id: str) -> str:
+    return f"{RECORD_PREFIX}:{request_id}"
+
+
+def submit_run(
+    redis_conn: redis.Redis,
+    job_id: str,
+    executor: str,
+    task: Dict[str, Any],
+    resume: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Queue an executor run for the supervisor.
+
+    Args:
+        job_id: Owning RQ job; receives the artifacts
+        executor: Executor name ("openhands")
+        task: Executor task (repo, instruction, constraints, branch_base)
+        resume: Arguments for the continuation job (context, remaining skills)
+
+    Returns:
+        request_id for get_run()
+    """
+    request_id = uuid.uuid4().hex
+    record = {
+        "request_id": request_id,
+        "job_id": job_id,
+        "executor": executor,
+        "task": task,
+        "resume": resume,
+        "status": "pending",
+        "submitted_at": time.time(),
+    }
+    pipe = redis_conn.pipeline()
+    pipe.set(record_key(request_id), json.dumps(record, default=str), ex=RECORD_TTL)
+    pipe.lpush(PENDING_KEY, request_id)
+    pipe.execute()
+    return request_id
+
+
+def resume_job_id(job_id: str, request_id: str) -> str:
+    """RQ job id of the continuation queued after run `request_id`"""
+    return f"{job_id}-resume-{request_id}"
+
+
+def get_run(redis_conn: redis.Redis, request_id: str) -> Optional[Dict[str, Any]]:
+    raw = redis_conn.get(record_key(request_id))
+    return json.loads(raw) if raw else None
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """'openhands=3,claude_code=1' -> {"openhands": 3, "claude_code": 1}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+class RunSupervisor:
+    """
+    Drives executor runs to completion.
+
+    Args:
+        executors: Executors by name
+        limits: Concurrent sandboxes per executor (default_limit otherwise)
+        timeout: Seconds before a run is cancelled
+    """
+
+    def __init__(
+        self,
+        executors: Dict[str, Executor],
+        redis_url: Optional[str] = None,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 2,
+        timeout: Optional[float] = None
+    ):
+        self.executors = executors
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis = aioredis.from_url(self.redis_url)
+        limits = limits if limits is not None else parse_limits(os.getenv("SUPERVISOR_MAX_RUNS", ""))
+        self.limits = {name: limits.get(name, default_limit) for name in executors}
+        self.timeout = timeout if timeout is not None else run_timeout(load_config())
+        self._slots = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+        self._runs: Dict[str, asyncio.Task] = {}
+        self._active: Dict[str, int] = {name: 0 for name in executors}
+        self._stopping = asyncio.Event()
+
+    # ------------------------------------------------------------------
+    # Intake
+    # ------------------------------------------------------------------
+
+    async def run(self):
+        """Adopt runs left by a previous instance, then take new ones until stopped"""
+        for request_id in await self.redis.lrange(PROCESSING_KEY, 0, -1):
+            self._track(request_id.decode())
+
+        while not self._stopping.is_set():
+            try:
+                # Moved atomically, so a crash here never loses a request
+                request_id = await self.redis.blmove(PENDING_KEY, PROCESSING_KEY, 1, "RIGHT", "LEFT")
+            except redis.RedisError as e:
+                print(f"Supervisor intake failed: {e}")
+                await asyncio.sleep(5.0)
+                continue
+            if request_id:
+                self._track(request_id.decode())
+
+    def _track(self, request_id: str):
+        if request_id in self._runs:
+            return
+        task = asyncio.create_task(self._supervise(request_id))
+        self._runs[request_id] = task
+        task.add_done_callback(lambda _: self._runs.pop(request_id, None))
+
+    async def stop(self):
+        """Stop taking runs; in-flight runs are adopted again on restart"""
+        self._stopping.set()
+        for task in list(self._runs.values()):
+            task.cancel()
+        await asyncio.gather(*self._runs.values(), return_exceptions=True)
+        await self.redis.aclose()
+
+    # ------------------------------------------------------------------
+    # Supervision
+    # ------------------------------------------------------------------
+
+    async def _load(self, request_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(record_key(request_id))
+        return json.loads(raw) if raw else None
+
+    async def _save(self, record: Dict[str, Any]):
+        await self.redis.set(record_key(record["request_id"]), json.dumps(record, default=str), ex=RECORD_TTL)
+
+    async def _supervise(self, request_id: str):
+        record = await self._load(request_id)
+        if record is None:
+            # Expired or never written; nothing to drive
+            await self.redis.lrem(PROCESSING_KEY, 0, request_id)
+            return
+        if record.get("finished_at"):
+            # Finished before a restart; at most the hand-back is left
+            await self._finish(record)
+            return
+
+        executor = self.executors.get(record["executor"])
+        if executor is None:
+            record.update(status="failed", error=f"Unknown executor '{record['executor']}'")
+            await self._finish(record)
+            return
+
+        logs: deque = deque(record.get("logs") or [], maxlen=LOG_TAIL)
+        record["status"] = "queued"
+        await self._save(record)
+
+        async with self._slots[executor.name]:
+            self._active[executor.name] += 1
+            try:
+                if not record.get("run_id"):
+                    record["run_id"] = await executor.start(record["task"])
+                    record["started_at"] = time.time()
+                    # Kept with the run so a restarted supervisor can still release it
+                    workspace_of = getattr(executor, "workspace_of", None)
+                    if workspace_of:
+                        record["workspace"] = workspace_of(record["run_id"])
+                record["status"] = "running"
+                await self._save(record)
+
+                remaining = self.timeout - (time.time() - record["started_at"])
+                try:
+                    status = await asyncio.wait_for(self._follow(executor, record, logs), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    await executor.cancel(record["run_id"])
+                    status = ExecutorStatus.FAILED
+                    record["error"] = f"Timed out after {self.timeout:.0f}s"
+                record["status"] = status.value
+
+                if status != ExecutorStatus.CANCELLED:
+                    try:
+                        record["artifacts"] = asdict(await executor.get_artifacts(record["run_id"]))
+                    except httpx.HTTPError as e:
+                        record["artifacts_error"] = str(e)
+            except asyncio.CancelledError:
+                # Supervisor shutting down; the run stays in PROCESSING_KEY
+                record["logs"] = list(logs)
+                await asyncio.shield(self._save(record))
+                raise
+            except Exception as e:
+                record.update(status="failed", error=str(e))
+                if record.get("run_id"):
+                    # Lost track of it; don't leave the sandbox running
+                    try:
+                        await executor.cancel(record["run_id"])
+                    except Exception as cancel_error:
+                        print(f"Failed to cancel run {record['run_id']}: {cancel_error}")
+            finally:
+                self._active[executor.name] -= 1
+
+        release = getattr(executor, "release", None)
+        if release and record.get("run_id"):
+            try:
+                await release(record["run_id"], record.get("workspace"))
+            except Exception as e:
+                print(f"Failed to release workspace for run {record['run_id']}: {e}")
+
+        record["logs"] = list(logs)
+        await self._finish(record)
+
+    async def _follow(self, executor: Executor, record: Dict[str, Any], logs: deque) -> ExecutorStatus:
+        """Follow a run until it reaches a terminal status"""
+        run_id = record["run_id"]
+        saved = time.monotonic()
+        try:
+            async for line in executor.stream_logs(run_id):
+                logs.append(line)
+                if time.monotonic() - saved >= SAVE_INTERVAL:
+                    saved = time.monotonic()
+                    record["logs"] = list(logs)
+                    await self._save(record)
+            record["log_mode"] = "stream"
+        except Exception as e:
+            # No (or broken) log stream: status polling only
+            record["log_mode"] = f"poll ({type(e).__name__})"
+
+        interval, last, errors = POLL_MIN, None, 0
+        while True:
+            try:
+                status = await executor.get_status(run_id)
+                errors = 0
+            except httpx.HTTPError as e:
+                errors += 1
+                if errors >= MAX_STATUS_ERRORS:
+                    raise RuntimeError(f"Lost track of run {run_id}: {e}")
+                status = last
+            if status in TERMINAL:
+                return status
+            # Poll fast right after a change, back off while nothing moves
+            interval = POLL_MIN if status != last else min(interval * POLL_BACKOFF, POLL_MAX)
+            last = status
+            await asyncio.sleep(interval)
+
+    # ------------------------------------------------------------------
+    # Hand-back
+    # ------------------------------------------------------------------
+
+    async def _finish(self, record: Dict[str, Any]):
+        record.setdefault("finished_at", time.time())
+        await self._save(record)
+        if not record.get("handed_back"):
+            try:
+                await asyncio.to_thread(self._hand_back, record)
+            except redis.RedisError as e:
+                print(f"Failed to hand run {record['request_id']} back to job {record['job_id']}: {e}")
+                return
+            record["handed_back"] = time.time()
+            await self._save(record)
+        await self.redis.lrem(PROCESSING_KEY, 0, record["request_id"])
+        print(f"Run {record['request_id']} ({record['executor']}) {record['status']} for job {record['job_id']}")
+
+    def _hand_back(self, record: Dict[str, Any]):
+        """
+        Queue the owning job's continuation, then attach the outcome to it.
+
+        Safe to repeat after a crash: a continuation already queued for
+        this run is left alone. Each run gets its own continuation job, so
+        a job handed off again doesn't overwrite the first one. The API reports the job as running until
+        executor_run is set, so the continuation is queued first.
+        """
+        conn = redis.from_url(self.redis_url)
+        summary = {k: v for k, v in record.items() if k not in ("resume", "logs")}
+
+        if record.get("resume") is not None:
+            resume_id = resume_job_id(record["job_id"], record["request_id"])
+            if not Job.exists(resume_id, connection=conn):
+                Queue(JOB_QUEUE, connection=conn).enqueue(
+                    RESUME_FUNCTION,
+                    record["resume"],
+                    summary,
+                    job_id=resume_id,
+                    job_timeout="30m",
+                )
+
+        try:
+            job = Job.fetch(record["job_id"], connection=conn)
+            job.meta["executor_run"] = summary
+            job.save_meta()
+        except NoSuchJobError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"active": self._active[name], "limit": self.limits[name]}
+            for name in self.executors
+        } | {"tracked": len(self._runs)}
+
+
+async def _main():
+    from src.openhands.executor import OpenHandsExecutor
+    from src.openhands.pool import WarmPool
+
+    pool = WarmPool.from_config()
+    if pool:
+        pool.start()
+        print(f"Warm pool: {pool.size} workspace(s) for each of {', '.join(pool.repos)}")
+
+    supervisor = RunSupervisor({"openhands": OpenHandsExecutor(pool=pool)})
+    print(f"Executor supervisor started (limits: {supervisor.limits}, timeout {supervisor.timeout:.0f}s)")
+    try:
+        await supervisor.run()
+    finally:
+        if pool:
+            await pool.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -3,6 +3,11 @@
 from typing import Dict, Any, List
 from src.interfaces import Skill, SkillResult, SkillStatus, TaskContext
 from src.tools.github_client import GitHubClient
+from src.worker.prefetch import prefetched
+
+
+# Files read from one tree snapshot (github_tree_path)
+MAX_TREE_FILES = 200
 
 
 class GitHubContextSkill(Skill):
@@ -30,7 +35,9 @@ class GitHubContextSkill(Skill):
             "properties": {
                 "repo": {"type": "string"},
                 "issue": {"type": "integer"},
-                "search_related": {"type": "boolean", "default": True}
+                "search_related": {"type": "boolean", "default": True},
+                "tree_path": {"type": "string"},
+                "ref": {"type": "string", "default": "main"}
             },
             "required": ["repo"]
         }
@@ -42,7 +49,8 @@ class GitHubContextSkill(Skill):
             "properties": {
                 "issue_data": {"type": "object"},
                 "related_files": {"type": "array"},
-                "recent_prs": {"type": "array"}
+                "recent_prs": {"type": "array"},
+                "tree_files": {"type": "object"}
             }
         }
     
@@ -67,26 +75,50 @@ class GitHubContextSkill(Skill):
             # Fetch issue if specified
             if context.issue:
                 logs.append(f"Fetching issue #{context.issue}...")
-                issue_data = await self.github.get_issue(context.repo, int(context.issue))
+                issue_key = (context.repo, int(context.issue))
+                issue_data = await prefetched(
+                    context, "issue", lambda: self.github.get_issue(*issue_key), key=issue_key
+                )
                 outputs["issue_data"] = issue_data
                 logs.append(f"✓ Issue: {issue_data['title']}")
                 
                 # Search for related code
                 if issue_data.get("title"):
                     logs.append("Searching for related code...")
-                    results = await self.github.search_code(
-                        issue_data["title"],
-                        repo=context.repo
+                    results = await prefetched(
+                        context,
+                        "related_files",
+                        lambda: self.github.search_code(issue_data["title"], repo=context.repo),
+                        key=issue_key
                     )
                     outputs["related_files"] = results
                     logs.append(f"✓ Found {len(results)} related files")
             
             # Fetch recent PRs for context
             logs.append("Fetching recent PRs...")
-            recent_prs = await self.github.list_prs(context.repo, limit=5)
+            recent_prs = await prefetched(
+                context, "recent_prs", lambda: self.github.list_prs(context.repo, limit=5), key=context.repo
+            )
             outputs["recent_prs"] = recent_prs
             logs.append(f"✓ Found {len(recent_prs)} recent PRs")
             
+            # Whole directory in one archive download instead of a get_file per path
+            tree_path = context.outputs.get("github_tree_path")
+            if tree_path is not None:
+                logs.append(f"Fetching tree {tree_path or '/'}...")
+                tree = await self.github.get_tree(
+                    context.repo, tree_path, ref=context.outputs.get("github_ref", "main")
+                )
+                with tree:
+                    files = {}
+                    for path in tree.list_files()[:MAX_TREE_FILES]:
+                        try:
+                            files[path] = tree.read(path)
+                        except UnicodeDecodeError:
+                            continue  # Binary file
+                outputs["tree_files"] = files
+                logs.append(f"✓ Read {len(files)} files from tree {tree.tree_sha[:8]}")
+            
             # Update task context
             context.github_context = outputs
             
@@ -0,0 +1,138 @@
+"""Knowledge search skill - hybrid retrieval over indexed repos, docs and tickets"""
+
+from typing import Dict, Any, List
+from src.interfaces import Skill, SkillResult, SkillStatus, TaskContext
+from src.tools.knowledge_client import KnowledgeClient, search_args
+from src.worker.prefetch import prefetched
+
+
+def _describe(passage: Dict[str, Any]) -> str:
+    """One-line label for a passage, whatever source it came from"""
+    if passage.get("path"):
+        location = f"{passage.get('repo', '')}:{passage['path']}"
+        if passage.get("start_line"):
+            location += f"#L{passage['start_line']}"
+        return location
+    return passage.get("title") or passage.get("url") or str(passage.get("id"))
+
+
+class KnowledgeSearchSkill(Skill):
+    """
+    Search the indexer's knowledge base in one local call.
+
+    Use cases:
+    - Find code related to an issue before editing
+    - Pull relevant docs and past tickets into context
+    """
+
+    def __init__(self):
+        self.knowledge = KnowledgeClient()
+
+    @property
+    def name(self) -> str:
+        return "knowledge_search"
+
+    @property
+    def description(self) -> str:
+        return "Hybrid vector + keyword search over indexed repos, docs and tickets"
+
+    @property
+    def inputs_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "k": {"type": "integer", "default": 8},
+                "collections": {"type": "array", "items": {"type": "string"}}
+            }
+        }
+
+    @property
+    def outputs_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "knowledge_passages": {"type": "array"},
+                "knowledge_content": {"type": "string"},
+                "knowledge_timings": {"type": "object"}
+            }
+        }
+
+    @property
+    def allowed_tools(self) -> List[str]:
+        return ["qdrant"]
+
+    @property
+    def success_checks(self) -> List[str]:
+        return ["search_completed"]
+
+    async def run(self, context: TaskContext) -> SkillResult:
+        """Search indexed knowledge for the request"""
+        logs = []
+        outputs = {}
+        artifacts = {}
+
+        try:
+            if not self.knowledge.available:
+                # Not an error: the job carries on with live context skills
+                logs.append("QDRANT_URL not configured; skipping knowledge search")
+                return SkillResult(
+                    status=SkillStatus.SUCCESS,
+                    outputs=outputs,
+                    artifacts=artifacts,
+                    logs=logs
+                )
+
+            # Folds the issue title in when github_context ran first
+            query, k, collections = search_args(
+                context.outputs, context.request, (context.github_context or {}).get("issue_data")
+            )
+            logs.append(f"Searching {', '.join(collections)} for: {query[:120]}")
+
+            result = await prefetched(
+                context,
+                "knowledge",
+                lambda: self.knowledge.search(query, k=k, collections=collections),
+                key=(query, k, collections)
+            )
+            passages = result["passages"]
+            timings = result["timings"]
+
+            outputs["knowledge_passages"] = passages
+            outputs["knowledge_timings"] = {**timings, "cached": result["cached"]}
+            outputs["knowledge_content"] = "\n\n---\n\n".join(
+                f"[{_describe(p)}]\n{p.get('text', '')}" for p in passages
+            )
+
+            source = "cache" if result["cached"] else f"{result['candidates']} candidates"
+            logs.append(f"✓ {len(passages)} passages in {timings['total_ms']:.1f}ms ({source})")
+            if not result["cached"]:
+                logs.append(
+                    "  " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in timings.items() if name != "total_ms")
+                )
+            for name, error in result.get("errors", {}).items():
+                logs.append(f"  ⚠ {name} unavailable: {error}")
+            for passage in passages:
+                logs.append(f"  - [{passage['collection']}] {_describe(passage)} (score {passage['score']})")
+
+            # Update task context
+            if not context.metadata:
+                context.metadata = {}
+            context.metadata["knowledge_context"] = outputs
+
+            return SkillResult(
+                status=SkillStatus.SUCCESS,
+                outputs=outputs,
+                artifacts=artifacts,
+                logs=logs
+            )
+
+        except Exception as e:
+            logs.append(f"✗ Error: {str(e)}")
+            return SkillResult(
+                status=SkillStatus.FAILED,
+                outputs=outputs,
+                artifacts=artifacts,
+                logs=logs,
+                error=str(e)
+            )
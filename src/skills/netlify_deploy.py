@@ -1,5 +1,6 @@
 """Netlify deploy preview skill"""
 
+import time
 from typing import Dict, Any, List
 from src.interfaces import Skill, SkillResult, SkillStatus, TaskContext
 from src.tools.netlify_client import NetlifyClient
@@ -28,7 +29,7 @@ class NetlifyDeploySkill(Skill):
             "properties": {
                 "pr_number": {"type": "integer"},
                 "wait": {"type": "boolean", "default": True},
-                "max_wait": {"type": "integer", "default": 60}
+                "max_wait": {"type": "integer", "default": 300}
             },
             "required": ["pr_number"]
         }
@@ -64,13 +65,25 @@ class NetlifyDeploySkill(Skill):
             if not pr_number:
                 raise ValueError("PR number required")
             
+            # Deploy notifications make waiting cheap, so allow a full build
+            max_wait = int(context.outputs.get("max_wait", 300))
+            started = time.monotonic()
+            
             logs.append(f"Looking for deploy preview for PR #{pr_number}...")
             
             deploy = await self.netlify.get_deploy_for_pr(
                 int(pr_number),
-                max_wait=60
+                max_wait=max_wait
             )
             
+            remaining = max_wait - (time.monotonic() - started)
+            if deploy and deploy["state"] not in ["ready", "error"] \
+                    and context.outputs.get("wait", True) and remaining > 0:
+                logs.append(f"Waiting for deploy {deploy['id']} ({deploy['state']})...")
+                final = await self.netlify.wait_for_deploy(deploy["id"], timeout=remaining)
+                deploy["state"] = final["state"]
+                deploy["url"] = final.get("deploy_ssl_url") or final.get("ssl_url") or deploy["url"]
+            
             if deploy:
                 outputs["deploy_url"] = deploy["url"]
                 outputs["deploy_id"] = deploy["id"]
@@ -1,8 +1,11 @@
 """Notion read skill - search and fetch documentation"""
 
+import time
 from typing import Dict, Any, List
 from src.interfaces import Skill, SkillResult, SkillStatus, TaskContext
 from src.tools.notion_client import NotionClient
+from src.tools.notion_index import NotionSearchIndex
+from src.worker.prefetch import prefetched
 
 
 class NotionReadSkill(Skill):
@@ -17,6 +20,7 @@ class NotionReadSkill(Skill):
     
     def __init__(self):
         self.notion = NotionClient()
+        self.index = NotionSearchIndex(self.notion)
     
     @property
     def name(self) -> str:
@@ -33,6 +37,9 @@ class NotionReadSkill(Skill):
             "properties": {
                 "query": {"type": "string"},
                 "page_id": {"type": "string"},
+                "database_id": {"type": "string"},
+                "filter": {"type": "object"},
+                "sorts": {"type": "array"},
                 "include_content": {"type": "boolean", "default": True}
             }
         }
@@ -43,6 +50,7 @@ class NotionReadSkill(Skill):
             "type": "object",
             "properties": {
                 "pages": {"type": "array"},
+                "rows": {"type": "array"},
                 "content": {"type": "string"}
             }
         }
@@ -67,36 +75,74 @@ class NotionReadSkill(Skill):
                 page_id = context.outputs["notion_page_id"]
                 logs.append(f"Fetching Notion page {page_id}...")
                 
-                page = await self.notion.get_page(page_id)
-                content = await self.notion.get_page_content(page_id)
+                page = await self.notion.get_cached_page(page_id)
+                content = page.pop("content")
                 
                 outputs["page"] = page
                 outputs["content"] = content
+                outputs["block_count"] = page["block_count"]
                 
                 logs.append(f"✓ Page: {page['title']}")
                 logs.append(f"  Content length: {len(content)} chars")
+                logs.append(self._describe_fetch(page))
                 
-            # Otherwise, search
+            # Database rows come from the local mirror (synced incrementally)
+            elif context.outputs.get("notion_database_id"):
+                database_id = context.outputs["notion_database_id"]
+                logs.append(f"Querying Notion database {database_id}...")
+                
+                mirror = self.notion.database_mirror
+                remote_before = mirror.remote_queries
+                rows = await self.notion.query_database_mirrored(
+                    database_id,
+                    filter_obj=context.outputs.get("notion_filter"),
+                    sorts=context.outputs.get("notion_sorts"),
+                    limit=context.outputs.get("notion_limit", 100)
+                )
+                outputs["rows"] = rows
+                
+                # Filters the mirror can't evaluate go to Notion
+                source = "Notion" if mirror.remote_queries > remote_before else "local mirror"
+                logs.append(f"✓ {len(rows)} rows ({source})")
+                
+            # Otherwise, search the local index (falling back to Notion search)
             elif context.request:
                 query = context.request
                 logs.append(f"Searching Notion for: {query}")
                 
-                results = await self.notion.search(query, limit=5)
-                outputs["pages"] = results
+                # Kept current by the background sync job (src/worker/index_sync.py)
+                started = time.monotonic()
+                try:
+                    if self.index.has_synced():
+                        passages = self.index.query(query, k=5)
+                    else:
+                        logs.append("  Local index not built yet; using Notion search")
+                        passages = []
+                except Exception as e:
+                    logs.append(f"  Local index unavailable ({e}); using Notion search")
+                    passages = []
+                elapsed_ms = (time.monotonic() - started) * 1000
                 
-                logs.append(f"✓ Found {len(results)} pages")
-                for page in results:
-                    logs.append(f"  - {page['title']} ({page['type']})")
-                
-                # Optionally fetch content of first result
-                if results and context.outputs.get("include_content", True):
-                    first_page = results[0]
-                    logs.append(f"\nFetching content of: {first_page['title']}")
+                if passages:
+                    outputs["passages"] = passages
+                    pages = {}
+                    for passage in passages:
+                        pages.setdefault(passage["page_id"], {
+                            "id": passage["page_id"],
+                            "title": passage["title"],
+                            "url": passage["url"],
+                            "score": passage["score"],
+                        })
+                    outputs["pages"] = list(pages.values())
                     
-                    content = await self.notion.get_page_content(first_page["id"])
-                    outputs["content"] = content
+                    logs.append(f"✓ Found {len(passages)} passages in {elapsed_ms:.1f}ms (local index)")
+                    for passage in passages:
+                        logs.append(f"  - {passage['title']} (score {passage['score']})")
                     
-                    logs.append(f"✓ Content length: {len(content)} chars")
+                    if context.outputs.get("include_content", True):
+                        outputs["content"] = "\n\n---\n\n".join(p["passage"] for p in passages)
+                else:
+                    await self._search_remote(query, context, outputs, logs)
             
             # Update task context
             if not context.metadata:
@@ -119,3 +165,31 @@ class NotionReadSkill(Skill):
                 logs=logs,
                 error=str(e)
             )
+    
+    async def _search_remote(self, query: str, context: TaskContext, outputs: Dict[str, Any], logs: List[str]):
+        """Notion API search, used when the local index has no match"""
+        results = await prefetched(context, "notion_search", lambda: self.notion.search(query, limit=5), key=query)
+        outputs["pages"] = results
+        
+        logs.append(f"✓ Found {len(results)} pages (Notion search)")
+        for page in results:
+            logs.append(f"  - {page['title']} ({page['type']})")
+        
+        # Optionally fetch content of first result
+        if results and context.outputs.get("include_content", True):
+            first_page = results[0]
+            logs.append(f"\nFetching content of: {first_page['title']}")
+            
+            page = await self.notion.get_cached_page(first_page["id"])
+            content = page["content"]
+            outputs["content"] = content
+            outputs["block_count"] = page["block_count"]
+            
+            logs.append(f"✓ Content length: {len(content)} chars")
+            logs.append(self._describe_fetch(page))
+    
+    def _describe_fetch(self, page: Dict[str, Any]) -> str:
+        """One log line saying whether content came from the page cache"""
+        stats = self.notion.page_cache.stats()
+        source = "cache hit" if page["cached"] else f"fetched in {page['fetch_seconds']:.2f}s"
+        return f"  {page['block_count']} blocks ({source}, cache hit rate {stats['hit_rate']:.0%})"
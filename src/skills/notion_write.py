@@ -3,6 +3,7 @@
 from typing import Dict, Any, List
 from src.interfaces import Skill, SkillResult, SkillStatus, TaskContext
 from src.tools.notion_client import NotionClient
+from src.tools.notion_writer import NotionBatchWriter, WriteProgress, ResumeMismatch, text_blocks
 
 
 class NotionWriteSkill(Skill):
@@ -73,24 +74,39 @@ class NotionWriteSkill(Skill):
             # Generate title from context
             title = context.outputs.get("notion_title") or f"Agent Summary: {context.task_id}"
             
-            # Generate content from task outputs
-            content_blocks = self._build_content_blocks(context)
+            # Generate content from task outputs; our own resume state is
+            # left out so a retry builds exactly the same blocks
+            results = {k: v for k, v in context.outputs.items() if k != "notion_write_progress"}
+            content_blocks = self._build_content_blocks(context.request, results)
             
             logs.append(f"Creating Notion page: {title}")
             logs.append(f"Parent: {parent_id}")
             
-            # Create page
-            page = await self.notion.create_page(
-                parent_id=parent_id,
-                title=title,
-                content=content_blocks
-            )
+            # Resume a write that failed part-way on a previous attempt
+            progress = WriteProgress.from_dict(context.outputs.get("notion_write_progress"))
+            if progress.page_id:
+                logs.append(f"Resuming after {progress.blocks_written}/{progress.blocks_total} blocks")
+            
+            writer = NotionBatchWriter(self.notion)
+            try:
+                try:
+                    await writer.create_page(parent_id, title, content_blocks, progress=progress)
+                except ResumeMismatch as e:
+                    # Start over rather than finish the page with shifted blocks
+                    logs.append(f"  {e}; archiving the partial page and starting over")
+                    await self.notion._call(self.notion.client.pages.update, page_id=progress.page_id, archived=True)
+                    progress = WriteProgress()
+                    await writer.create_page(parent_id, title, content_blocks, progress=progress)
+            finally:
+                # Cleared once complete so a later write starts fresh
+                outputs["notion_write_progress"] = None if progress.done else progress.to_dict()
             
-            outputs["page_id"] = page["id"]
-            outputs["page_url"] = page["url"]
-            artifacts["notion_page"] = page["url"]
+            outputs["page_id"] = progress.page_id
+            outputs["page_url"] = progress.url
+            artifacts["notion_page"] = progress.url
             
-            logs.append(f"✓ Page created: {page['url']}")
+            logs.append(f"✓ Page created: {progress.url}")
+            logs.append(f"  {progress.blocks_written} blocks in {progress.requests} requests")
             
             return SkillResult(
                 status=SkillStatus.SUCCESS,
@@ -109,8 +125,8 @@ class NotionWriteSkill(Skill):
                 error=str(e)
             )
     
-    def _build_content_blocks(self, context: TaskContext) -> List[Dict[str, Any]]:
-        """Build Notion blocks from task context"""
+    def _build_content_blocks(self, request: str, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build Notion blocks from the request and task outputs"""
         blocks = []
         
         # Add request
@@ -122,16 +138,10 @@ class NotionWriteSkill(Skill):
             }
         })
         
-        blocks.append({
-            "object": "block",
-            "type": "paragraph",
-            "paragraph": {
-                "rich_text": [{"type": "text", "text": {"content": context.request}}]
-            }
-        })
+        blocks.extend(text_blocks(request))
         
         # Add outputs if available
-        if context.outputs:
+        if results:
             blocks.append({
                 "object": "block",
                 "type": "heading_2",
@@ -141,29 +151,54 @@ class NotionWriteSkill(Skill):
             })
             
             # Add PR link if available
-            if context.outputs.get("pr_url"):
+            if results.get("pr_url"):
                 blocks.append({
                     "object": "block",
                     "type": "paragraph",
                     "paragraph": {
                         "rich_text": [{
                             "type": "text",
-                            "text": {"content": f"PR: {context.outputs['pr_url']}"}
+                            "text": {"content": f"PR: {results['pr_url']}"}
                         }]
                     }
                 })
             
             # Add deploy URL if available
-            if context.outputs.get("deploy_url"):
+            if results.get("deploy_url"):
                 blocks.append({
                     "object": "block",
                     "type": "paragraph",
                     "paragraph": {
                         "rich_text": [{
                             "type": "text",
-                            "text": {"content": f"Deploy: {context.outputs['deploy_url']}"}
+                            "text": {"content": f"Deploy: {results['deploy_url']}"}
                         }]
                     }
                 })
         
+            # Full file lists and logs can run to thousands of blocks/characters
+            if results.get("files_changed"):
+                blocks.append(self._heading("Files changed"))
+                for path in results["files_changed"]:
+                    blocks.append({
+                        "object": "block",
+                        "type": "bulleted_list_item",
+                        "bulleted_list_item": {
+                            "rich_text": [{"type": "text", "text": {"content": path}}]
+                        }
+                    })
+            
+            if results.get("logs"):
+                blocks.append(self._heading("Logs"))
+                blocks.extend(text_blocks("\n".join(results["logs"]), "code", language="plain text"))
+        
         return blocks
+    
+    def _heading(self, text: str) -> Dict[str, Any]:
+        return {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {
+                "rich_text": [{"type": "text", "text": {"content": text}}]
+            }
+        }
@@ -0,0 +1,279 @@
+"""Buffered, batched Firestore writer with a local disk fallback"""
+
+import os
+import json
+import base64
+import fcntl
+import atexit
+import asyncio
+import weakref
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, IO, Iterator, List, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1 import DELETE_FIELD, SERVER_TIMESTAMP
+
+
+# Firestore caps a batched write at 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+
+DEFAULT_SPOOL_PATH = os.path.join(tempfile.gettempdir(), "drafted-firestore-spool.jsonl")
+
+# Failures retrying can't fix (bad field values, oversized documents)
+PERMANENT_ERRORS = (google_exceptions.InvalidArgument, ValueError, TypeError)
+
+# Firestore values JSON can't hold, tagged so a replay writes the same types
+_SENTINELS = {"SERVER_TIMESTAMP": SERVER_TIMESTAMP, "DELETE_FIELD": DELETE_FIELD}
+
+# Every live writer, so jobs can flush them before their process exits
+_writers: "weakref.WeakSet[BatchWriter]" = weakref.WeakSet()
+
+
+def flush_all():
+    """
+    Commit every writer's buffer in this process.
+
+    RQ work-horses leave through os._exit(), which skips atexit, so the
+    job runner calls this at the end of every job.
+    """
+    for writer in list(_writers):
+        writer.flush_sync()
+
+
+# One hook for all writers; a bound method per writer would keep each alive
+atexit.register(flush_all)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    for name, sentinel in _SENTINELS.items():
+        if value is sentinel:
+            return {"__sentinel__": name}
+    # References, geo points, ...: best effort
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__bytes__" in obj:
+            return base64.b64decode(obj["__bytes__"])
+        if obj.get("__sentinel__") in _SENTINELS:
+            return _SENTINELS[obj["__sentinel__"]]
+    return obj
+
+
+class BatchWriter:
+    """
+    Buffers document writes and commits them as Firestore batches.
+
+    A flush happens when `max_batch` writes are queued or `flush_interval`
+    seconds pass, and on close()/flush_all()/interpreter exit. Batches
+    that fail to commit are appended to a JSONL spool and replayed on the
+    next flush. The spool is shared by every process on the machine, so
+    it is only touched under an exclusive flock. Writes Firestore rejects
+    outright are moved to a dead-letter file instead, so one bad document
+    can't block the spool.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_batch: int = FIRESTORE_BATCH_LIMIT,
+        flush_interval: float = 2.0,
+        spool_path: Optional[str] = None
+    ):
+        self.db = db
+        self.max_batch = min(max_batch, FIRESTORE_BATCH_LIMIT)
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path or os.getenv("FIRESTORE_SPOOL_PATH", DEFAULT_SPOOL_PATH)
+        self.dead_letter_path = f"{self.spool_path}.dead"
+
+        self.written = 0
+        self.spooled = 0
+        self.dead_lettered = 0
+        self.batches = 0
+
+        self._buffer: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        _writers.add(self)
+
+    def enqueue(self, collection: str, data: Dict[str, Any], doc_id: Optional[str] = None) -> str:
+        """
+        Queue a merge-write; returns the document id immediately.
+
+        Starts the background flusher if called inside a running loop.
+        """
+        doc_id = doc_id or self.db.collection(collection).document().id
+        with self._lock:
+            self._buffer.append((collection, doc_id, data))
+            full = len(self._buffer) >= self.max_batch
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop: the caller is synchronous, so flush inline when full
+            if full:
+                self.flush_sync()
+            return doc_id
+
+        self._ensure_task()
+        if full:
+            self._wake.set()
+        return doc_id
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Commit everything buffered (and any spooled writes) without blocking the loop"""
+        await asyncio.to_thread(self.flush_sync)
+
+    def flush_sync(self):
+        """Commit everything buffered; safe to call from any thread"""
+        with self._commit_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+
+            if not self._spool_pending():
+                # Common case: nothing to replay, so no cross-process lock
+                failed = self._commit_all(pending)
+                if failed:
+                    with self._locked_spool() as spool:
+                        self._append_spool(spool, failed)
+                return
+
+            # Replay under the lock so no other process replays the same writes
+            with self._locked_spool() as spool:
+                writes = self._read_spool(spool) + pending
+                self._rewrite_spool(spool, self._commit_all(writes))
+
+    def _commit_all(self, writes: List[Tuple[str, str, Dict[str, Any]]]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Commit in batches; returns the writes to retry later"""
+        for start in range(0, len(writes), self.max_batch):
+            retry = self._commit_or_isolate(writes[start:start + self.max_batch])
+            if retry:
+                rest = retry + writes[start + self.max_batch:]
+                print(f"Firestore unavailable, spooling {len(rest)} writes")
+                return rest
+        return []
+
+    def _commit_or_isolate(self, writes: List[Tuple[str, str, Dict[str, Any]]]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Commit `writes`; returns the ones to retry.
+
+        One rejected write fails its whole batch, so a permanent failure
+        splits the batch until the bad writes are alone and dead-lettered.
+        """
+        try:
+            self._commit(writes)
+            return []
+        except PERMANENT_ERRORS as e:
+            if len(writes) == 1:
+                self._dead_letter(writes[0], e)
+                return []
+        except Exception as e:
+            print(f"Firestore batch failed: {e}")
+            return writes
+
+        middle = len(writes) // 2
+        retry = self._commit_or_isolate(writes[:middle])
+        if retry:
+            return retry + writes[middle:]
+        return self._commit_or_isolate(writes[middle:])
+
+    def _dead_letter(self, write: Tuple[str, str, Dict[str, Any]], error: Exception):
+        collection, doc_id, _ = write
+        print(f"Firestore rejected {collection}/{doc_id}, moved to {self.dead_letter_path}: {error}")
+        with open(self.dead_letter_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(json.dumps({"write": list(write), "error": str(error)}, default=_encode) + "\n")
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self.dead_lettered += 1
+
+    def _commit(self, writes: List[Tuple[str, str, Dict[str, Any]]]):
+        batch = self.db.batch()
+        for collection, doc_id, data in writes:
+            batch.set(self.db.collection(collection).document(doc_id), data, merge=True)
+        batch.commit()
+        self.batches += 1
+        self.written += len(writes)
+
+    def _spool_pending(self) -> bool:
+        try:
+            return os.path.getsize(self.spool_path) > 0
+        except OSError:
+            return False
+
+    @contextmanager
+    def _locked_spool(self) -> Iterator[IO[str]]:
+        # Never deleted, only truncated: unlinking a locked file would let
+        # the next process lock a different inode
+        with open(self.spool_path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_spool(self, spool: IO[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        spool.seek(0)
+        return [tuple(json.loads(line, object_hook=_decode)) for line in spool if line.strip()]
+
+    def _append_spool(self, spool: IO[str], writes: List[Tuple[str, str, Dict[str, Any]]]):
+        for write in writes:
+            spool.write(json.dumps(list(write), default=_encode) + "\n")
+        spool.flush()
+        os.fsync(spool.fileno())
+        self.spooled = len(self._read_spool(spool))
+
+    def _rewrite_spool(self, spool: IO[str], writes: List[Tuple[str, str, Dict[str, Any]]]):
+        # Everything in the file was read into the replay, so it's safe to truncate
+        spool.seek(0)
+        spool.truncate()
+        self._append_spool(spool, writes)
+
+    async def close(self):
+        """Stop the flusher and commit what's left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "written": self.written,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "dead_lettered": self.dead_lettered,
+        }
@@ -2,9 +2,13 @@
 
 import os
 import json
-from typing import Dict, List, Optional, Any
+import asyncio
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple, Union
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.auth.credentials import AnonymousCredentials
+
+from src.tools.firebase_batch import BatchWriter
 
 
 # Allowlists for safety
@@ -27,6 +31,11 @@ WRITE_ALLOWED_COLLECTIONS = [
     "agent_logs"
 ]
 
+# Documents per round trip when streaming collections
+DEFAULT_PAGE_SIZE = 500
+# Document references per get_all call
+GET_ALL_CHUNK = 100
+
 
 class FirebaseClient:
     """
@@ -36,22 +45,32 @@ class FirebaseClient:
     """
     
     def __init__(self):
-        if not firebase_admin._apps:
-            # Initialize Firebase Admin
-            service_account = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
+        service_account = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
+        
+        if os.getenv("FIRESTORE_EMULATOR_HOST") and not service_account:
+            # Local emulator: no credentials needed
+            self.db = firestore.Client(
+                project=os.getenv("FIREBASE_PROJECT_ID", "demo-drafted"),
+                credentials=AnonymousCredentials()
+            )
+        else:
+            if not firebase_admin._apps:
+                # Initialize Firebase Admin
+                if service_account:
+                    if service_account.startswith("{"):
+                        # JSON string
+                        cred_dict = json.loads(service_account)
+                        cred = credentials.Certificate(cred_dict)
+                    else:
+                        # File path
+                        cred = credentials.Certificate(service_account)
+                    
+                    firebase_admin.initialize_app(cred)
             
-            if service_account:
-                if service_account.startswith("{"):
-                    # JSON string
-                    cred_dict = json.loads(service_account)
-                    cred = credentials.Certificate(cred_dict)
-                else:
-                    # File path
-                    cred = credentials.Certificate(service_account)
-                
-                firebase_admin.initialize_app(cred)
-        
-        self.db = firestore.client()
+            self.db = firestore.client()
+        
+        # Audit/analytics writes are buffered and committed in batches
+        self.batch_writer = BatchWriter(self.db)
     
     def _check_collection_access(self, collection: str, write: bool = False):
         """Verify collection access is allowed"""
@@ -66,7 +85,7 @@ class FirebaseClient:
         self._check_collection_access(collection, write=False)
         
         doc_ref = self.db.collection(collection).document(doc_id)
-        doc = doc_ref.get()
+        doc = await asyncio.to_thread(doc_ref.get)
         
         if doc.exists:
             return {"id": doc.id, **doc.to_dict()}
@@ -76,24 +95,128 @@ class FirebaseClient:
         self,
         collection: str,
         limit: int = 100,
-        where: Optional[Dict[str, Any]] = None
+        where: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        order_by: Optional[List[Union[str, Tuple[str, str]]]] = None,
+        select: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Read documents from a collection"""
+        """Read up to `limit` documents from a collection"""
         self._check_collection_access(collection, write=False)
         
-        query = self.db.collection(collection)
+        return [
+            doc async for doc in self.stream_collection(
+                collection,
+                filters=where,
+                order_by=order_by,
+                select=select,
+                limit=limit,
+                page_size=min(limit, DEFAULT_PAGE_SIZE)
+            )
+        ]
+    
+    async def stream_collection(
+        self,
+        collection: str,
+        filters: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        order_by: Optional[List[Union[str, Tuple[str, str]]]] = None,
+        select: Optional[List[str]] = None,
+        start_after: Optional[Union[str, Dict[str, Any]]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream documents page by page in constant memory.
         
-        if where:
+        Args:
+            collection: Collection name
+            filters: One or more {"field", "operator", "value"} clauses
+            order_by: Field names, or (field, "asc"/"desc") pairs;
+                      Firestore's default order is used when omitted
+            select: Field projection (only these fields are transferred)
+            start_after: Document id, or {field: value} for the order_by fields
+                         (needs order_by)
+            page_size: Documents fetched per round trip
+            limit: Stop after this many documents
+            
+        Yields:
+            {"id": ..., **fields}
+        """
+        self._check_collection_access(collection, write=False)
+        
+        col_ref = self.db.collection(collection)
+        query = col_ref
+        
+        if isinstance(filters, dict):
+            filters = [filters]
+        for clause in filters or []:
             query = query.where(
-                where.get("field"),
-                where.get("operator", "=="),
-                where.get("value")
+                clause.get("field"),
+                clause.get("operator", "=="),
+                clause.get("value")
             )
         
-        query = query.limit(limit)
-        docs = query.stream()
+        # No document-id order here: with an inequality filter it must not
+        # come first, and a compound filter would need a composite index.
+        # Paging resumes from a document snapshot, for which the SDK adds
+        # the inequality fields and the id tiebreak itself, matching
+        # Firestore's default order.
+        for field in order_by or []:
+            name, direction = (field, "asc") if isinstance(field, str) else field
+            query = query.order_by(
+                name,
+                direction=firestore.Query.DESCENDING if direction == "desc" else firestore.Query.ASCENDING
+            )
         
-        return [{"id": doc.id, **doc.to_dict()} for doc in docs]
+        if select:
+            query = query.select(select)
+        
+        cursor = None
+        if isinstance(start_after, str):
+            cursor = await asyncio.to_thread(col_ref.document(start_after).get)
+        elif start_after:
+            cursor = start_after
+        
+        yielded = 0
+        while limit is None or yielded < limit:
+            page_query = query
+            if cursor is not None:
+                page_query = page_query.start_after(cursor)
+            count = page_size if limit is None else min(page_size, limit - yielded)
+            docs = await asyncio.to_thread(lambda: list(page_query.limit(count).get()))
+            
+            for doc in docs:
+                yield {"id": doc.id, **(doc.to_dict() or {})}
+            yielded += len(docs)
+            
+            if len(docs) < count:
+                return
+            cursor = docs[-1]
+    
+    async def get_documents(
+        self,
+        collection: str,
+        doc_ids: List[str],
+        select: Optional[List[str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Bulk read documents by id in one batched call per 100 ids.
+        
+        Returns:
+            Documents in the order of `doc_ids` (None where missing)
+        """
+        self._check_collection_access(collection, write=False)
+        
+        col_ref = self.db.collection(collection)
+        found: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(doc_ids), GET_ALL_CHUNK):
+            refs = [col_ref.document(doc_id) for doc_id in doc_ids[start:start + GET_ALL_CHUNK]]
+            snapshots = await asyncio.to_thread(
+                lambda: list(self.db.get_all(refs, field_paths=select))
+            )
+            for doc in snapshots:
+                if doc.exists:
+                    found[doc.id] = {"id": doc.id, **(doc.to_dict() or {})}
+        
+        return [found.get(doc_id) for doc_id in doc_ids]
     
     async def write_document(
         self,
@@ -112,6 +235,28 @@ class FirebaseClient:
         doc_ref.set(data, merge=True)
         return doc_ref.id
     
+    def buffer_write(
+        self,
+        collection: str,
+        data: Dict[str, Any],
+        doc_id: Optional[str] = None
+    ) -> str:
+        """Queue a write for the next batch commit (only to allowed collections)"""
+        self._check_collection_access(collection, write=True)
+        return self.batch_writer.enqueue(collection, data, doc_id)
+    
     async def log_agent_action(self, action: Dict[str, Any]) -> str:
-        """Log agent action for audit trail"""
-        return await self.write_document("agent_logs", action)
+        """Log agent action for audit trail (buffered; no round trip)"""
+        return self.buffer_write("agent_logs", action)
+    
+    async def log_analytics(self, event: Dict[str, Any]) -> str:
+        """Record an analytics event (buffered; no round trip)"""
+        return self.buffer_write("analytics", event)
+    
+    async def flush(self):
+        """Commit buffered writes now"""
+        await self.batch_writer.flush()
+    
+    async def close(self):
+        """Flush buffered writes and stop the background flusher"""
+        await self.batch_writer.close()
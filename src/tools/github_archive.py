@@ -0,0 +1,222 @@
+"""Content-addressed local snapshots of GitHub trees, filled from tarballs"""
+
+import io
+import os
+import mmap
+import fcntl
+import shutil
+import tarfile
+import tempfile
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "drafted-trees")
+
+
+class _StreamReader(io.RawIOBase):
+    """File-like view over an iterator of byte chunks (no full buffering)"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class TreeSnapshot:
+    """
+    Read-only view of one extracted tree.
+
+    Files are read through mmap, so repeated reads of large files cost
+    no copies beyond the final decode. The snapshot holds a shared lock
+    until close(), so prune() never removes it while it's being read.
+    """
+
+    def __init__(self, root: str, tree_sha: str, prefix: str = "", lock_fd: Optional[int] = None):
+        self.root = root
+        self.tree_sha = tree_sha
+        self.prefix = prefix.strip("/")
+        self._lock_fd = lock_fd
+
+    def close(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def __enter__(self) -> "TreeSnapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def _local_path(self, path: str) -> str:
+        rel = path.strip("/")
+        if self.prefix:
+            if rel != self.prefix and not rel.startswith(self.prefix + "/"):
+                raise FileNotFoundError(f"{path} is outside snapshot prefix {self.prefix}")
+            rel = rel[len(self.prefix):].lstrip("/")
+        local = os.path.normpath(os.path.join(self.root, rel))
+        if not local.startswith(self.root):
+            raise FileNotFoundError(path)
+        return local
+
+    def exists(self, path: str) -> bool:
+        try:
+            return os.path.isfile(self._local_path(path))
+        except FileNotFoundError:
+            return False
+
+    def read_bytes(self, path: str) -> memoryview:
+        """
+        A file's contents by its repo-relative path, without copying.
+
+        The view keeps the mapping alive; call .tobytes() for bytes.
+        """
+        with open(self._local_path(path), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"")
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def read(self, path: str) -> str:
+        return str(self.read_bytes(path), "utf-8")
+
+    def list_files(self, under: str = "") -> List[str]:
+        """List repo-relative file paths, optionally under a sub-directory"""
+        start = self._local_path(under) if under else self.root
+        files = []
+        for dirpath, _, filenames in os.walk(start):
+            for name in filenames:
+                rel = os.path.relpath(os.path.join(dirpath, name), self.root)
+                files.append(f"{self.prefix}/{rel}" if self.prefix else rel)
+        return sorted(files)
+
+
+class TreeArchiveCache:
+    """
+    On-disk cache of extracted trees keyed by git tree SHA.
+
+    A tree SHA identifies content, not a commit, so any ref whose
+    sub-tree is unchanged reuses the same snapshot.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_snapshots: int = 32):
+        self.cache_dir = cache_dir or os.getenv("GITHUB_TREE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_snapshots = max_snapshots
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _lock_path(self, tree_sha: str) -> str:
+        return os.path.join(self.cache_dir, f".lock-{tree_sha}")
+
+    def get(self, tree_sha: str, prefix: str = "") -> Optional[TreeSnapshot]:
+        root = os.path.join(self.cache_dir, tree_sha)
+        if not os.path.isdir(root):
+            return None
+        fd = os.open(self._lock_path(tree_sha), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        # prune() may have removed the snapshot (and its lock file) while we waited
+        if os.fstat(fd).st_nlink == 0 or not os.path.isdir(root):
+            os.close(fd)
+            return None
+        os.utime(root)  # LRU bookkeeping for prune()
+        return TreeSnapshot(root, tree_sha, prefix, lock_fd=fd)
+
+    def fetch(
+        self,
+        archive_url: str,
+        headers: Dict[str, str],
+        tree_sha: str,
+        prefix: str = ""
+    ) -> TreeSnapshot:
+        """
+        Stream a tarball and extract the files under `prefix`.
+
+        The archive is decompressed as it downloads; nothing but the
+        extracted files touches disk.
+        """
+        cached = self.get(tree_sha, prefix)
+        if cached:
+            return cached
+
+        prefix = prefix.strip("/")
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix=".staging-")
+        try:
+            with httpx.stream("GET", archive_url, headers=headers, follow_redirects=True, timeout=300.0) as response:
+                response.raise_for_status()
+                raw = io.BufferedReader(_StreamReader(response.iter_bytes()), buffer_size=1 << 16)
+                with tarfile.open(fileobj=raw, mode="r|gz") as archive:
+                    for member in archive:
+                        if not member.isfile():
+                            continue
+                        # Drop the "<org>-<repo>-<sha>/" wrapper directory
+                        parts = member.name.split("/", 1)
+                        if len(parts) < 2:
+                            continue
+                        rel = parts[1]
+                        if prefix:
+                            if not rel.startswith(prefix + "/"):
+                                continue
+                            rel = rel[len(prefix) + 1:]
+                        target = os.path.normpath(os.path.join(staging, rel))
+                        if not target.startswith(staging + os.sep):
+                            continue
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        source = archive.extractfile(member)
+                        with open(target, "wb") as out:
+                            shutil.copyfileobj(source, out)
+
+            try:
+                os.rename(staging, os.path.join(self.cache_dir, tree_sha))
+            except OSError:
+                # Another worker extracted the same tree first
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # Locked before pruning, so the new snapshot can't be the one dropped
+        snapshot = self.get(tree_sha, prefix)
+        if snapshot is None:
+            raise RuntimeError(f"Snapshot {tree_sha} was pruned while extracting")
+        self.prune()
+        return snapshot
+
+    def _last_used(self, name: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            # Pruned by another process since listdir()
+            return 0.0
+
+    def prune(self):
+        """Drop least-recently-used snapshots beyond max_snapshots, skipping any being read"""
+        names = [name for name in os.listdir(self.cache_dir) if not name.startswith(".")]
+        names.sort(key=lambda name: self._last_used(name), reverse=True)
+        for name in names[self.max_snapshots:]:
+            fd = os.open(self._lock_path(name), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            try:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                os.unlink(self._lock_path(name))
+            finally:
+                os.close(fd)
@@ -0,0 +1,347 @@
+"""Webhook-fed cache of GitHub issues, pull requests and head SHAs"""
+
+import os
+import json
+import hmac
+import time
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import httpx
+import redis
+
+
+# Redis key layout (shared by the API process and all workers)
+KEY_PREFIX = "github:cache"
+DELIVERIES_KEY = "github:deliveries"
+
+# How many PRs per repo/state we keep; list_prs() beyond this goes to GitHub
+PR_LIST_CAP = 100
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an `X-Hub-Signature-256` header against the raw request body"""
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+def _iso(value: Optional[str]) -> Optional[str]:
+    """Normalize GitHub's `...Z` timestamps to PyGithub's isoformat()"""
+    if value and value.endswith("Z"):
+        return value[:-1] + "+00:00"
+    return value
+
+
+def _older(incoming: Optional[str], current: Optional[str]) -> bool:
+    """True if `incoming` is strictly older than `current` (unknown counts as not older)"""
+    try:
+        return datetime.fromisoformat(_iso(incoming)) < datetime.fromisoformat(_iso(current))
+    except (TypeError, ValueError):
+        return False
+
+
+def issue_from_payload(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a webhook issue object like GitHubClient.get_issue()"""
+    return {
+        "number": issue["number"],
+        "title": issue.get("title"),
+        "body": issue.get("body"),
+        "state": issue.get("state"),
+        "labels": [label["name"] for label in issue.get("labels", [])],
+        "assignees": [user["login"] for user in issue.get("assignees", [])],
+        "created_at": _iso(issue.get("created_at")),
+        "updated_at": _iso(issue.get("updated_at")),
+        "url": issue.get("html_url"),
+    }
+
+
+def pr_from_payload(pr: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a webhook pull_request object like GitHubClient.list_prs()"""
+    return {
+        "number": pr["number"],
+        "title": pr.get("title"),
+        "state": pr.get("state"),
+        "url": pr.get("html_url"),
+        "author": (pr.get("user") or {}).get("login"),
+        "created_at": _iso(pr.get("created_at")),
+        "updated_at": _iso(pr.get("updated_at")),
+    }
+
+
+class GitHubCache:
+    """
+    Two-level cache (process memory + Redis) for GitHub state.
+
+    Entries are written by the webhook receiver and by read-through
+    fetches in GitHubClient. Reads honour a freshness bound so a lost
+    webhook can only serve stale data for `max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_age: Optional[float] = None,
+        memory_ttl: Optional[float] = None,
+    ):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.max_age = max_age if max_age is not None else float(os.getenv("GITHUB_CACHE_MAX_AGE", "300"))
+        # Other processes update Redis, so our memory copy is only trusted briefly
+        self.memory_ttl = memory_ttl if memory_ttl is not None else float(os.getenv("GITHUB_CACHE_MEMORY_TTL", "5"))
+        self._memory: Dict[str, tuple] = {}  # key -> (loaded_at, entry)
+        self._redis = None
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _key(self, kind: str, repo: str, ident: Any) -> str:
+        return f"{KEY_PREFIX}:{kind}:{repo}:{ident}"
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        hit = self._memory.get(key)
+        if hit and now - hit[0] < self.memory_ttl:
+            return hit[1]
+
+        try:
+            raw = self.redis.get(key)
+        except redis.RedisError:
+            # Redis down: fall back to whatever this process last saw
+            return hit[1] if hit else None
+
+        if raw is None:
+            self._memory.pop(key, None)
+            return None
+        entry = json.loads(raw)
+        self._memory[key] = (now, entry)
+        return entry
+
+    def _store(self, key: str, value: Any, **extra) -> None:
+        entry = {"value": value, "cached_at": time.time(), **extra}
+        self._memory[key] = (time.time(), entry)
+        try:
+            # Keep Redis entries well past max_age so replays can patch them
+            self.redis.set(key, json.dumps(entry), ex=int(self.max_age * 10) or None)
+        except redis.RedisError:
+            pass
+
+    def _fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and time.time() - entry["cached_at"] <= self.max_age
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_issue(self, repo: str, number: int) -> Optional[Dict[str, Any]]:
+        entry = self._load(self._key("issue", repo, number))
+        return entry["value"] if self._fresh(entry) else None
+
+    def get_prs(self, repo: str, state: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        entry = self._load(self._key("prs", repo, state))
+        if not self._fresh(entry):
+            return None
+        prs = entry["value"]
+        # A truncated list can only answer requests it fully covers
+        if len(prs) < limit and not entry.get("complete"):
+            return None
+        return prs[:limit]
+
+    def get_head_sha(self, repo: str, ref: str) -> Optional[str]:
+        entry = self._load(self._key("head", repo, ref))
+        return entry["value"] if self._fresh(entry) else None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put_issue(self, repo: str, issue: Dict[str, Any]) -> None:
+        self._store(self._key("issue", repo, issue["number"]), issue)
+
+    def put_prs(self, repo: str, state: str, prs: List[Dict[str, Any]], complete: bool) -> None:
+        self._store(self._key("prs", repo, state), prs[:PR_LIST_CAP], complete=complete)
+
+    def put_head_sha(self, repo: str, ref: str, sha: str) -> None:
+        self._store(self._key("head", repo, ref), sha)
+
+    def _upsert_pr(self, repo: str, state: str, pr: Dict[str, Any]) -> None:
+        key = self._key("prs", repo, state)
+        entry = self._load(key)
+        if entry is None:
+            # Never listed: leave it to the next read-through fetch
+            return
+        prs = [p for p in entry["value"] if p["number"] != pr["number"]]
+        prs.append(pr)
+        prs.sort(key=lambda p: p.get("created_at") or "", reverse=True)
+        complete = entry.get("complete", False) and len(prs) <= PR_LIST_CAP
+        self._store(key, prs[:PR_LIST_CAP], complete=complete)
+
+    def _cached_pr(self, repo: str, number: int) -> Optional[Dict[str, Any]]:
+        for state in ("all", "open", "closed"):
+            entry = self._load(self._key("prs", repo, state))
+            for pr in (entry or {}).get("value", []):
+                if pr["number"] == number:
+                    return pr
+        return None
+
+    def _drop_head(self, repo: str, ref: str) -> None:
+        key = self._key("head", repo, ref)
+        self._memory.pop(key, None)
+        try:
+            self.redis.delete(key)
+        except redis.RedisError:
+            pass
+
+    def _remove_pr(self, repo: str, state: str, number: int) -> None:
+        key = self._key("prs", repo, state)
+        entry = self._load(key)
+        if entry is None:
+            return
+        prs = [p for p in entry["value"] if p["number"] != number]
+        self._store(key, prs, complete=entry.get("complete", False))
+
+    # ------------------------------------------------------------------
+    # Webhook ingestion
+    # ------------------------------------------------------------------
+
+    def apply_event(self, event: str, payload: Dict[str, Any]) -> bool:
+        """
+        Apply a webhook payload to the cache.
+
+        Returns:
+            True if the event type was handled
+        """
+        repo = (payload.get("repository") or {}).get("name")
+        if not repo:
+            return False
+
+        # Deliveries can arrive out of order, and replay_missed_deliveries
+        # asks for old ones on purpose: never let them overwrite newer state
+        if event == "issues":
+            issue = issue_from_payload(payload["issue"])
+            cached = self._load(self._key("issue", repo, issue["number"]))
+            if not (cached and _older(issue["updated_at"], cached["value"].get("updated_at"))):
+                self.put_issue(repo, issue)
+            return True
+
+        if event == "pull_request":
+            raw = payload["pull_request"]
+            pr = pr_from_payload(raw)
+            cached = self._cached_pr(repo, pr["number"])
+            if not (cached and _older(pr["updated_at"], cached.get("updated_at"))):
+                self._upsert_pr(repo, "all", pr)
+                if pr["state"] == "open":
+                    self._upsert_pr(repo, "open", pr)
+                    self._remove_pr(repo, "closed", pr["number"])
+                else:
+                    self._remove_pr(repo, "open", pr["number"])
+                    self._upsert_pr(repo, "closed", pr)
+
+            # PR events carry no ordering for the head; the next read re-resolves it
+            head = raw.get("head") or {}
+            if head.get("ref") and (head.get("repo") or {}).get("name") == repo:
+                self._drop_head(repo, head["ref"])
+            return True
+
+        if event == "push":
+            ref = payload.get("ref", "")
+            if ref.startswith("refs/heads/") and payload.get("after"):
+                branch = ref[len("refs/heads/"):]
+                cached = self._load(self._key("head", repo, branch))
+                if payload.get("deleted"):
+                    self._drop_head(repo, branch)
+                elif cached and cached["value"] == payload.get("before"):
+                    # Direct successor of what we have
+                    self.put_head_sha(repo, branch, payload["after"])
+                elif cached and cached["value"] != payload["after"]:
+                    # Out of order or a gap: the sha might be older than ours
+                    self._drop_head(repo, branch)
+                # Nothing cached: a replayed push can't be told from a new one,
+                # so the next read resolves the head instead
+            return True
+
+        return False
+
+    def mark_delivery(self, delivery_id: str) -> bool:
+        """
+        Record a delivery GUID.
+
+        Returns:
+            False if the delivery was already processed
+        """
+        try:
+            added = self.redis.zadd(DELIVERIES_KEY, {delivery_id: time.time()}, nx=True)
+            # Only keep a week of delivery ids, matching GitHub's redelivery window
+            self.redis.zremrangebyscore(DELIVERIES_KEY, 0, time.time() - 7 * 86400)
+            return bool(added)
+        except redis.RedisError:
+            return True
+
+    def seen_delivery(self, delivery_id: str) -> bool:
+        try:
+            return self.redis.zscore(DELIVERIES_KEY, delivery_id) is not None
+        except redis.RedisError:
+            return False
+
+
+async def replay_missed_deliveries(
+    cache: GitHubCache,
+    hook_id: Optional[str] = None,
+    token: Optional[str] = None,
+    org: Optional[str] = None,
+    max_pages: int = 5,
+) -> int:
+    """
+    Ask GitHub to redeliver webhook deliveries we never processed.
+
+    Walks the org hook's recent deliveries and requests a redelivery
+    attempt for every GUID missing from our delivery log.
+
+    Returns:
+        Number of redeliveries requested
+    """
+    hook_id = hook_id or os.getenv("GITHUB_WEBHOOK_HOOK_ID")
+    token = token or os.getenv("GITHUB_TOKEN")
+    org = org or os.getenv("GITHUB_ORG", "drafted")
+    if not hook_id or not token:
+        return 0
+
+    base = f"https://api.github.com/orgs/{org}/hooks/{hook_id}/deliveries"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+    }
+    requested = 0
+    seen_guids = set()
+
+    async with httpx.AsyncClient(headers=headers, timeout=30.0) as client:
+        url = base
+        params = {"per_page": 100}
+        for _ in range(max_pages):
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+
+            for delivery in response.json():
+                guid = delivery["guid"]
+                # Redeliveries share the GUID; only retry each once
+                if guid in seen_guids or cache.seen_delivery(guid):
+                    continue
+                seen_guids.add(guid)
+                retry = await client.post(f"{base}/{delivery['id']}/attempts")
+                if retry.status_code < 300:
+                    requested += 1
+
+            next_link = response.links.get("next")
+            if not next_link:
+                break
+            url, params = next_link["url"], None
+
+    return requested
@@ -1,9 +1,13 @@
 """GitHub API client for agent operations"""
 
 import os
+import asyncio
 from typing import Dict, List, Optional, Any
 from github import Github, GithubException
 
+from src.tools.github_cache import GitHubCache, PR_LIST_CAP
+from src.tools.github_archive import TreeArchiveCache, TreeSnapshot
+
 
 class GitHubClient:
     """
@@ -12,18 +16,31 @@ class GitHubClient:
     Provides safe, scoped access to GitHub resources.
     """
     
-    def __init__(self, token: Optional[str] = None, org: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        org: Optional[str] = None,
+        cache: Optional[GitHubCache] = None
+    ):
         self.token = token or os.getenv("GITHUB_TOKEN")
         self.org = org or os.getenv("GITHUB_ORG", "drafted")
-        self.client = Github(self.token)
+        # Full pages keep the PR cache window to a single request
+        self.client = Github(self.token, per_page=PR_LIST_CAP)
+        # Webhook-fed cache; set GITHUB_CACHE_MAX_AGE=0 to always hit GitHub
+        self.cache = cache or GitHubCache()
+        self.archives = TreeArchiveCache()
     
     async def get_issue(self, repo: str, issue_number: int) -> Dict[str, Any]:
-        """Fetch issue details"""
+        """Fetch issue details (served from the webhook cache when fresh)"""
+        cached = self.cache.get_issue(repo, issue_number)
+        if cached is not None:
+            return cached
+        
         try:
             repo_obj = self.client.get_repo(f"{self.org}/{repo}")
             issue = repo_obj.get_issue(issue_number)
             
-            return {
+            issue_data = {
                 "number": issue.number,
                 "title": issue.title,
                 "body": issue.body,
@@ -34,6 +51,8 @@ class GitHubClient:
                 "updated_at": issue.updated_at.isoformat(),
                 "url": issue.html_url,
             }
+            self.cache.put_issue(repo, issue_data)
+            return issue_data
         except GithubException as e:
             raise Exception(f"Failed to fetch issue: {e.data.get('message', str(e))}")
     
@@ -68,13 +87,64 @@ class GitHubClient:
         except GithubException as e:
             raise Exception(f"Failed to fetch file: {e.data.get('message', str(e))}")
     
+    async def get_tree(self, repo: str, path: str = "", ref: str = "main") -> TreeSnapshot:
+        """
+        Fetch a whole directory in one archive download.
+        
+        Use this instead of many get_file() calls when a task needs
+        several files from one subtree.
+        
+        Args:
+            repo: Repository name
+            path: Sub-directory to keep ("" for the whole repo)
+            ref: Branch, tag or commit
+            
+        Returns:
+            TreeSnapshot for reading files under `path` from local disk
+        """
+        path = path.strip("/")
+        try:
+            repo_obj = self.client.get_repo(f"{self.org}/{repo}")
+            commit = repo_obj.get_commit(ref)
+            tree_sha = commit.commit.tree.sha
+            
+            if path:
+                # The parent listing carries the sub-tree SHA of `path`
+                parent, _, leaf = path.rpartition("/")
+                entries = repo_obj.get_contents(parent, ref=commit.sha)
+                entries = entries if isinstance(entries, list) else [entries]
+                match = [e for e in entries if e.name == leaf and e.type == "dir"]
+                if not match:
+                    raise Exception(f"Path {path} is not a directory")
+                tree_sha = match[0].sha
+        except GithubException as e:
+            raise Exception(f"Failed to resolve tree: {e.data.get('message', str(e))}")
+        
+        cached = self.archives.get(tree_sha, prefix=path)
+        if cached:
+            return cached
+        
+        return await asyncio.to_thread(
+            self.archives.fetch,
+            f"https://api.github.com/repos/{self.org}/{repo}/tarball/{commit.sha}",
+            {"Authorization": f"Bearer {self.token}", "Accept": "application/vnd.github+json"},
+            tree_sha,
+            path,
+        )
+    
     async def list_prs(self, repo: str, state: str = "open", limit: int = 10) -> List[Dict[str, Any]]:
-        """List pull requests"""
+        """List pull requests (served from the webhook cache when fresh)"""
+        cached = self.cache.get_prs(repo, state, limit)
+        if cached is not None:
+            return cached
+        
         try:
             repo_obj = self.client.get_repo(f"{self.org}/{repo}")
             prs = repo_obj.get_pulls(state=state)
             
-            return [
+            # Fetch a full cache window so later calls with other limits hit
+            fetch_count = max(limit, PR_LIST_CAP)
+            pr_list = [
                 {
                     "number": pr.number,
                     "title": pr.title,
@@ -82,12 +152,30 @@ class GitHubClient:
                     "url": pr.html_url,
                     "author": pr.user.login,
                     "created_at": pr.created_at.isoformat(),
+                    "updated_at": pr.updated_at.isoformat(),
                 }
-                for pr in list(prs[:limit])
+                for pr in list(prs[:fetch_count])
             ]
+            # Only the first PR_LIST_CAP are cached; the list is complete if they're all there is
+            self.cache.put_prs(repo, state, pr_list, complete=len(pr_list) < PR_LIST_CAP)
+            return pr_list[:limit]
         except GithubException as e:
             raise Exception(f"Failed to list PRs: {e.data.get('message', str(e))}")
     
+    async def get_head_sha(self, repo: str, ref: str = "main") -> str:
+        """Get the commit SHA a branch points at"""
+        cached = self.cache.get_head_sha(repo, ref)
+        if cached is not None:
+            return cached
+        
+        try:
+            repo_obj = self.client.get_repo(f"{self.org}/{repo}")
+            sha = repo_obj.get_branch(ref).commit.sha
+            self.cache.put_head_sha(repo, ref, sha)
+            return sha
+        except GithubException as e:
+            raise Exception(f"Failed to resolve {ref}: {e.data.get('message', str(e))}")
+    
     async def create_pr(
         self,
         repo: str,
@@ -0,0 +1,48 @@
+"""Change events for the indexer: webhook payloads appended to a Redis stream"""
+
+from typing import Dict, Any, List
+
+import redis
+
+
+# One stream per source ("indexer:changes:repos"), read by
+# apps/indexer/change_feed.py; keep the prefix in sync. Only sources the
+# indexer consumes are published, or their streams would just fill up
+STREAM_PREFIX = "indexer:changes"
+
+# Approximate cap; the indexer acks within seconds, so this is only a backstop
+STREAM_MAXLEN = 100000
+
+
+def stream_for(source: str) -> str:
+    return f"{STREAM_PREFIX}:{source}"
+
+
+def github_changes(event: str, payload: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Index changes implied by a GitHub webhook (branch pushes)"""
+    repo = (payload.get("repository") or {}).get("full_name")
+    if not repo:
+        return []
+
+    if event == "push":
+        ref = payload.get("ref", "")
+        if not ref.startswith("refs/heads/") or payload.get("deleted") or not payload.get("after"):
+            return []
+        return [{"source": "repos", "key": f"{repo}@{ref[len('refs/heads/'):]}", "head": payload["after"]}]
+
+    return []
+
+
+def publish_changes(redis_conn: redis.Redis, changes: List[Dict[str, str]]) -> List[str]:
+    """
+    Append changes to their source's stream.
+
+    Returns:
+        Stream entry ids
+    """
+    if not changes:
+        return []
+    pipe = redis_conn.pipeline()
+    for change in changes:
+        pipe.xadd(stream_for(change["source"]), change, maxlen=STREAM_MAXLEN, approximate=True)
+    return [entry.decode() if isinstance(entry, bytes) else entry for entry in pipe.execute()]
@@ -0,0 +1,325 @@
+"""Hybrid (vector + BM25) retrieval over the indexer's Qdrant collections"""
+
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import hashlib
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+import redis
+
+
+DEFAULT_COLLECTIONS = ("repos", "docs", "tickets")
+
+CACHE_KEY_PREFIX = "knowledge:search"
+
+# Vector candidates pulled per collection for every result slot
+CANDIDATES_PER_RESULT = 4
+
+# Reciprocal rank fusion constant; damps the gap between ranks 1 and 2
+RRF_K = 60
+
+# Lexical rank counts slightly less than semantic rank
+LEXICAL_WEIGHT = 0.8
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", (text or "").lower()) if len(t) > 1]
+
+
+def bm25_scores(query: str, texts: List[str]) -> List[float]:
+    """BM25 of `query` against each text, with IDF taken over the candidate set"""
+    terms = set(tokenize(query))
+    docs = [Counter(tokenize(text)) for text in texts]
+    if not terms or not docs:
+        return [0.0] * len(texts)
+
+    avg_len = sum(sum(doc.values()) for doc in docs) / len(docs) or 1.0
+    df = {term: sum(1 for doc in docs if term in doc) for term in terms}
+    scores = []
+    for doc in docs:
+        length = sum(doc.values())
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        scores.append(score)
+    return scores
+
+
+def hash_embedding(text: str, dim: int) -> List[float]:
+    """
+    Mirror of the indexer's HashEmbedder (apps/indexer/embeddings.py);
+    queries must be embedded exactly the way the corpus was
+    """
+    vector = [0.0] * dim
+    words = re.findall(r"\w+", text.lower())
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        vector[digest % dim] += 1.0 if digest >> 63 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def search_args(
+    outputs: Dict[str, Any],
+    request: str,
+    issue: Optional[Dict[str, Any]] = None
+) -> Tuple[str, int, Tuple[str, ...]]:
+    """
+    (query, k, collections) for a job's knowledge search.
+
+    Shared by the knowledge_search skill and the prefetcher so a
+    prefetched search is keyed exactly like the skill's own.
+    """
+    query = outputs.get("knowledge_query") or request or ""
+    title = (issue or {}).get("title")
+    if title and title not in query:
+        query = f"{query}\n{title}"
+    k = outputs.get("knowledge_k", 8)
+    collections = tuple(outputs.get("knowledge_collections") or DEFAULT_COLLECTIONS)
+    return query, k, collections
+
+
+class KnowledgeClient:
+    """
+    Searches what apps/indexer builds.
+
+    The query is embedded once, each collection is searched
+    concurrently over Qdrant's REST API, and the candidates are fused
+    by reciprocal rank of vector score and BM25 over their text.
+    Results are cached per query for `cache_ttl` seconds, in process
+    and in Redis (RQ forks a process per job, so memory alone wouldn't
+    outlive one job).
+    """
+
+    def __init__(
+        self,
+        qdrant_url: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        cache_ttl: float = 300.0,
+        cache_size: int = 256
+    ):
+        self.qdrant_url = (qdrant_url or os.getenv("QDRANT_URL") or "").rstrip("/")
+        self.backend = os.getenv("EMBEDDING_BACKEND") or ("openai" if os.getenv("OPENAI_API_KEY") else "hash")
+        self.model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        self.dim = int(os.getenv("EMBEDDING_DIM", "1536"))
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self._redis = None
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._openai = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.qdrant_url)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, reused across calls"""
+        if self._http is None or self._http.is_closed:
+            headers = {"api-key": os.environ["QDRANT_API_KEY"]} if os.getenv("QDRANT_API_KEY") else {}
+            self._http = httpx.AsyncClient(
+                base_url=self.qdrant_url,
+                headers=headers,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+            )
+        return self._http
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+
+    async def embed(self, text: str) -> List[float]:
+        if self.backend == "hash":
+            return hash_embedding(text, self.dim)
+        if self._openai is None:
+            from openai import AsyncOpenAI
+            self._openai = AsyncOpenAI()
+        response = await self._openai.embeddings.create(model=self.model, input=[text])
+        return response.data[0].embedding
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    async def _search_collection(
+        self,
+        collection: str,
+        vector: List[float],
+        limit: int,
+        query_filter: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], float]:
+        started = time.monotonic()
+        body = {"vector": vector, "limit": limit, "with_payload": True}
+        if query_filter:
+            body["filter"] = query_filter
+        response = await self.http.post(f"/collections/{collection}/points/search", json=body)
+        elapsed = (time.monotonic() - started) * 1000
+        if response.status_code == 404:
+            # Collection not built yet
+            return [], elapsed
+        response.raise_for_status()
+        hits = [
+            {"id": hit["id"], "vector_score": hit["score"], "collection": collection, **(hit.get("payload") or {})}
+            for hit in response.json().get("result", [])
+        ]
+        return hits, elapsed
+
+    def _cache_key(self, query: str, collections: Tuple[str, ...], k: int, filters: Optional[Dict[str, Any]]) -> str:
+        normalized = " ".join(tokenize(query))
+        raw = json.dumps([normalized, self.backend, collections, k, filters], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.cache_ttl:
+            self._cache.move_to_end(key)
+            return entry[1]
+        try:
+            raw = self.redis.get(f"{CACHE_KEY_PREFIX}:{key}")
+        except redis.RedisError:
+            return None
+        if raw is None:
+            return None
+        result = json.loads(raw)
+        self._cache[key] = (time.monotonic(), result)
+        return result
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        self._cache[key] = (time.monotonic(), result)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        try:
+            self.redis.set(f"{CACHE_KEY_PREFIX}:{key}", json.dumps(result, default=str), ex=int(self.cache_ttl))
+        except redis.RedisError:
+            pass
+
+    async def search(
+        self,
+        query: str,
+        k: int = 8,
+        collections: Tuple[str, ...] = DEFAULT_COLLECTIONS,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Top-k deduplicated passages across `collections`.
+
+        Args:
+            query: Free-text query
+            k: Passages to return
+            collections: Qdrant collections to search
+            filters: Optional Qdrant filter per collection name
+
+        Returns:
+            {"passages": [...], "timings": {...}, "cached": bool}
+        """
+        collections = tuple(collections)
+        key = self._cache_key(query, collections, k, filters)
+        cached = self._cached(key)
+        if cached is not None:
+            self.hits += 1
+            return {**cached, "cached": True}
+        self.misses += 1
+
+        started = time.monotonic()
+        vector = await self.embed(query)
+        embed_ms = (time.monotonic() - started) * 1000
+
+        results = await asyncio.gather(
+            *(
+                self._search_collection(name, vector, k * CANDIDATES_PER_RESULT, (filters or {}).get(name))
+                for name in collections
+            ),
+            return_exceptions=True
+        )
+
+        candidates, timings, errors = [], {"embed_ms": round(embed_ms, 1)}, {}
+        for name, result in zip(collections, results):
+            if isinstance(result, Exception):
+                # One unavailable collection shouldn't sink the search
+                errors[name] = str(result)
+                continue
+            hits, elapsed = result
+            candidates.extend(hits)
+            timings[f"{name}_ms"] = round(elapsed, 1)
+
+        fuse_started = time.monotonic()
+        passages = self._fuse(query, candidates, k)
+        timings["fuse_ms"] = round((time.monotonic() - fuse_started) * 1000, 1)
+        timings["total_ms"] = round((time.monotonic() - started) * 1000, 1)
+
+        result = {"passages": passages, "timings": timings, "candidates": len(candidates), "errors": errors}
+        if not errors:
+            self._store(key, result)
+        return {**result, "cached": False}
+
+    def _fuse(self, query: str, candidates: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion of vector and BM25 ranks, deduplicated by content"""
+        if not candidates:
+            return []
+
+        lexical = bm25_scores(query, [c.get("text", "") for c in candidates])
+        for candidate, score in zip(candidates, lexical):
+            candidate["lexical_score"] = round(score, 4)
+
+        by_vector = sorted(range(len(candidates)), key=lambda i: -candidates[i]["vector_score"])
+        by_lexical = sorted(range(len(candidates)), key=lambda i: -lexical[i])
+        fused = [0.0] * len(candidates)
+        for rank, i in enumerate(by_vector):
+            fused[i] += 1.0 / (RRF_K + rank + 1)
+        for rank, i in enumerate(by_lexical):
+            if lexical[i] > 0:
+                fused[i] += LEXICAL_WEIGHT / (RRF_K + rank + 1)
+
+        passages, seen = [], set()
+        for i in sorted(range(len(candidates)), key=lambda i: -fused[i]):
+            candidate = candidates[i]
+            # The same text can be indexed from several places (copies, branches)
+            fingerprint = candidate.get("hash") or hashlib.sha256(
+                " ".join(tokenize(candidate.get("text", ""))).encode()
+            ).hexdigest()
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            candidate["score"] = round(fused[i], 5)
+            passages.append(candidate)
+            if len(passages) == k:
+                break
+        return passages
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._cache),
+        }
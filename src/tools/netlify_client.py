@@ -5,6 +5,8 @@ import httpx
 from typing import Dict, Optional, Any
 import asyncio
 
+from src.tools.netlify_watcher import get_watcher
+
 
 class NetlifyClient:
     """
@@ -21,79 +23,79 @@ class NetlifyClient:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
         }
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, reused across calls"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+            )
+        return self._http
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     async def get_site(self) -> Dict[str, Any]:
         """Get site information"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/sites/{self.site_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.get(f"/sites/{self.site_id}")
+        response.raise_for_status()
+        return response.json()
     
     async def list_deploys(self, limit: int = 10) -> list[Dict[str, Any]]:
         """List recent deploys"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/sites/{self.site_id}/deploys",
-                headers=self.headers,
-                params={"per_page": limit}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.get(
+            f"/sites/{self.site_id}/deploys",
+            params={"per_page": limit}
+        )
+        response.raise_for_status()
+        return response.json()
     
     async def get_deploy(self, deploy_id: str) -> Dict[str, Any]:
         """Get deploy details"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deploys/{deploy_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.get(f"/deploys/{deploy_id}")
+        response.raise_for_status()
+        return response.json()
     
     async def get_deploy_for_pr(self, pr_number: int, max_wait: int = 60) -> Optional[Dict[str, Any]]:
         """
         Find deploy preview for a PR.
         
-        Polls for up to max_wait seconds.
+        Waits up to max_wait seconds on the site's shared deploy watcher,
+        so concurrent jobs don't each poll the deploy list.
         """
-        for _ in range(max_wait // 5):
-            deploys = await self.list_deploys(limit=50)
-            
-            # Look for deploy with PR context
-            for deploy in deploys:
-                context = deploy.get("context", "")
-                deploy_pr = deploy.get("branch", "")
-                
-                if f"pr-{pr_number}" in context.lower() or f"pull/{pr_number}" in deploy_pr:
-                    return {
-                        "id": deploy["id"],
-                        "url": deploy.get("deploy_ssl_url") or deploy.get("ssl_url"),
-                        "state": deploy["state"],
-                        "created_at": deploy["created_at"],
-                        "published_at": deploy.get("published_at"),
-                    }
-            
-            await asyncio.sleep(5)
+        deploy = await get_watcher(self).wait_for(pr_number=pr_number, timeout=max_wait)
+        if not deploy:
+            return None
         
-        return None
+        return {
+            "id": deploy["id"],
+            "url": deploy.get("deploy_ssl_url") or deploy.get("ssl_url"),
+            "state": deploy["state"],
+            "created_at": deploy["created_at"],
+            "published_at": deploy.get("published_at"),
+        }
     
     async def trigger_build(self) -> Dict[str, Any]:
         """Trigger a new build"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/sites/{self.site_id}/builds",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.post(f"/sites/{self.site_id}/builds")
+        response.raise_for_status()
+        return response.json()
     
     async def wait_for_deploy(self, deploy_id: str, timeout: int = 300) -> Dict[str, Any]:
         """
         Wait for deploy to complete.
         
+        Resolves on the deploy-notification event when webhooks are
+        configured, falling back to the shared watcher's polling.
+        
         Args:
             deploy_id: Deploy ID to watch
             timeout: Maximum seconds to wait
@@ -101,16 +103,17 @@ class NetlifyClient:
         Returns:
             Final deploy status
         """
-        start_time = asyncio.get_event_loop().time()
+        deploy = await self.get_deploy(deploy_id)
+        if deploy["state"] in ["ready", "error"]:
+            return deploy
         
-        while True:
-            deploy = await self.get_deploy(deploy_id)
-            state = deploy["state"]
-            
-            if state in ["ready", "error"]:
-                return deploy
-            
-            if asyncio.get_event_loop().time() - start_time > timeout:
-                raise TimeoutError(f"Deploy {deploy_id} did not complete within {timeout}s")
-            
-            await asyncio.sleep(10)
+        watcher = get_watcher(self)
+        watcher.publish(deploy)
+        deploy = await watcher.wait_for(
+            deploy_id=deploy_id,
+            states={"ready", "error"},
+            timeout=timeout
+        )
+        if deploy is None:
+            raise TimeoutError(f"Deploy {deploy_id} did not complete within {timeout}s")
+        return deploy
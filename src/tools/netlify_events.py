@@ -0,0 +1,200 @@
+"""Netlify deploy notifications: webhook verification and Redis pub/sub fan-out"""
+
+import os
+import json
+import hmac
+import base64
+import asyncio
+import hashlib
+from typing import Dict, Any, Callable, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+
+# Recent deploy snapshots are kept so late subscribers can catch up
+SNAPSHOT_TTL = 3600
+# A poller that stops renewing its lease is replaced after this long
+POLLER_LEASE_TTL = 75
+
+_RENEW_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def channel_for(site_id: str) -> str:
+    return f"netlify:deploys:{site_id}"
+
+
+def snapshot_key(site_id: str) -> str:
+    return f"netlify:deploys:{site_id}:latest"
+
+
+def poller_key(site_id: str) -> str:
+    return f"netlify:deploys:{site_id}:poller"
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def verify_signature(secret: str, body: bytes, token: Optional[str]) -> bool:
+    """
+    Verify Netlify's `X-Webhook-Signature` JWS (HS256).
+
+    The token is signed with the shared secret and carries the SHA-256
+    of the request body.
+    """
+    if not secret or not token or token.count(".") != 2:
+        return False
+
+    header, payload, signature = token.split(".")
+    expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    try:
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return False
+        claims = json.loads(_b64url_decode(payload))
+    except (ValueError, json.JSONDecodeError):
+        return False
+
+    return claims.get("iss") == "netlify" and \
+        hmac.compare_digest(claims.get("sha256", ""), hashlib.sha256(body).hexdigest())
+
+
+def publish_deploy_event(redis_conn: redis.Redis, deploy: Dict[str, Any]) -> int:
+    """
+    Publish a deploy notification to the site's channel.
+
+    Returns:
+        Number of subscribers that received it
+    """
+    return _queue_deploy(redis_conn.pipeline(), deploy).execute()[-1]
+
+
+def _queue_deploy(pipe, deploy: Dict[str, Any]):
+    site_id = deploy["site_id"]
+    message = json.dumps(deploy)
+    pipe.hset(snapshot_key(site_id), deploy["id"], message)
+    pipe.expire(snapshot_key(site_id), SNAPSHOT_TTL)
+    pipe.publish(channel_for(site_id), message)
+    return pipe
+
+
+class PollerLease:
+    """
+    Elects one deploy poller per site across every worker process.
+
+    RQ runs each job in its own process, so an in-process watcher can't
+    stop twenty jobs from polling twenty times. The lease holder polls
+    and publishes what it finds to the site's channel; everyone else
+    just listens.
+    """
+
+    def __init__(self, site_id: str, redis_url: Optional[str] = None, ttl: int = POLLER_LEASE_TTL):
+        self.site_id = site_id
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.ttl = ttl
+        self.token = f"{os.getpid()}:{os.urandom(8).hex()}"
+        self._conn: Optional[aioredis.Redis] = None
+
+    @property
+    def conn(self) -> aioredis.Redis:
+        if self._conn is None:
+            self._conn = aioredis.from_url(self.redis_url)
+        return self._conn
+
+    async def hold(self) -> bool:
+        """Take or renew the lease; False while another process holds it"""
+        key = poller_key(self.site_id)
+        if await self.conn.set(key, self.token, nx=True, ex=self.ttl):
+            return True
+        return bool(await self.conn.eval(_RENEW_LEASE, 1, key, self.token, self.ttl))
+
+    async def publish(self, deploy: Dict[str, Any]):
+        await _queue_deploy(self.conn.pipeline(), {**deploy, "site_id": self.site_id}).execute()
+
+    async def release(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.eval(_RELEASE_LEASE, 1, poller_key(self.site_id), self.token)
+        except Exception:
+            pass
+        finally:
+            await self._conn.aclose()
+            self._conn = None
+
+
+class DeployEventSubscriber:
+    """
+    Listens to a site's deploy channel and hands each deploy to a callback.
+
+    Reconnects with backoff; `connected` tells callers whether they can
+    rely on events or must poll.
+    """
+
+    def __init__(
+        self,
+        site_id: str,
+        on_deploy: Callable[[Dict[str, Any]], None],
+        redis_url: Optional[str] = None
+    ):
+        self.site_id = site_id
+        self.on_deploy = on_deploy
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.connected = False
+        self.events_received = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            conn = aioredis.from_url(self.redis_url)
+            pubsub = conn.pubsub()
+            try:
+                await pubsub.subscribe(channel_for(self.site_id))
+                self.connected = True
+                delay = 1.0
+
+                # Catch up on anything published before we subscribed
+                for raw in (await conn.hgetall(snapshot_key(self.site_id))).values():
+                    self.on_deploy(json.loads(raw))
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    self.events_received += 1
+                    self.on_deploy(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.connected = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                self.connected = False
+                await pubsub.aclose()
+                await conn.aclose()
@@ -0,0 +1,321 @@
+"""Shared Netlify deploy watcher - one polling loop per site across workers"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set, TYPE_CHECKING
+
+from src.tools.netlify_events import DeployEventSubscriber, PollerLease
+
+if TYPE_CHECKING:
+    from src.tools.netlify_client import NetlifyClient
+
+
+def deploy_pr_number(deploy: Dict[str, Any]) -> Optional[int]:
+    """Extract the PR number a deploy belongs to, if any"""
+    if deploy.get("review_id"):
+        return int(deploy["review_id"])
+
+    context = (deploy.get("context") or "").lower()
+    if context.startswith("pr-") and context[3:].isdigit():
+        return int(context[3:])
+
+    branch = deploy.get("branch") or ""
+    if branch.startswith("pull/"):
+        number = branch.split("/")[1]
+        if number.isdigit():
+            return int(number)
+    return None
+
+
+@dataclass
+class _Waiter:
+    """A pending wait_for() call"""
+    future: asyncio.Future
+    pr_number: Optional[int] = None
+    branch: Optional[str] = None
+    deploy_id: Optional[str] = None
+    states: Optional[Set[str]] = None
+
+    def matches(self, deploy: Dict[str, Any]) -> bool:
+        if self.deploy_id and deploy["id"] != self.deploy_id:
+            return False
+        if self.pr_number is not None and deploy_pr_number(deploy) != self.pr_number:
+            return False
+        if self.branch and deploy.get("branch") != self.branch:
+            return False
+        return self.states is None or deploy.get("state") in self.states
+
+
+@dataclass
+class WatcherStats:
+    """Counters for observing how much polling the watcher saves"""
+    polls: int = 0
+    deploys_indexed: int = 0
+    waiters_resolved: int = 0
+    events: int = 0
+    interval: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class DeployWatcher:
+    """
+    Polls one site's deploy list on behalf of every waiting job.
+
+    Deploys are indexed by id, PR number and branch; each poll resolves
+    all matching waiters at once. The loop only runs while someone is
+    waiting and backs off while nothing changes.
+
+    When the deploy-notification channel is live, events resolve waiters
+    directly and polling only runs if no event arrived for
+    `event_fallback` seconds. Only the process holding the site's
+    PollerLease polls; it publishes what it finds on the channel, so
+    watchers in other job processes wait on events instead of polling.
+    """
+
+    def __init__(
+        self,
+        client: "NetlifyClient",
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        page_size: int = 10,
+        max_page_size: int = 100,
+        event_fallback: float = 30.0,
+        use_events: bool = True,
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.event_fallback = event_fallback
+
+        self.deploys: Dict[str, Dict[str, Any]] = {}
+        self.by_pr: Dict[int, str] = {}
+        self.by_branch: Dict[str, str] = {}
+        self.stats = WatcherStats(interval=min_interval)
+
+        self._waiters: List[_Waiter] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._needs_poll = True
+        self._last_event = 0.0
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.events: Optional[DeployEventSubscriber] = None
+        self.lease: Optional[PollerLease] = None
+        if use_events and client.site_id:
+            self.events = DeployEventSubscriber(client.site_id, self._on_event)
+            self.lease = PollerLease(client.site_id)
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _index(self, deploy: Dict[str, Any]) -> bool:
+        """Store a deploy; returns True if it is new or changed"""
+        previous = self.deploys.get(deploy["id"])
+        if previous and previous.get("updated_at") == deploy.get("updated_at") \
+                and previous.get("state") == deploy.get("state"):
+            return False
+
+        self.deploys[deploy["id"]] = deploy
+        self.stats.deploys_indexed += 1
+
+        # Newest deploy wins for PR / branch lookups
+        pr_number = deploy_pr_number(deploy)
+        if pr_number is not None:
+            current = self.deploys.get(self.by_pr.get(pr_number, ""))
+            if not current or current.get("created_at", "") <= deploy.get("created_at", ""):
+                self.by_pr[pr_number] = deploy["id"]
+        branch = deploy.get("branch")
+        if branch:
+            current = self.deploys.get(self.by_branch.get(branch, ""))
+            if not current or current.get("created_at", "") <= deploy.get("created_at", ""):
+                self.by_branch[branch] = deploy["id"]
+        return True
+
+    def lookup(
+        self,
+        pr_number: Optional[int] = None,
+        branch: Optional[str] = None,
+        deploy_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the latest indexed deploy for a PR, branch or id"""
+        if deploy_id:
+            return self.deploys.get(deploy_id)
+        if pr_number is not None:
+            return self.deploys.get(self.by_pr.get(pr_number, ""))
+        if branch:
+            return self.deploys.get(self.by_branch.get(branch, ""))
+        return None
+
+    def publish(self, deploy: Dict[str, Any]):
+        """Feed a deploy from outside the poll loop and resolve waiters"""
+        if self._index(deploy):
+            self._resolve()
+
+    def _on_event(self, deploy: Dict[str, Any]):
+        self.stats.events += 1
+        # Echoes of our own polls carry nothing new and don't count as activity
+        if self._index(deploy):
+            self._last_event = time.monotonic()
+            self._resolve()
+
+    def _events_live(self) -> bool:
+        return self.events is not None and self.events.connected
+
+    def _resolve(self):
+        for waiter in list(self._waiters):
+            if waiter.future.done():
+                self._waiters.remove(waiter)
+                continue
+            deploy = self.lookup(waiter.pr_number, waiter.branch, waiter.deploy_id)
+            if deploy and waiter.matches(deploy):
+                waiter.future.set_result(deploy)
+                self._waiters.remove(waiter)
+                self.stats.waiters_resolved += 1
+
+    # ------------------------------------------------------------------
+    # Waiting
+    # ------------------------------------------------------------------
+
+    async def wait_for(
+        self,
+        pr_number: Optional[int] = None,
+        branch: Optional[str] = None,
+        deploy_id: Optional[str] = None,
+        states: Optional[Set[str]] = None,
+        timeout: float = 60,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a matching deploy shows up.
+
+        Args:
+            pr_number / branch / deploy_id: What to look for
+            states: Only resolve once the deploy is in one of these states
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            Deploy object, or None on timeout
+        """
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            pr_number=pr_number,
+            branch=branch,
+            deploy_id=deploy_id,
+            states=states,
+        )
+        deploy = self.lookup(pr_number, branch, deploy_id)
+        if deploy and waiter.matches(deploy):
+            return deploy
+
+        self._waiters.append(waiter)
+        # A new waiter deserves a fresh poll, not the backed-off interval
+        self.stats.interval = self.min_interval
+        self._needs_poll = True
+        self._wake.set()
+        if self.events:
+            self.events.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def idle(self) -> bool:
+        return not self._waiters and (self._task is None or self._task.done())
+
+    async def _poll_once(self) -> bool:
+        """Fetch recent deploys; grow the page only while all of it is new"""
+        changed = False
+        page_size = self.page_size
+        while True:
+            deploys = await self.client.list_deploys(limit=page_size)
+            self.stats.polls += 1
+            fresh = [d for d in deploys if self._index(d)]
+            if self.lease and self._events_live():
+                for deploy in fresh:
+                    await self.lease.publish(deploy)
+            changed = changed or bool(fresh)
+            if len(fresh) < len(deploys) or len(deploys) < page_size or page_size >= self.max_page_size:
+                return changed
+            page_size = min(page_size * 5, self.max_page_size)
+
+    async def _run(self):
+        try:
+            while self._waiters:
+                try:
+                    delay = await self._step()
+                except Exception as e:
+                    self.stats.errors = (self.stats.errors + [str(e)])[-10:]
+                    self.stats.interval = min(self.stats.interval * self.backoff, self.max_interval)
+                    delay = self.stats.interval
+                await self._sleep(delay)
+        finally:
+            # Whatever stopped the loop, nobody is left waiting on it
+            for waiter in self._waiters:
+                if not waiter.future.done():
+                    waiter.future.set_exception(RuntimeError(f"Deploy watcher for {self.client.site_id} stopped"))
+            if self.lease:
+                await self.lease.release()
+            if self.events:
+                await self.events.stop()
+
+    async def _step(self) -> float:
+        """One round of the loop; returns how long to sleep"""
+        if self.lease and self._events_live() and not await self.lease.hold():
+            # Another worker polls this site and publishes what it finds
+            return self.lease.ttl / 3
+
+        # While notifications are arriving, poll only for new waiters (to
+        # catch deploys that finished before they subscribed)
+        quiet_for = time.monotonic() - self._last_event
+        if self._events_live() and not self._needs_poll and quiet_for < self.event_fallback:
+            return self.event_fallback - quiet_for
+
+        self._needs_poll = False
+        changed = await self._poll_once()
+
+        self._resolve()
+        if changed:
+            self.stats.interval = self.min_interval
+        else:
+            self.stats.interval = min(self.stats.interval * self.backoff, self.max_interval)
+        return self.stats.interval
+
+    async def _sleep(self, seconds: float):
+        """Sleep, waking early when a new waiter arrives"""
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+# One watcher per (event loop, site) so every coroutine in this process
+# shares it; PollerLease takes care of sharing across processes
+_watchers: Dict[tuple, DeployWatcher] = {}
+
+
+def get_watcher(client: "NetlifyClient") -> DeployWatcher:
+    """Return the shared watcher for the client's site"""
+    loop = asyncio.get_running_loop()
+    for key, watcher in list(_watchers.items()):
+        if watcher.loop is not loop and (watcher.loop.is_closed() or watcher.idle()):
+            del _watchers[key]
+
+    key = (id(loop), client.site_id)
+    watcher = _watchers.get(key)
+    if watcher is None or watcher.loop is not loop:
+        watcher = DeployWatcher(client)
+        watcher.loop = loop
+        _watchers[key] = watcher
+    return watcher
@@ -0,0 +1,215 @@
+"""Recursive Notion block-tree loading and rendering"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, AsyncIterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.tools.notion_client import NotionClient
+
+
+# Block types whose children are fetched via blocks.children.list
+SKIP_CHILDREN = {"child_database", "unsupported"}
+
+
+def rich_text_plain(rich_text: List[Dict[str, Any]]) -> str:
+    return "".join(rt.get("plain_text", "") for rt in rich_text)
+
+
+def render_block(block: Dict[str, Any]) -> str:
+    """Render one block (without children) as markdown-like text"""
+    block_type = block.get("type")
+    if not block_type:
+        return ""
+
+    data = block.get(block_type, {})
+    text = rich_text_plain(data.get("rich_text", []))
+
+    if block_type == "heading_1":
+        return f"# {text}"
+    if block_type == "heading_2":
+        return f"## {text}"
+    if block_type == "heading_3":
+        return f"### {text}"
+    if block_type == "bulleted_list_item":
+        return f"- {text}"
+    if block_type == "numbered_list_item":
+        return f"1. {text}"
+    if block_type == "to_do":
+        return f"[{'x' if data.get('checked') else ' '}] {text}"
+    if block_type == "quote":
+        return f"> {text}"
+    if block_type == "code":
+        return f"```{data.get('language', '')}\n{text}\n```"
+    if block_type == "child_page":
+        return f"## {data.get('title', '')}"
+    if block_type == "divider":
+        return "---"
+    return text
+
+
+@dataclass
+class BlockNode:
+    """A fetched block and its (fetched) children"""
+    block: Dict[str, Any]
+    depth: int
+    text: str
+    children: List["BlockNode"] = field(default_factory=list)
+
+
+@dataclass
+class RenderedBlock:
+    """Streamed as soon as a block's parent listing arrives"""
+    block_id: str
+    parent_id: str
+    depth: int
+    text: str
+
+
+@dataclass
+class BlockTree:
+    """A fully loaded page with fetch statistics"""
+    page_id: str
+    roots: List[BlockNode]
+    block_count: int
+    requests: int
+    fetch_seconds: float
+
+    @property
+    def text(self) -> str:
+        """Whole document in order; nested blocks are indented"""
+        parts = []
+        for root in self.roots:
+            lines = []
+            self._render(root, lines)
+            if lines:
+                parts.append("\n".join(lines))
+        return "\n\n".join(parts)
+
+    def _render(self, node: BlockNode, lines: List[str]):
+        if node.text:
+            indent = "  " * node.depth
+            lines.append("\n".join(indent + line for line in node.text.split("\n")))
+        for child in node.children:
+            self._render(child, lines)
+
+
+class BlockTreeLoader:
+    """
+    Loads a page's full block tree.
+
+    Follows `has_more` cursors, descends into toggles, columns, synced
+    blocks and child pages, and expands parents breadth-first with at
+    most `concurrency` listings in flight.
+    """
+
+    def __init__(
+        self,
+        notion: "NotionClient",
+        concurrency: int = 3,
+        max_depth: Optional[int] = None,
+        include_child_pages: bool = True,
+    ):
+        self.notion = notion
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self.include_child_pages = include_child_pages
+        self.requests = 0
+
+    async def list_children(self, block_id: str) -> List[Dict[str, Any]]:
+        """All children of a block, following pagination cursors"""
+        children = []
+        cursor = None
+        while True:
+            params = {"block_id": block_id, "page_size": 100}
+            if cursor:
+                params["start_cursor"] = cursor
+            response = await self.notion._call(self.notion.client.blocks.children.list, **params)
+            self.requests += 1
+            children.extend(response.get("results", []))
+            if not response.get("has_more"):
+                return children
+            cursor = response["next_cursor"]
+
+    def _should_expand(self, block: Dict[str, Any], depth: int) -> bool:
+        if not block.get("has_children") or block.get("type") in SKIP_CHILDREN:
+            return False
+        if block.get("type") == "child_page" and not self.include_child_pages:
+            return False
+        return self.max_depth is None or depth < self.max_depth
+
+    async def stream(self, page_id: str) -> AsyncIterator[tuple]:
+        """
+        Yield (parent_id, depth, children) listings as they arrive.
+
+        Use `stream_text()` for rendered output or `load()` for the tree.
+        """
+        results: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen = {page_id}
+        tasks = set()
+
+        async def expand(parent_id: str, depth: int):
+            try:
+                async with semaphore:
+                    children = await self.list_children(parent_id)
+                await results.put((parent_id, depth, children, None))
+            except Exception as e:
+                await results.put((parent_id, depth, None, e))
+
+        def spawn(parent_id: str, depth: int):
+            tasks.add(asyncio.create_task(expand(parent_id, depth)))
+
+        spawn(page_id, 0)
+        outstanding = 1
+        try:
+            while outstanding:
+                parent_id, depth, children, error = await results.get()
+                outstanding -= 1
+                if error:
+                    raise error
+
+                for block in children:
+                    # Synced blocks and page links can point back at each other
+                    if self._should_expand(block, depth) and block["id"] not in seen:
+                        seen.add(block["id"])
+                        spawn(block["id"], depth + 1)
+                        outstanding += 1
+
+                yield parent_id, depth, children
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream_text(self, page_id: str) -> AsyncIterator[RenderedBlock]:
+        """Yield rendered blocks in arrival order (breadth-first)"""
+        async for parent_id, depth, children in self.stream(page_id):
+            for block in children:
+                text = render_block(block)
+                if text:
+                    yield RenderedBlock(block["id"], parent_id, depth, text)
+
+    async def load(self, page_id: str) -> BlockTree:
+        """Fetch the whole tree and return it with block count and timing"""
+        started = time.monotonic()
+        self.requests = 0
+        roots: List[BlockNode] = []
+        nodes: Dict[str, BlockNode] = {}
+        count = 0
+
+        async for parent_id, depth, children in self.stream(page_id):
+            siblings = roots if parent_id == page_id else nodes[parent_id].children
+            for block in children:
+                node = BlockNode(block=block, depth=depth, text=render_block(block))
+                nodes[block["id"]] = node
+                siblings.append(node)
+            count += len(children)
+
+        return BlockTree(
+            page_id=page_id,
+            roots=roots,
+            block_count=count,
+            requests=self.requests,
+            fetch_seconds=time.monotonic() - started,
+        )
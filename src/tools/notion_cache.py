@@ -0,0 +1,145 @@
+"""Persistent cache of rendered Notion pages keyed by last_edited_time"""
+
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "drafted-notion-cache.sqlite")
+
+# Notion rounds last_edited_time down to the minute, so a page cached
+# within a minute of its edit time may have changed without a new stamp
+EDIT_TIME_GRANULARITY = 60
+
+
+def parse_notion_time(value: str) -> float:
+    """Notion ISO timestamp -> epoch seconds"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class NotionPageCache:
+    """
+    SQLite cache of rendered page content.
+
+    One row per page holding the content rendered at a given
+    last_edited_time. Rows are evicted least-recently-used once the
+    stored content exceeds `max_bytes`.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.getenv("NOTION_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes or int(os.getenv("NOTION_CACHE_MAX_MB", "256")) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                page_id TEXT PRIMARY KEY,
+                last_edited_time TEXT NOT NULL,
+                title TEXT,
+                content TEXT NOT NULL,
+                block_count INTEGER,
+                child_pages TEXT,
+                size INTEGER NOT NULL,
+                cached_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+        """)
+
+    def _stable(self, last_edited_time: str, cached_at: float) -> bool:
+        return cached_at >= parse_notion_time(last_edited_time) + EDIT_TIME_GRANULARITY
+
+    def get(self, page_id: str, last_edited_time: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entry if it was rendered at `last_edited_time`.
+
+        Returns:
+            Dict with content, title, block_count, child_pages, cached_at
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_edited_time, title, content, block_count, child_pages, cached_at "
+                "FROM pages WHERE page_id = ?",
+                (page_id,)
+            ).fetchone()
+
+            if not row or row[0] != last_edited_time or not self._stable(row[0], row[5]):
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE pages SET last_used = ? WHERE page_id = ?", (time.time(), page_id))
+            self._db.commit()
+            self.hits += 1
+            return {
+                "page_id": page_id,
+                "last_edited_time": row[0],
+                "title": row[1],
+                "content": row[2],
+                "block_count": row[3],
+                "child_pages": json.loads(row[4] or "[]"),
+                "cached_at": row[5],
+            }
+
+    def put(
+        self,
+        page_id: str,
+        last_edited_time: str,
+        content: str,
+        title: Optional[str] = None,
+        block_count: Optional[int] = None,
+        child_pages: Optional[List[str]] = None
+    ):
+        """Store rendered content for a page version, then enforce the size cap"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(page_id, last_edited_time, title, content, block_count, child_pages, size, cached_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (page_id, last_edited_time, title, content, block_count,
+                 json.dumps(child_pages or []), len(content.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def invalidate(self, page_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE page_id = ?", (page_id,))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for page_id, size in self._db.execute(
+            "SELECT page_id, size FROM pages ORDER BY last_used ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE page_id = ?", (page_id,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit metrics and current size"""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -1,22 +1,89 @@
 """Notion API client for documentation and knowledge base operations"""
 
 import os
-from typing import Dict, List, Optional, Any
-from notion_client import Client
-from notion_client.errors import APIResponseError
+import asyncio
+from typing import Dict, List, Optional, Any, Awaitable, Callable
+from notion_client import AsyncClient
+from notion_client.errors import APIResponseError, APIErrorCode
+
+from src.tools.rate_limit import shared_bucket
+from src.tools.notion_blocks import BlockTree, BlockTreeLoader
+from src.tools.notion_cache import NotionPageCache, parse_notion_time, EDIT_TIME_GRANULARITY
+from src.tools.notion_mirror import NotionDatabaseMirror
+from src.tools.notion_writer import NotionBatchWriter
+
+
+# Notion allows an average of 3 requests/second per integration, with short bursts
+NOTION_RATE = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+NOTION_BURST = float(os.getenv("NOTION_RATE_BURST", "3"))
+NOTION_MAX_RETRIES = 5
+# Parallel requests for multi-page reads (the bucket still paces them)
+NOTION_FANOUT = 3
 
 
 class NotionClient:
     """
     Notion operations for agents.
     
-    Provides access to pages, databases, and blocks.
+    Provides access to pages, databases, and blocks. All calls go through
+    the async transport, a token bucket shared by every client using the
+    same integration token, and 429 retries honouring Retry-After.
     """
     
     def __init__(self, token: Optional[str] = None):
         self.token = token or os.getenv("NOTION_TOKEN")
-        self.client = Client(auth=self.token)
+        self.client = AsyncClient(auth=self.token)
         self.root_page_id = os.getenv("NOTION_ROOT_PAGE_ID")
+        self._page_cache: Optional[NotionPageCache] = None
+        self._database_mirror: Optional[NotionDatabaseMirror] = None
+    
+    @property
+    def database_mirror(self) -> NotionDatabaseMirror:
+        """Local mirror of queried databases (opened on first use)"""
+        if self._database_mirror is None:
+            self._database_mirror = NotionDatabaseMirror(self)
+        return self._database_mirror
+    
+    @property
+    def page_cache(self) -> NotionPageCache:
+        """On-disk rendered page cache (opened on first use)"""
+        if self._page_cache is None:
+            self._page_cache = NotionPageCache()
+        return self._page_cache
+    
+    async def _call(self, method: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        """Invoke an AsyncClient endpoint under the shared rate limit"""
+        bucket = shared_bucket(f"notion:{self.token}", NOTION_RATE, NOTION_BURST)
+        
+        for attempt in range(NOTION_MAX_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                return await method(**kwargs)
+            except APIResponseError as e:
+                if e.code != APIErrorCode.RateLimited or attempt == NOTION_MAX_RETRIES:
+                    raise
+                retry_after = float(e.headers.get("retry-after", 2 ** attempt))
+                # Hold back every caller on this token; the next acquire() waits it out
+                await bucket.pause(retry_after)
+    
+    async def gather_bounded(
+        self,
+        items: List[Any],
+        fn: Callable[[Any], Awaitable[Any]],
+        concurrency: int = NOTION_FANOUT
+    ) -> List[Any]:
+        """Run fn over items with at most `concurrency` in flight, preserving order"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(item):
+            async with semaphore:
+                return await fn(item)
+        
+        return await asyncio.gather(*(run(item) for item in items))
+    
+    async def close(self):
+        """Close the underlying HTTP transport"""
+        await self.client.aclose()
     
     async def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -30,7 +97,8 @@ class NotionClient:
             List of matching pages/databases
         """
         try:
-            response = self.client.search(
+            response = await self._call(
+                self.client.search,
                 query=query,
                 page_size=limit
             )
@@ -61,7 +129,7 @@ class NotionClient:
             Page object with properties
         """
         try:
-            page = self.client.pages.retrieve(page_id=page_id)
+            page = await self._call(self.client.pages.retrieve, page_id=page_id)
             
             return {
                 "id": page["id"],
@@ -75,6 +143,24 @@ class NotionClient:
         except APIResponseError as e:
             raise Exception(f"Failed to get page: {e.message}")
     
+    async def get_page_tree(self, page_id: str, max_depth: Optional[int] = None) -> BlockTree:
+        """
+        Load a page's full block tree.
+        
+        Args:
+            page_id: Notion page ID
+            max_depth: Optional nesting limit (None = everything)
+            
+        Returns:
+            BlockTree with rendered text, block count and fetch time
+        """
+        try:
+            loader = BlockTreeLoader(self, concurrency=NOTION_FANOUT, max_depth=max_depth)
+            return await loader.load(page_id)
+            
+        except APIResponseError as e:
+            raise Exception(f"Failed to get page content: {e.message}")
+    
     async def get_page_content(self, page_id: str) -> str:
         """
         Get page content as text.
@@ -83,21 +169,129 @@ class NotionClient:
             page_id: Notion page ID
             
         Returns:
-            Page content as markdown-like text
+            Page content as markdown-like text, including nested blocks
         """
-        try:
-            blocks = self.client.blocks.children.list(block_id=page_id)
+        tree = await self.get_page_tree(page_id)
+        return tree.text
+    
+    async def get_cached_page(self, page_id: str) -> Dict[str, Any]:
+        """
+        Get page content, served from the local cache when unchanged.
+        
+        Validity costs one pages.retrieve (plus one search if the page
+        embeds child pages); block fetches only happen on a miss.
+        
+        Returns:
+            Dict with title, content, block_count, last_edited_time, cached
+        """
+        page = await self.get_page(page_id)
+        entry = self.page_cache.get(page_id, page["last_edited_time"])
+        
+        if entry and entry["child_pages"]:
+            # Child page edits don't touch the parent's last_edited_time
+            edited = await self.pages_edited_since(entry["cached_at"] - EDIT_TIME_GRANULARITY)
+            if any(child in edited for child in entry["child_pages"]):
+                entry = None
+        
+        if entry:
+            return {**entry, "title": page["title"], "cached": True}
+        
+        tree = await self.get_page_tree(page_id)
+        child_pages = [
+            node.block["id"] for node in self._walk(tree.roots)
+            if node.block.get("type") == "child_page"
+        ]
+        content = tree.text
+        self.page_cache.put(
+            page_id,
+            page["last_edited_time"],
+            content,
+            title=page["title"],
+            block_count=tree.block_count,
+            child_pages=child_pages
+        )
+        return {
+            "page_id": page_id,
+            "last_edited_time": page["last_edited_time"],
+            "title": page["title"],
+            "content": content,
+            "block_count": tree.block_count,
+            "fetch_seconds": tree.fetch_seconds,
+            "cached": False,
+        }
+    
+    async def pages_edited_since(
+        self,
+        since: float,
+        max_requests: Optional[int] = 10
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk validity check: pages edited at or after `since` (epoch seconds).
+        
+        Walks search results newest-first and stops at the first older page.
+        
+        Args:
+            since: Epoch seconds
+            max_requests: Cap on search calls (None = walk everything)
             
-            content_parts = []
-            for block in blocks.get("results", []):
-                text = self._extract_block_text(block)
-                if text:
-                    content_parts.append(text)
+        Returns:
+            Mapping of page ID to {title, url, last_edited_time}
+        """
+        edited = {}
+        cursor = None
+        requests = 0
+        try:
+            while max_requests is None or requests < max_requests:
+                requests += 1
+                params = {
+                    "filter": {"property": "object", "value": "page"},
+                    "sort": {"direction": "descending", "timestamp": "last_edited_time"},
+                    "page_size": 100,
+                }
+                if cursor:
+                    params["start_cursor"] = cursor
+                response = await self._call(self.client.search, **params)
+                
+                for item in response.get("results", []):
+                    if parse_notion_time(item["last_edited_time"]) < since:
+                        return edited
+                    edited[item["id"]] = {
+                        "title": self._extract_title(item),
+                        "url": item.get("url"),
+                        "last_edited_time": item["last_edited_time"],
+                    }
+                
+                if not response.get("has_more"):
+                    return edited
+                cursor = response["next_cursor"]
             
-            return "\n\n".join(content_parts)
+            return edited
             
         except APIResponseError as e:
-            raise Exception(f"Failed to get page content: {e.message}")
+            raise Exception(f"Notion search failed: {e.message}")
+    
+    def _walk(self, nodes):
+        for node in nodes:
+            yield node
+            yield from self._walk(node.children)
+    
+    async def get_pages_content(
+        self,
+        page_ids: List[str],
+        concurrency: int = NOTION_FANOUT
+    ) -> Dict[str, str]:
+        """
+        Get content for several pages in parallel.
+        
+        Args:
+            page_ids: Notion page IDs
+            concurrency: Maximum pages fetched at once
+            
+        Returns:
+            Mapping of page ID to content text
+        """
+        contents = await self.gather_bounded(page_ids, self.get_page_content, concurrency)
+        return dict(zip(page_ids, contents))
     
     async def create_page(
         self,
@@ -111,30 +305,18 @@ class NotionClient:
         Args:
             parent_id: Parent page or database ID
             title: Page title
-            content: Optional list of block objects
+            content: Optional list of block objects (any number; sent in chunks)
             
         Returns:
             Created page object
         """
         try:
-            page_data = {
-                "parent": {"page_id": parent_id},
-                "properties": {
-                    "title": {
-                        "title": [{"text": {"content": title}}]
-                    }
-                }
-            }
-            
-            if content:
-                page_data["children"] = content
-            
-            page = self.client.pages.create(**page_data)
+            progress = await NotionBatchWriter(self).create_page(parent_id, title, content or [])
             
             return {
-                "id": page["id"],
+                "id": progress.page_id,
                 "title": title,
-                "url": page.get("url"),
+                "url": progress.url,
             }
             
         except APIResponseError as e:
@@ -146,20 +328,13 @@ class NotionClient:
         
         Args:
             page_id: Page to append to
-            blocks: List of block objects
+            blocks: List of block objects (any number; sent in chunks)
             
         Returns:
             True if successful
         """
-        try:
-            self.client.blocks.children.append(
-                block_id=page_id,
-                children=blocks
-            )
-            return True
-            
-        except APIResponseError as e:
-            raise Exception(f"Failed to append blocks: {e.message}")
+        await NotionBatchWriter(self).append(page_id, blocks)
+        return True
     
     async def list_databases(self) -> List[Dict[str, Any]]:
         """
@@ -169,7 +344,8 @@ class NotionClient:
             List of database objects
         """
         try:
-            response = self.client.search(
+            response = await self._call(
+                self.client.search,
                 filter={"property": "object", "value": "database"}
             )
             
@@ -190,40 +366,91 @@ class NotionClient:
         self,
         database_id: str,
         filter_obj: Optional[Dict[str, Any]] = None,
-        limit: int = 100
+        limit: int = 100,
+        sorts: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Query a database.
+        Query a database over the network.
         
         Args:
             database_id: Database ID
             filter_obj: Optional filter object
-            limit: Maximum results
+            limit: Maximum results (follows pagination up to this many)
+            sorts: Optional list of sort objects
             
         Returns:
             List of database entries
         """
+        items = await self.query_database_raw(database_id, filter_obj, sorts, limit)
+        return [
+            {
+                "id": item["id"],
+                "properties": item.get("properties", {}),
+                "url": item.get("url"),
+            }
+            for item in items
+        ]
+    
+    async def query_database_raw(
+        self,
+        database_id: str,
+        filter_obj: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Query a database following has_more cursors; returns raw page objects"""
+        items = []
+        cursor = None
         try:
-            query_params = {"database_id": database_id, "page_size": limit}
-            
-            if filter_obj:
-                query_params["filter"] = filter_obj
-            
-            response = self.client.databases.query(**query_params)
-            
-            results = []
-            for item in response.get("results", []):
-                results.append({
-                    "id": item["id"],
-                    "properties": item.get("properties", {}),
-                    "url": item.get("url"),
-                })
+            while limit is None or len(items) < limit:
+                query_params = {
+                    "database_id": database_id,
+                    "page_size": 100 if limit is None else min(100, limit - len(items)),
+                }
+                if filter_obj:
+                    query_params["filter"] = filter_obj
+                if sorts:
+                    query_params["sorts"] = sorts
+                if cursor:
+                    query_params["start_cursor"] = cursor
+                
+                response = await self._call(self.client.databases.query, **query_params)
+                items.extend(response.get("results", []))
+                
+                if not response.get("has_more"):
+                    break
+                cursor = response["next_cursor"]
             
-            return results
+            return items
             
         except APIResponseError as e:
             raise Exception(f"Failed to query database: {e.message}")
     
+    async def query_database_mirrored(
+        self,
+        database_id: str,
+        filter_obj: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        limit: int = 100,
+        max_staleness: Optional[float] = None,
+        force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Query a database from the local mirror.
+        
+        The mirror syncs incrementally when older than `max_staleness`
+        seconds (or on force_refresh). Filters it can't evaluate locally
+        go to the network instead.
+        """
+        return await self.database_mirror.query(
+            database_id,
+            filter_obj=filter_obj,
+            sorts=sorts,
+            limit=limit,
+            max_staleness=max_staleness,
+            force_refresh=force_refresh
+        )
+    
     def _extract_title(self, obj: Dict[str, Any]) -> str:
         """Extract title from a Notion object"""
         properties = obj.get("properties", {})
@@ -236,19 +463,3 @@ class NotionClient:
                     return title_prop["title"][0].get("plain_text", "")
         
         return "Untitled"
-    
-    def _extract_block_text(self, block: Dict[str, Any]) -> str:
-        """Extract text from a block"""
-        block_type = block.get("type")
-        
-        if not block_type:
-            return ""
-        
-        block_data = block.get(block_type, {})
-        
-        # Handle different block types
-        if "rich_text" in block_data:
-            texts = [rt.get("plain_text", "") for rt in block_data["rich_text"]]
-            return "".join(texts)
-        
-        return ""
@@ -0,0 +1,277 @@
+"""Local BM25 full-text index over the Notion workspace (SQLite FTS5)"""
+
+import os
+import re
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+from src.tools.notion_cache import parse_notion_time, EDIT_TIME_GRANULARITY
+
+if TYPE_CHECKING:
+    from src.tools.notion_client import NotionClient
+
+
+DEFAULT_INDEX_PATH = os.path.join(tempfile.gettempdir(), "drafted-notion-index.sqlite")
+
+# Passages are built from whole paragraphs up to roughly this many characters
+PASSAGE_CHARS = 800
+
+# Title matches count double relative to body text
+TITLE_WEIGHT = 2.0
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Group paragraphs into passages of at most ~max_chars"""
+    passages, current = [], ""
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        # A single huge paragraph is cut into fixed-size pieces
+        while len(current) > max_chars:
+            passages.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        passages.append(current)
+    return passages
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 OR-query of quoted terms"""
+    terms = dict.fromkeys(t for t in re.findall(r"\w+", text.lower()) if len(t) > 1)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class NotionSearchIndex:
+    """
+    Incrementally synced BM25 index of every page shared with the integration.
+
+    sync() pulls pages edited since the stored cursor (oldest first, so
+    an interrupted sync resumes where it stopped); query() runs in-process.
+    Pages that can't be read (deleted, unshared) are recorded and skipped
+    until they are edited again, so one bad page never stalls the cursor.
+    """
+
+    def __init__(
+        self,
+        notion: "NotionClient",
+        path: Optional[str] = None,
+        min_sync_interval: float = 60.0
+    ):
+        self.notion = notion
+        self.path = path or os.getenv("NOTION_INDEX_PATH", DEFAULT_INDEX_PATH)
+        self.min_sync_interval = min_sync_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+                page_id UNINDEXED,
+                title,
+                text,
+                position UNINDEXED
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                page_id TEXT PRIMARY KEY,
+                title TEXT,
+                url TEXT,
+                last_edited_time TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS failed_pages (
+                page_id TEXT PRIMARY KEY,
+                last_edited_time TEXT NOT NULL,
+                error TEXT,
+                failed_at REAL
+            );
+        """)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _meta(self, key: str, default: float = 0.0) -> float:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return float(row[0]) if row else default
+
+    def _set_meta(self, key: str, value: float):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _indexed_version(self, page_id: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT last_edited_time FROM pages WHERE page_id = ?", (page_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _failed_version(self, page_id: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT last_edited_time FROM failed_pages WHERE page_id = ?", (page_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _record_failure(self, page_id: str, last_edited_time: str, error: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO failed_pages (page_id, last_edited_time, error, failed_at) VALUES (?, ?, ?, ?)",
+                (page_id, last_edited_time, error[:500], time.time())
+            )
+            self._db.commit()
+
+    def _replace_page(self, page_id: str, title: str, url: Optional[str], last_edited_time: str, content: str):
+        with self._lock:
+            self._db.execute("DELETE FROM failed_pages WHERE page_id = ?", (page_id,))
+            self._db.execute("DELETE FROM passages WHERE page_id = ?", (page_id,))
+            self._db.executemany(
+                "INSERT INTO passages (page_id, title, text, position) VALUES (?, ?, ?, ?)",
+                [(page_id, title, passage, i) for i, passage in enumerate(split_passages(content))]
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (page_id, title, url, last_edited_time) VALUES (?, ?, ?, ?)",
+                (page_id, title, url, last_edited_time)
+            )
+            self._db.commit()
+
+    async def sync(self, max_pages: Optional[int] = None, force: bool = False, full: bool = False) -> Dict[str, Any]:
+        """
+        Pull pages edited since the last cursor into the index.
+
+        Args:
+            max_pages: Re-index at most this many pages this call
+            force: Ignore min_sync_interval
+            full: Re-walk the whole workspace and drop pages no longer shared
+
+        Returns:
+            Sync stats: pages_seen, pages_indexed, failed, remaining, seconds
+        """
+        started = time.monotonic()
+        if not force and not full and time.time() - self._meta("last_sync") < self.min_sync_interval:
+            return {"pages_seen": 0, "pages_indexed": 0, "failed": 0, "remaining": 0, "seconds": 0.0, "skipped": True}
+
+        cursor = 0.0 if full else self._meta("cursor")
+        # Edit times are minute-granular, so overlap by one minute and rely
+        # on the per-page version check to skip what we already have
+        edited = await self.notion.pages_edited_since(
+            max(cursor - EDIT_TIME_GRANULARITY, 0.0), max_requests=None
+        )
+
+        todo = sorted(
+            (
+                (page_id, info) for page_id, info in edited.items()
+                if self._indexed_version(page_id) != info["last_edited_time"]
+                and self._failed_version(page_id) != info["last_edited_time"]
+            ),
+            key=lambda item: item[1]["last_edited_time"]
+        )
+        batch = todo[:max_pages] if max_pages else todo
+
+        failures = []
+
+        async def index_page(item):
+            page_id, info = item
+            try:
+                page = await self.notion.get_cached_page(page_id)
+            except Exception as e:
+                # Skipped until the page is edited again
+                self._record_failure(page_id, info["last_edited_time"], str(e))
+                failures.append(page_id)
+            else:
+                self._replace_page(page_id, info["title"], info["url"], info["last_edited_time"], page["content"])
+            return parse_notion_time(info["last_edited_time"])
+
+        edit_times = await self.notion.gather_bounded(batch, index_page)
+
+        with self._lock:
+            if len(batch) == len(todo):
+                # Everything up to the newest edit we saw is now indexed
+                newest = max((parse_notion_time(i["last_edited_time"]) for i in edited.values()), default=cursor)
+                self._set_meta("cursor", max(newest, cursor))
+            elif edit_times:
+                self._set_meta("cursor", max(max(edit_times), cursor))
+            if full:
+                self._drop_missing(set(edited))
+                self._set_meta("last_full_sync", time.time())
+            self._set_meta("last_sync", time.time())
+            self._db.commit()
+
+        return {
+            "pages_seen": len(edited),
+            "pages_indexed": len(batch) - len(failures),
+            "failed": len(failures),
+            "remaining": len(todo) - len(batch),
+            "seconds": time.monotonic() - started,
+        }
+
+    def has_synced(self) -> bool:
+        """False until the first sync has finished (the index is still empty)"""
+        return self._meta("last_sync") > 0
+
+    def last_full_sync(self) -> float:
+        """When a full sync last dropped deleted and unshared pages (0 if never)"""
+        return self._meta("last_full_sync")
+
+    def _drop_missing(self, live_ids: set):
+        for (page_id,) in self._db.execute("SELECT page_id FROM pages").fetchall():
+            if page_id not in live_ids:
+                self._db.execute("DELETE FROM passages WHERE page_id = ?", (page_id,))
+                self._db.execute("DELETE FROM pages WHERE page_id = ?", (page_id,))
+        for (page_id,) in self._db.execute("SELECT page_id FROM failed_pages").fetchall():
+            if page_id not in live_ids:
+                self._db.execute("DELETE FROM failed_pages WHERE page_id = ?", (page_id,))
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def query(self, text: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Top-k passages by BM25.
+
+        Returns:
+            List of {page_id, title, url, passage, position, score}; higher score is better
+        """
+        match = fts_query(text)
+        if not match:
+            return []
+
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT p.page_id, p.title, pg.url, p.text, p.position,
+                       -bm25(passages, 0.0, {TITLE_WEIGHT}, 1.0, 0.0) AS score
+                FROM passages p
+                LEFT JOIN pages pg ON pg.page_id = p.page_id
+                WHERE passages MATCH ?
+                ORDER BY score DESC
+                LIMIT ?
+                """,
+                (match, k)
+            ).fetchall()
+
+        return [
+            {
+                "page_id": page_id,
+                "title": title,
+                "url": url,
+                "passage": passage,
+                "position": position,
+                "score": round(score, 4),
+            }
+            for page_id, title, url, passage, position, score in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            passages = self._db.execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+            failed = self._db.execute("SELECT COUNT(*) FROM failed_pages").fetchone()[0]
+            cursor = self._meta("cursor")
+        return {"pages": pages, "passages": passages, "failed": failed, "cursor": cursor}
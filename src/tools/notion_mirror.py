@@ -0,0 +1,421 @@
+"""Incremental local mirror of Notion databases with SQL-backed queries"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+from src.tools.notion_cache import parse_notion_time, EDIT_TIME_GRANULARITY
+
+if TYPE_CHECKING:
+    from src.tools.notion_client import NotionClient
+
+
+DEFAULT_MIRROR_PATH = os.path.join(tempfile.gettempdir(), "drafted-notion-mirror.sqlite")
+DEFAULT_MAX_STALENESS = float(os.getenv("NOTION_MIRROR_MAX_STALENESS", "300"))
+# databases.query never returns archived or deleted pages, so incremental
+# syncs can't see removals; a full pass this often drops them
+DEFAULT_RECONCILE_INTERVAL = float(os.getenv("NOTION_MIRROR_RECONCILE_SECONDS", "3600"))
+
+NUMERIC_TYPES = {"number", "unique_id"}
+
+TEXT_OPS = {
+    "equals": "p.text = ?",
+    "starts_with": "p.text LIKE ? ESCAPE '\\'",
+    "ends_with": "p.text LIKE ? ESCAPE '\\'",
+    "contains": "p.text LIKE ? ESCAPE '\\'",
+    "before": "p.text < ?",
+    "after": "p.text > ?",
+    "on_or_before": "p.text <= ?",
+    "on_or_after": "p.text >= ?",
+}
+
+NUMBER_OPS = {
+    "equals": "p.num = ?",
+    "greater_than": "p.num > ?",
+    "less_than": "p.num < ?",
+    "greater_than_or_equal_to": "p.num >= ?",
+    "less_than_or_equal_to": "p.num <= ?",
+}
+
+
+class UnsupportedQuery(Exception):
+    """Raised when a filter/sort can't be evaluated against the mirror"""
+
+
+def _like(value: str, op: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if op == "starts_with":
+        return f"{escaped}%"
+    if op == "ends_with":
+        return f"%{escaped}"
+    return f"%{escaped}%"
+
+
+def property_values(prop: Dict[str, Any]) -> List[Tuple[Optional[str], Optional[float]]]:
+    """Flatten a property value into (text, number) rows for indexing"""
+    kind = prop.get("type")
+    value = prop.get(kind)
+
+    if kind == "formula" and value:
+        inner = value.get("type")
+        return property_values({"type": inner, inner: value.get(inner)})
+    if value is None:
+        return []
+    if kind in ("title", "rich_text"):
+        text = "".join(rt.get("plain_text", "") for rt in value)
+        return [(text, None)] if text else []
+    if kind in ("select", "status"):
+        return [(value.get("name"), None)]
+    if kind == "multi_select":
+        return [(option.get("name"), None) for option in value]
+    if kind in ("checkbox", "boolean"):
+        return [("true" if value else "false", None)]
+    if kind == "number":
+        return [(None, float(value))]
+    if kind == "unique_id":
+        return [(None, float(value.get("number")))] if value.get("number") is not None else []
+    if kind == "date":
+        return [(value.get("start"), None)] if value.get("start") else []
+    if kind in ("relation", "people"):
+        return [(item.get("id"), None) for item in value]
+    if isinstance(value, str):
+        # url, email, phone_number, string formulas, created/last_edited_time
+        return [(value, None)] if value else []
+    return []
+
+
+class NotionDatabaseMirror:
+    """
+    Local copy of Notion databases, synced by last_edited_time.
+
+    Each page's properties are flattened into an indexed (name, text,
+    num) table so the common filter/sort shapes compile to SQL. Shapes
+    that don't compile (relative dates, rollups, ...) are sent to Notion.
+    Every `reconcile_interval` a sync re-reads the whole database and
+    drops rows Notion no longer returns (deleted, archived, trashed).
+    """
+
+    def __init__(
+        self,
+        notion: "NotionClient",
+        path: Optional[str] = None,
+        max_staleness: float = DEFAULT_MAX_STALENESS,
+        reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL
+    ):
+        self.notion = notion
+        self.path = path or os.getenv("NOTION_MIRROR_PATH", DEFAULT_MIRROR_PATH)
+        self.max_staleness = max_staleness
+        self.reconcile_interval = reconcile_interval
+        self.local_queries = 0
+        self.remote_queries = 0
+        self._sync_locks: Dict[str, asyncio.Lock] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                database_id TEXT NOT NULL,
+                page_id TEXT NOT NULL,
+                url TEXT,
+                created_time TEXT,
+                last_edited_time TEXT NOT NULL,
+                properties TEXT NOT NULL,
+                PRIMARY KEY (database_id, page_id)
+            );
+            CREATE INDEX IF NOT EXISTS rows_edited ON rows (database_id, last_edited_time);
+            CREATE TABLE IF NOT EXISTS props (
+                database_id TEXT NOT NULL,
+                page_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                text TEXT,
+                num REAL
+            );
+            CREATE INDEX IF NOT EXISTS props_text ON props (database_id, name, text);
+            CREATE INDEX IF NOT EXISTS props_num ON props (database_id, name, num);
+            CREATE INDEX IF NOT EXISTS props_page ON props (database_id, page_id);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                database_id TEXT PRIMARY KEY,
+                cursor REAL NOT NULL,
+                synced_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS reconcile_state (
+                database_id TEXT PRIMARY KEY,
+                reconciled_at REAL NOT NULL
+            );
+        """)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _state(self, database_id: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT cursor, synced_at FROM sync_state WHERE database_id = ?", (database_id,)
+            ).fetchone()
+
+    def _reconciled_at(self, database_id: str) -> float:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT reconciled_at FROM reconcile_state WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        return row[0] if row else 0.0
+
+    async def sync(self, database_id: str) -> Dict[str, Any]:
+        """
+        Pull rows edited since the last sync (everything, when due to reconcile).
+
+        Returns:
+            Stats with rows_updated, rows_removed, full and seconds
+        """
+        lock = self._sync_locks.setdefault(database_id, asyncio.Lock())
+        async with lock:
+            started = time.monotonic()
+            state = self._state(database_id)
+            full = state is None or time.time() - self._reconciled_at(database_id) >= self.reconcile_interval
+            filter_obj = None
+            if not full:
+                # Edit times are minute-granular: overlap by one minute
+                since = datetime.fromtimestamp(state[0] - EDIT_TIME_GRANULARITY, tz=timezone.utc)
+                filter_obj = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": since.isoformat()},
+                }
+
+            items = await self.notion.query_database_raw(database_id, filter_obj=filter_obj)
+            cursor = state[0] if state else 0.0
+            updated = removed = 0
+
+            with self._lock:
+                for item in items:
+                    page_id = item["id"]
+                    self._db.execute(
+                        "DELETE FROM props WHERE database_id = ? AND page_id = ?", (database_id, page_id)
+                    )
+                    if item.get("archived") or item.get("in_trash"):
+                        self._db.execute(
+                            "DELETE FROM rows WHERE database_id = ? AND page_id = ?", (database_id, page_id)
+                        )
+                        removed += 1
+                        continue
+
+                    properties = item.get("properties", {})
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO rows "
+                        "(database_id, page_id, url, created_time, last_edited_time, properties) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (database_id, page_id, item.get("url"), item.get("created_time"),
+                         item["last_edited_time"], json.dumps(properties))
+                    )
+                    self._db.executemany(
+                        "INSERT INTO props (database_id, page_id, name, text, num) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (database_id, page_id, name, text, num)
+                            for name, prop in properties.items()
+                            for text, num in property_values(prop)
+                        ]
+                    )
+                    cursor = max(cursor, parse_notion_time(item["last_edited_time"]))
+                    updated += 1
+
+                if full:
+                    live = {item["id"] for item in items}
+                    gone = [
+                        (database_id, page_id)
+                        for (page_id,) in self._db.execute(
+                            "SELECT page_id FROM rows WHERE database_id = ?", (database_id,)
+                        ).fetchall()
+                        if page_id not in live
+                    ]
+                    self._db.executemany("DELETE FROM rows WHERE database_id = ? AND page_id = ?", gone)
+                    self._db.executemany("DELETE FROM props WHERE database_id = ? AND page_id = ?", gone)
+                    removed += len(gone)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO reconcile_state (database_id, reconciled_at) VALUES (?, ?)",
+                        (database_id, time.time())
+                    )
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state (database_id, cursor, synced_at) VALUES (?, ?, ?)",
+                    (database_id, cursor, time.time())
+                )
+                self._db.commit()
+
+            return {
+                "rows_updated": updated,
+                "rows_removed": removed,
+                "full": full,
+                "seconds": time.monotonic() - started,
+            }
+
+    async def resync(self, database_id: str) -> Dict[str, Any]:
+        """Drop the local copy and mirror the database from scratch"""
+        with self._lock:
+            for table in ("rows", "props", "sync_state", "reconcile_state"):
+                self._db.execute(f"DELETE FROM {table} WHERE database_id = ?", (database_id,))
+            self._db.commit()
+        return await self.sync(database_id)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    async def query(
+        self,
+        database_id: str,
+        filter_obj: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        limit: int = 100,
+        max_staleness: Optional[float] = None,
+        force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the mirrored database.
+
+        Args:
+            database_id: Database ID
+            filter_obj: Notion filter object
+            sorts: Notion sort objects
+            limit: Maximum results
+            max_staleness: Sync first if the mirror is older than this (seconds)
+            force_refresh: Always sync before querying
+
+        Returns:
+            Entries shaped like NotionClient.query_database()
+        """
+        try:
+            where, params = self._compile_filter(filter_obj) if filter_obj else ("1 = 1", [])
+            order = self._compile_sorts(sorts)
+        except UnsupportedQuery:
+            self.remote_queries += 1
+            return await self.notion.query_database(database_id, filter_obj, limit=limit, sorts=sorts)
+
+        staleness = self.max_staleness if max_staleness is None else max_staleness
+        state = self._state(database_id)
+        if force_refresh or not state or time.time() - state[1] > staleness:
+            await self.sync(database_id)
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT r.page_id, r.url, r.properties FROM rows r "
+                f"WHERE r.database_id = ? AND ({where}) ORDER BY {order} LIMIT ?",
+                [database_id, *params, limit]
+            ).fetchall()
+
+        self.local_queries += 1
+        return [
+            {"id": page_id, "properties": json.loads(properties), "url": url}
+            for page_id, url, properties in rows
+        ]
+
+    def _compile_filter(self, filter_obj: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        for compound in ("and", "or"):
+            if compound in filter_obj:
+                parts = [self._compile_filter(f) for f in filter_obj[compound]]
+                if not parts:
+                    return "1 = 1", []
+                sql = f" {compound.upper()} ".join(f"({p[0]})" for p in parts)
+                return sql, [param for p in parts for param in p[1]]
+
+        if "timestamp" in filter_obj:
+            column = filter_obj["timestamp"]
+            if column not in ("created_time", "last_edited_time"):
+                raise UnsupportedQuery(column)
+            (op, value), = filter_obj[column].items()
+            if op not in ("before", "after", "on_or_before", "on_or_after", "equals"):
+                raise UnsupportedQuery(op)
+            # Stored stamps are UTC "...Z"; normalize the operand to match
+            stamp = datetime.fromtimestamp(parse_notion_time(value), tz=timezone.utc)
+            return TEXT_OPS[op].replace("p.text", f"r.{column}"), [stamp.strftime("%Y-%m-%dT%H:%M:%S.000Z")]
+
+        name = filter_obj.get("property")
+        kinds = [k for k in filter_obj if k != "property"]
+        if not name or len(kinds) != 1:
+            raise UnsupportedQuery(filter_obj)
+        kind = kinds[0]
+        condition = filter_obj[kind]
+        if kind == "formula":
+            (kind, condition), = condition.items()
+        if kind in ("rollup", "people", "files") or not isinstance(condition, dict) or len(condition) != 1:
+            raise UnsupportedQuery(kind)
+        (op, value), = condition.items()
+
+        match = "SELECT 1 FROM props p WHERE p.database_id = r.database_id AND p.page_id = r.page_id AND p.name = ?"
+        if op == "is_empty":
+            return f"NOT EXISTS ({match} AND COALESCE(p.text, p.num) IS NOT NULL)", [name]
+        if op == "is_not_empty":
+            return f"EXISTS ({match} AND COALESCE(p.text, p.num) IS NOT NULL)", [name]
+
+        negate = op in ("does_not_equal", "does_not_contain")
+        positive = {"does_not_equal": "equals", "does_not_contain": "contains"}.get(op, op)
+
+        if kind in NUMERIC_TYPES:
+            if positive not in NUMBER_OPS:
+                raise UnsupportedQuery(op)
+            clause, param = NUMBER_OPS[positive], float(value)
+        elif kind in ("checkbox", "boolean"):
+            if positive != "equals":
+                raise UnsupportedQuery(op)
+            clause, param = "p.text = ?", "true" if value else "false"
+        elif kind in ("multi_select", "relation") and positive == "contains":
+            # Membership test, not substring
+            clause, param = "p.text = ?", value
+        elif positive in TEXT_OPS and not isinstance(value, dict):
+            clause = TEXT_OPS[positive]
+            param = _like(value, positive) if "LIKE" in clause else value
+            if kind == "date" and len(value) == 10:
+                # Date-only operands compare against the day part of the stored value
+                clause = clause.replace("p.text", "substr(p.text, 1, 10)")
+        else:
+            raise UnsupportedQuery(op)
+
+        sql = f"EXISTS ({match} AND {clause})"
+        return (f"NOT {sql}" if negate else sql), [name, param]
+
+    def _compile_sorts(self, sorts: Optional[List[Dict[str, Any]]]) -> str:
+        if not sorts:
+            return "r.last_edited_time DESC"
+
+        terms = []
+        for sort in sorts:
+            direction = "DESC" if sort.get("direction") == "descending" else "ASC"
+            if "timestamp" in sort:
+                if sort["timestamp"] not in ("created_time", "last_edited_time"):
+                    raise UnsupportedQuery(sort)
+                terms.append(f"r.{sort['timestamp']} {direction}")
+            elif "property" in sort:
+                name = sort["property"].replace("'", "''")
+                lookup = (
+                    "(SELECT {col} FROM props p WHERE p.database_id = r.database_id "
+                    f"AND p.page_id = r.page_id AND p.name = '{name}' LIMIT 1)"
+                )
+                terms.append(f"{lookup.format(col='p.num')} {direction}")
+                terms.append(f"{lookup.format(col='p.text')} {direction}")
+            else:
+                raise UnsupportedQuery(sort)
+        return ", ".join(terms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts, staleness per database, and local vs remote query counts"""
+        with self._lock:
+            databases = {
+                database_id: {
+                    "rows": self._db.execute(
+                        "SELECT COUNT(*) FROM rows WHERE database_id = ?", (database_id,)
+                    ).fetchone()[0],
+                    "age_seconds": time.time() - synced_at,
+                }
+                for database_id, synced_at in self._db.execute(
+                    "SELECT database_id, synced_at FROM sync_state"
+                ).fetchall()
+            }
+        return {
+            "databases": databases,
+            "local_queries": self.local_queries,
+            "remote_queries": self.remote_queries,
+        }
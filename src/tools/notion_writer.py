@@ -0,0 +1,227 @@
+"""Chunked, resumable bulk writes to Notion"""
+
+import json
+import hashlib
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Callable, TYPE_CHECKING
+
+from notion_client.errors import APIResponseError
+
+if TYPE_CHECKING:
+    from src.tools.notion_client import NotionClient
+
+
+# Notion request limits
+MAX_BLOCKS_PER_REQUEST = 100        # top-level children per create/append
+MAX_TOTAL_BLOCKS_PER_REQUEST = 1000  # including nested children
+MAX_PAYLOAD_BYTES = 450_000         # hard cap is 500KB; leave headroom for the envelope
+MAX_RICH_TEXT_CHARS = 2000          # per rich-text item
+MAX_RICH_TEXT_ITEMS = 100           # per rich_text array
+
+
+def split_rich_text(rich_text: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split text items longer than 2,000 chars, keeping annotations and links"""
+    result = []
+    for item in rich_text:
+        content = (item.get("text") or {}).get("content", "")
+        if item.get("type", "text") != "text" or len(content) <= MAX_RICH_TEXT_CHARS:
+            result.append(item)
+            continue
+        for start in range(0, len(content), MAX_RICH_TEXT_CHARS):
+            piece = dict(item)
+            piece["text"] = {**item["text"], "content": content[start:start + MAX_RICH_TEXT_CHARS]}
+            result.append(piece)
+    return result
+
+
+def normalize_blocks(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Make blocks fit Notion's rich-text limits.
+
+    Long runs are split at 2,000 chars; a block that then needs more than
+    100 rich-text items becomes several consecutive blocks of its type.
+    """
+    result = []
+    for block in blocks:
+        block_type = block.get("type")
+        data = block.get(block_type) or {}
+        if "rich_text" not in data:
+            result.append(block)
+            continue
+
+        rich_text = split_rich_text(data["rich_text"])
+        for start in range(0, max(len(rich_text), 1), MAX_RICH_TEXT_ITEMS):
+            piece = {**data, "rich_text": rich_text[start:start + MAX_RICH_TEXT_ITEMS]}
+            if start and "children" in piece:
+                # Nested children stay with the first piece
+                del piece["children"]
+            result.append({**block, block_type: piece})
+    return result
+
+
+def text_blocks(text: str, block_type: str = "paragraph", **extra) -> List[Dict[str, Any]]:
+    """Build as few blocks as possible holding `text` (e.g. full logs)"""
+    return normalize_blocks([{
+        "object": "block",
+        "type": block_type,
+        block_type: {"rich_text": [{"type": "text", "text": {"content": text}}], **extra},
+    }])
+
+
+def _count_blocks(block: Dict[str, Any]) -> int:
+    data = block.get(block.get("type")) or {}
+    children = data.get("children") or block.get("children") or []
+    return 1 + sum(_count_blocks(child) for child in children)
+
+
+def chunk_blocks(blocks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Greedily pack blocks into the largest chunks one request accepts"""
+    chunks, current = [], []
+    total = size = 0
+    for block in blocks:
+        block_total = _count_blocks(block)
+        block_size = len(json.dumps(block))
+        if current and (
+            len(current) >= MAX_BLOCKS_PER_REQUEST
+            or total + block_total > MAX_TOTAL_BLOCKS_PER_REQUEST
+            or size + block_size > MAX_PAYLOAD_BYTES
+        ):
+            chunks.append(current)
+            current, total, size = [], 0, 0
+        current.append(block)
+        total += block_total
+        size += block_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def blocks_hash(blocks: List[Dict[str, Any]]) -> str:
+    """Identity of a block list, so a resume can tell it's writing the same content"""
+    return hashlib.sha256(json.dumps(blocks, sort_keys=True).encode()).hexdigest()
+
+
+class ResumeMismatch(Exception):
+    """Raised when resuming a write with blocks that differ from the first attempt's"""
+
+
+@dataclass
+class WriteProgress:
+    """Where a bulk write got to; pass it back in to resume"""
+    page_id: Optional[str] = None
+    url: Optional[str] = None
+    blocks_total: int = 0
+    blocks_written: int = 0
+    requests: int = 0
+    blocks_hash: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.page_id is not None and self.blocks_written >= self.blocks_total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "WriteProgress":
+        return cls(**data) if data else cls()
+
+
+class NotionBatchWriter:
+    """
+    Writes large block lists in the fewest requests.
+
+    The page shell is created with the first chunk inline, then the rest
+    is appended in maximal chunks. Appends to one parent must land in
+    order, so they go out back-to-back under the client's shared rate
+    limiter. `on_progress` fires after every request so a caller can
+    persist the WriteProgress and resume after a failure; resuming with
+    a different block list raises ResumeMismatch.
+    """
+
+    def __init__(
+        self,
+        notion: "NotionClient",
+        on_progress: Optional[Callable[[WriteProgress], None]] = None
+    ):
+        self.notion = notion
+        self.on_progress = on_progress
+
+    def _report(self, progress: WriteProgress):
+        if self.on_progress:
+            self.on_progress(progress)
+
+    def _start(self, blocks: List[Dict[str, Any]], progress: WriteProgress):
+        digest = blocks_hash(blocks)
+        if progress.blocks_written and progress.blocks_hash != digest:
+            # Appending our suffix would duplicate or skip blocks on the page
+            raise ResumeMismatch(
+                f"Blocks changed since {progress.blocks_written}/{progress.blocks_total} were written"
+            )
+        progress.blocks_hash = digest
+        progress.blocks_total = len(blocks)
+
+    async def create_page(
+        self,
+        parent_id: str,
+        title: str,
+        blocks: List[Dict[str, Any]],
+        progress: Optional[WriteProgress] = None
+    ) -> WriteProgress:
+        """Create a page holding `blocks`, resuming from `progress` if given"""
+        blocks = normalize_blocks(blocks)
+        progress = progress or WriteProgress()
+        self._start(blocks, progress)
+
+        if progress.page_id is None:
+            chunks = chunk_blocks(blocks)
+            first = chunks[0] if chunks else []
+            page_data = {
+                "parent": {"page_id": parent_id},
+                "properties": {"title": {"title": [{"text": {"content": title}}]}},
+            }
+            if first:
+                page_data["children"] = first
+
+            page = await self.notion._call(self.notion.client.pages.create, **page_data)
+            progress.page_id = page["id"]
+            progress.url = page.get("url")
+            progress.blocks_written = len(first)
+            progress.requests += 1
+            self._report(progress)
+
+        return await self._append_remaining(progress.page_id, blocks, progress)
+
+    async def append(
+        self,
+        block_id: str,
+        blocks: List[Dict[str, Any]],
+        progress: Optional[WriteProgress] = None
+    ) -> WriteProgress:
+        """Append `blocks` under an existing page or block"""
+        blocks = normalize_blocks(blocks)
+        progress = progress or WriteProgress(page_id=block_id)
+        self._start(blocks, progress)
+        return await self._append_remaining(block_id, blocks, progress)
+
+    async def _append_remaining(
+        self,
+        block_id: str,
+        blocks: List[Dict[str, Any]],
+        progress: WriteProgress
+    ) -> WriteProgress:
+        for chunk in chunk_blocks(blocks[progress.blocks_written:]):
+            try:
+                await self.notion._call(
+                    self.notion.client.blocks.children.append,
+                    block_id=block_id,
+                    children=chunk
+                )
+            except APIResponseError as e:
+                raise Exception(
+                    f"Failed to append blocks ({progress.blocks_written}/{progress.blocks_total} written): {e.message}"
+                )
+            progress.blocks_written += len(chunk)
+            progress.requests += 1
+            self._report(progress)
+        return progress
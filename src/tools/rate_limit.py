@@ -0,0 +1,140 @@
+"""Async rate limiting shared by API clients"""
+
+import os
+import time
+import asyncio
+import hashlib
+import weakref
+from typing import Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    `rate` tokens are added per second up to `capacity`; acquire() waits
+    until a token is available. Safe to share across tasks on one loop.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        # The lock keeps waiters FIFO so a burst can't starve earlier callers
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+    async def pause(self, seconds: float):
+        """Drain the bucket so nobody calls again for `seconds` (e.g. after a 429)"""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+# Refill from Redis' clock, take `want` tokens if there are enough,
+# otherwise return how long to wait before trying again
+_ACQUIRE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, capacity, want = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= want then
+    tokens = tokens - want
+else
+    wait = (want - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(wait)
+"""
+
+_PAUSE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, capacity, seconds = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+tokens = math.min(tokens, 0) - seconds * rate
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket kept in Redis, shared by every process using the same key.
+
+    RQ runs each job in its own process, so an in-process bucket would
+    give every job the full rate. Falls back to a local TokenBucket
+    while Redis is unreachable.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float, redis_url: Optional[str] = None):
+        self.key = f"ratelimit:{hashlib.sha256(key.encode()).hexdigest()[:24]}"
+        self.rate = rate
+        self.capacity = capacity
+        self.redis = aioredis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        # Idle buckets refill completely within this long, so the key can go
+        self._ttl = int(capacity / rate) + 60
+        self._lock = asyncio.Lock()
+        self._fallback = TokenBucket(rate, capacity)
+
+    async def acquire(self, tokens: float = 1.0):
+        # The lock keeps this process' waiters FIFO
+        async with self._lock:
+            while True:
+                try:
+                    wait = float(await self.redis.eval(
+                        _ACQUIRE, 1, self.key, self.rate, self.capacity, tokens, self._ttl
+                    ))
+                except redis.RedisError:
+                    await self._fallback.acquire(tokens)
+                    return
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def pause(self, seconds: float):
+        """Drain the bucket so no process calls again for `seconds` (e.g. after a 429)"""
+        try:
+            await self.redis.eval(_PAUSE, 1, self.key, self.rate, self.capacity, seconds, self._ttl)
+        except redis.RedisError:
+            await self._fallback.pause(seconds)
+
+
+# Buckets per event loop: asyncio locks and Redis connections are bound to
+# the loop that created them, and worker threads run short-lived loops
+_buckets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, RedisTokenBucket]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def shared_bucket(key: str, rate: float, capacity: float) -> RedisTokenBucket:
+    """Return the bucket for `key`, shared with every process on the same Redis"""
+    buckets = _buckets.setdefault(asyncio.get_running_loop(), {})
+    bucket = buckets.get(key)
+    if bucket is None:
+        bucket = RedisTokenBucket(key, rate, capacity)
+        buckets[key] = bucket
+    return bucket
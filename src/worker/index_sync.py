@@ -0,0 +1,65 @@
+"""
+Background Notion index sync
+
+The first sync of the local Notion index walks the whole workspace,
+which is far too slow for a job's request path. Workers keep the index
+current with a self-rescheduling RQ job instead; skills only query it.
+Incremental syncs never see deletions, so every NOTION_INDEX_FULL_SYNC_SECONDS
+one run re-walks the workspace and drops pages that are gone or unshared.
+"""
+
+import os
+import time
+import asyncio
+from datetime import timedelta
+
+import redis
+from rq import Queue
+
+from src.tools.notion_client import NotionClient
+from src.tools.notion_index import NotionSearchIndex
+
+
+JOB_QUEUE = "agent-jobs"
+SYNC_FUNCTION = "src.worker.index_sync.sync_notion_index"
+NOTION_SYNC_INTERVAL = int(os.getenv("NOTION_INDEX_SYNC_SECONDS", "300"))
+NOTION_FULL_SYNC_INTERVAL = int(os.getenv("NOTION_INDEX_FULL_SYNC_SECONDS", "86400"))
+# Held for most of an interval so parallel schedule chains collapse into one
+CHAIN_KEY = "worker:notion-index-sync"
+
+
+def schedule_notion_sync(redis_conn: redis.Redis, delay: int = 0):
+    """Queue the next index sync (run.py calls this once at worker start)"""
+    queue = Queue(JOB_QUEUE, connection=redis_conn)
+    if delay:
+        queue.enqueue_in(timedelta(seconds=delay), SYNC_FUNCTION, job_timeout="30m")
+    else:
+        queue.enqueue(SYNC_FUNCTION, job_timeout="30m")
+
+
+def sync_notion_index():
+    """RQ job: sync the index, then schedule the next run"""
+    redis_conn = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    # Every worker schedules a chain at start; only one of them survives
+    if not redis_conn.set(CHAIN_KEY, os.getpid(), nx=True, ex=max(int(NOTION_SYNC_INTERVAL * 0.9), 1)):
+        return {"status": "skipped"}
+
+    try:
+        stats = asyncio.run(_sync())
+    finally:
+        schedule_notion_sync(redis_conn, delay=NOTION_SYNC_INTERVAL)
+    print(
+        f"Notion index {'full ' if stats['full'] else ''}sync: {stats['pages_indexed']} pages indexed, "
+        f"{stats['failed']} failed in {stats['seconds']:.1f}s"
+    )
+    return stats
+
+
+async def _sync():
+    notion = NotionClient()
+    try:
+        index = NotionSearchIndex(notion)
+        full = time.time() - index.last_full_sync() >= NOTION_FULL_SYNC_INTERVAL
+        return {**await index.sync(force=True, full=full), "full": full}
+    finally:
+        await notion.close()
@@ -0,0 +1,270 @@
+"""
+Speculative context prefetch
+
+Routing is one LLM round trip, and most jobs with a repo and issue go on
+to fetch the issue, recent PRs and related docs. The Prefetcher starts
+those fetches when the job starts, so they overlap with routing. Skills
+then take the results instead of fetching again. Once the route is
+known, fetches that no chosen skill consumes are cancelled.
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import redis
+
+from src.interfaces import TaskContext
+from src.tools.knowledge_client import search_args
+
+
+# TaskContext.metadata key skills look the job's prefetcher up under
+PREFETCH_KEY = "prefetch"
+
+# Aggregate counters across jobs (RQ forks a process per job)
+STATS_KEY = "worker:prefetch:stats"
+
+# Prefetch name -> skill that consumes it
+CONSUMERS = {
+    "issue": "github_context",
+    "related_files": "github_context",
+    "recent_prs": "github_context",
+    "knowledge": "knowledge_search",
+    "notion_search": "notion_read",
+}
+
+
+def _in_thread(factory: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    """
+    Run a client coroutine on a worker thread with its own loop.
+
+    GitHubClient wraps the blocking PyGithub API in coroutines; on the
+    job's loop it would stall routing instead of overlapping with it.
+    """
+    return asyncio.to_thread(lambda: asyncio.run(factory()))
+
+
+class _Prefetch:
+    # `key` may be a future when it depends on another prefetch's result
+    def __init__(self, name: str, key: Any, task: asyncio.Task):
+        self.name = name
+        self.key = key
+        self.task = task
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.consumed = False
+        task.add_done_callback(lambda _: setattr(self, "finished", time.monotonic()))
+
+
+class Prefetcher:
+    """
+    Per-job speculative fetches.
+
+    Args:
+        skills: Names of the registered skills; prefetches nobody could
+            consume aren't started
+        github: GitHubClient (issue, recent PRs, related code)
+        knowledge: KnowledgeClient (indexed code, docs and tickets)
+        notion: NotionClient (workspace search)
+        notion_index: NotionSearchIndex notion_read searches before
+            falling back to Notion search
+    """
+
+    def __init__(
+        self,
+        skills: Iterable[str],
+        github=None,
+        knowledge=None,
+        notion=None,
+        notion_index=None,
+        redis_url: Optional[str] = None
+    ):
+        self.skills = set(skills)
+        self.github = github
+        self.knowledge = knowledge
+        self.notion = notion
+        self.notion_index = notion_index
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self._prefetches: Dict[str, _Prefetch] = {}
+        self.counts = {"started": 0, "hits": 0, "misses": 0, "wasted": 0, "cancelled": 0, "failed": 0}
+        self.saved_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Speculation
+    # ------------------------------------------------------------------
+
+    def _start(self, name: str, key: Any, coro: Awaitable[Any]):
+        if CONSUMERS[name] not in self.skills:
+            coro.close()
+            return
+        self._prefetches[name] = _Prefetch(name, key, asyncio.ensure_future(coro))
+        self.counts["started"] += 1
+
+    def start(self, context: TaskContext):
+        """Kick off the fetches this job is likely to need"""
+        try:
+            self._start_all(context)
+        except Exception as e:
+            # Speculation must never fail the job
+            print(f"Prefetch not started: {e}")
+
+    def _start_all(self, context: TaskContext):
+        if self.github and context.repo:
+            if context.issue:
+                issue_key = (context.repo, int(context.issue))
+                self._start("issue", issue_key, _in_thread(lambda: self.github.get_issue(*issue_key)))
+                if "issue" in self._prefetches:
+                    self._start("related_files", issue_key, self._related_files(context.repo))
+            self._start("recent_prs", context.repo, _in_thread(lambda: self.github.list_prs(context.repo, limit=5)))
+
+        has_query = context.outputs.get("knowledge_query") or context.request
+        if self.knowledge and self.knowledge.available and has_query:
+            if "issue" in self._prefetches:
+                # The skill folds in the issue title, so the key waits for the issue
+                key = asyncio.get_running_loop().create_future()
+                self._start("knowledge", key, self._knowledge(context, key))
+            else:
+                args = search_args(context.outputs, context.request)
+                self._start("knowledge", args, self._search_knowledge(args))
+
+        if self.notion and context.request and self._notion_index_misses(context.request):
+            self._start("notion_search", context.request, self.notion.search(context.request, limit=5))
+
+    async def _knowledge(self, context: TaskContext, key: asyncio.Future):
+        issue_task = self._prefetches["issue"].task
+        issue = None
+        try:
+            issue = await asyncio.shield(issue_task)
+        except asyncio.CancelledError:
+            # Cancelled by keep() (github_context wasn't routed): search without it
+            if not issue_task.cancelled():
+                raise
+        except Exception:
+            pass
+        args = search_args(context.outputs, context.request, issue)
+        key.set_result(args)
+        return await self._search_knowledge(args)
+
+    async def _search_knowledge(self, args):
+        query, k, collections = args
+        return await self.knowledge.search(query, k=k, collections=collections)
+
+    def _notion_index_misses(self, query: str) -> bool:
+        """notion_read only calls Notion search when its local index has no match"""
+        if self.notion_index is None:
+            return True
+        try:
+            return not self.notion_index.has_synced() or not self.notion_index.query(query, k=1)
+        except Exception:
+            return True
+
+    async def _related_files(self, repo: str):
+        issue = await asyncio.shield(self._prefetches["issue"].task)
+        if not issue.get("title"):
+            return []
+        return await _in_thread(lambda: self.github.search_code(issue["title"], repo=repo))
+
+    def keep(self, skills: Iterable[str]):
+        """Routing decided: drop what none of the chosen skills consume"""
+        chosen = set(skills)
+        for prefetch in self._prefetches.values():
+            if CONSUMERS[prefetch.name] not in chosen:
+                self._cancel(prefetch)
+
+    def _cancel(self, prefetch: _Prefetch):
+        if prefetch.consumed or prefetch.task.cancelled():
+            return
+        if prefetch.task.done():
+            self.counts["failed" if prefetch.task.exception() else "wasted"] += 1
+        else:
+            # A fetch already running on a worker thread finishes there, unused
+            prefetch.task.cancel()
+            self.counts["cancelled"] += 1
+        prefetch.consumed = True
+
+    # ------------------------------------------------------------------
+    # Consumption
+    # ------------------------------------------------------------------
+
+    async def take(self, name: str, fetch: Callable[[], Awaitable[Any]], key: Any = None) -> Any:
+        """
+        The prefetched result for `name`, else `fetch()`.
+
+        `key` must match what the prefetch was started with (issue,
+        query, ...); a mismatch means the skill wants something else.
+        """
+        prefetch = self._prefetches.get(name)
+        if prefetch is None or prefetch.consumed or prefetch.task.cancelled():
+            self.counts["misses"] += 1
+            return await fetch()
+
+        expected = prefetch.key
+        if isinstance(expected, asyncio.Future):
+            if key is not None and not prefetch.task.done():
+                # Set as soon as the prefetch knows what it is fetching
+                await asyncio.wait([expected, prefetch.task], return_when=asyncio.FIRST_COMPLETED)
+            expected = expected.result() if expected.done() else None
+        if key is not None and key != expected:
+            self.counts["misses"] += 1
+            return await fetch()
+
+        prefetch.consumed = True
+        asked = time.monotonic()
+        try:
+            result = await prefetch.task
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Speculation failed; the skill's own fetch decides the outcome
+            self.counts["failed"] += 1
+            return await fetch()
+
+        self.counts["hits"] += 1
+        # Fetch time that ran while routing and earlier skills did
+        overlapped_until = min(prefetch.finished, asked) if prefetch.finished else asked
+        self.saved_ms += (overlapped_until - prefetch.started) * 1000
+        return result
+
+    async def close(self) -> Dict[str, Any]:
+        """Cancel leftovers, record metrics; returns this job's summary"""
+        for prefetch in self._prefetches.values():
+            self._cancel(prefetch)
+        pending = [p.task for p in self._prefetches.values() if not p.task.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        summary = self.summary()
+        try:
+            pipe = redis.from_url(self.redis_url).pipeline()
+            for counter, value in self.counts.items():
+                if value:
+                    pipe.hincrby(STATS_KEY, counter, value)
+            pipe.hincrbyfloat(STATS_KEY, "saved_ms", round(self.saved_ms, 1))
+            pipe.execute()
+        except redis.RedisError:
+            pass
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        return {**self.counts, "saved_ms": round(self.saved_ms, 1)}
+
+
+def prefetch_stats(redis_url: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregate hit/waste metrics across jobs"""
+    raw = redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")).hgetall(STATS_KEY)
+    stats = {k.decode(): float(v) for k, v in raw.items()}
+    started = stats.get("started", 0)
+    return {
+        **stats,
+        "hit_rate": stats.get("hits", 0) / started if started else 0.0,
+        "waste_rate": (stats.get("wasted", 0) + stats.get("cancelled", 0)) / started if started else 0.0,
+    }
+
+
+async def prefetched(context: TaskContext, name: str, fetch: Callable[[], Awaitable[Any]], key: Any = None) -> Any:
+    """Take `name` from the job's prefetcher if it has one, else fetch"""
+    prefetcher = (context.metadata or {}).get(PREFETCH_KEY)
+    if prefetcher is None:
+        return await fetch()
+    return await prefetcher.take(name, fetch, key)
@@ -2,13 +2,22 @@
 Job processor - executes agent tasks asynchronously
 """
 
+import os
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+import redis
+
 from src.interfaces import TaskContext, SkillRegistry, ExecutorRegistry
 from src.skills.github_context import GitHubContextSkill
 from src.skills.netlify_deploy import NetlifyDeploySkill
+from src.skills.knowledge_search import KnowledgeSearchSkill
+from src.skills.notion_read import NotionReadSkill
 from src.openhands.executor import OpenHandsExecutor
 from src.worker.router import Router
+from src.worker.prefetch import Prefetcher, PREFETCH_KEY
+from src.openhands.supervisor import submit_run
+from src.tools.firebase_batch import flush_all as flush_buffered_writes
 
 
 # Initialize registries
@@ -18,13 +27,32 @@ executor_registry = ExecutorRegistry()
 # Register skills
 skill_registry.register(GitHubContextSkill())
 skill_registry.register(NetlifyDeploySkill())
+skill_registry.register(KnowledgeSearchSkill())
+skill_registry.register(NotionReadSkill())
 # TODO: Add more skills as needed
 
+# Skill name the router uses for sandboxed code changes
+EXECUTOR_SKILL = "openhands_pr"
+
 # Register executors
 executor_registry.register(OpenHandsExecutor(), is_default=True)
 # TODO: Add ClaudeCodeExecutor, CodexExecutor later
 
 
+def _prefetcher() -> Prefetcher:
+    """Prefetcher sharing the registered skills' clients (and their caches)"""
+    def client(skill_name: str, attribute: str):
+        return getattr(skill_registry.get(skill_name), attribute, None)
+    
+    return Prefetcher(
+        skill_registry.list_all(),
+        github=client("github_context", "github"),
+        knowledge=client("knowledge_search", "knowledge"),
+        notion=client("notion_read", "notion"),
+        notion_index=client("notion_read", "index")
+    )
+
+
 def process_job(context_dict: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process a job synchronously (called by RQ worker).
@@ -36,7 +64,11 @@ def process_job(context_dict: Dict[str, Any]) -> Dict[str, Any]:
     
     # Run async processing
     loop = asyncio.get_event_loop()
-    result = loop.run_until_complete(_process_job_async(context))
+    try:
+        result = loop.run_until_complete(_process_job_async(context))
+    finally:
+        # The work-horse exits without running atexit hooks
+        flush_buffered_writes()
     
     return result
 
@@ -45,63 +77,58 @@ async def _process_job_async(context: TaskContext) -> Dict[str, Any]:
     """
     Async job processing logic.
     
-    1. Route to persona + skills
-    2. Execute skills in sequence
-    3. Return results
+    1. Start speculative context prefetches
+    2. Route to persona + skills (prefetches run meanwhile)
+    3. Execute skills in sequence
+    4. Return results
     """
     logs = []
+    prefetcher = _prefetcher()
     
     try:
         logs.append(f"Processing job {context.task_id}")
         logs.append(f"Request: {context.request}")
         
-        # Step 1: Route to persona + skills
+        # Step 1: Prefetch likely context while routing is in flight
+        prefetcher.start(context)
+        context.metadata[PREFETCH_KEY] = prefetcher
+        
+        # Step 2: Route to persona + skills
         router = Router()
         routing = await router.route(context)
         
         context.persona = routing["persona"]
         context.skills = routing["skills"]
         context.executor = routing.get("executor", "openhands")
+        prefetcher.keep(context.skills)
         
         logs.append(f"✓ Routed to persona: {context.persona}")
         logs.append(f"✓ Skills: {', '.join(context.skills)}")
         
-        # Step 2: Execute skills in sequence
-        for skill_name in context.skills:
-            logs.append(f"\n→ Executing skill: {skill_name}")
-            
-            skill = skill_registry.get(skill_name)
-            if not skill:
-                logs.append(f"✗ Skill '{skill_name}' not found")
-                continue
-            
-            result = await skill.run(context)
-            
-            # Add skill logs
-            logs.extend([f"  {log}" for log in result.logs])
-            
-            # Update context with outputs
-            context.outputs.update(result.outputs)
-            context.artifacts.update(result.artifacts)
-            
-            if result.status.value != "success":
-                logs.append(f"✗ Skill failed: {result.error}")
-                break
+        # Step 3: Execute skills in sequence (executor runs go to the supervisor)
+        executor_run = await _run_skills(context, context.skills, logs)
         
-        # Step 3: Return final result
-        logs.append(f"\n✓ Job completed successfully")
+        # Step 4: Return final result
+        prefetch = await _close_prefetch(context, prefetcher, logs)
+        if executor_run:
+            logs.append(f"\n✓ Job handed off; remaining skills resume when run {executor_run} finishes")
+        else:
+            logs.append(f"\n✓ Job completed successfully")
         
         return {
-            "status": "completed",
+            "status": "awaiting_executor" if executor_run else "completed",
+            "executor_run": executor_run,
             "task_id": context.task_id,
             "persona": context.persona,
             "skills_executed": context.skills,
             "outputs": context.outputs,
             "artifacts": context.artifacts,
+            "prefetch": prefetch,
             "logs": logs
         }
         
     except Exception as e:
+        await _close_prefetch(context, prefetcher, logs)
         logs.append(f"\n✗ Job failed with error: {str(e)}")
         
         return {
@@ -110,3 +137,130 @@ async def _process_job_async(context: TaskContext) -> Dict[str, Any]:
             "error": str(e),
             "logs": logs
         }
+
+
+async def _run_skills(context: TaskContext, skills: List[str], logs: List[str]) -> Optional[str]:
+    """
+    Execute skills in sequence.
+    
+    Returns:
+        Supervisor request id if an executor skill handed the job off
+    """
+    for i, skill_name in enumerate(skills):
+        logs.append(f"\n→ Executing skill: {skill_name}")
+        
+        if skill_name == EXECUTOR_SKILL:
+            # A sandbox run can take 30 minutes; don't hold this worker for it
+            request_id = _hand_off(context, skills[i + 1:])
+            logs.append(f"  Executor run queued with the supervisor ({request_id})")
+            return request_id
+        
+        skill = skill_registry.get(skill_name)
+        if not skill:
+            logs.append(f"✗ Skill '{skill_name}' not found")
+            continue
+        
+        result = await skill.run(context)
+        
+        # Add skill logs
+        logs.extend([f"  {log}" for log in result.logs])
+        
+        # Update context with outputs
+        context.outputs.update(result.outputs)
+        context.artifacts.update(result.artifacts)
+        
+        if result.status.value != "success":
+            logs.append(f"✗ Skill failed: {result.error}")
+            break
+    
+    return None
+
+
+def _hand_off(context: TaskContext, remaining: List[str]) -> str:
+    """Submit the executor run; the supervisor resumes `remaining` afterwards"""
+    repo = context.repo or ""
+    if repo and "/" not in repo:
+        repo = f"{os.getenv('GITHUB_ORG', 'drafted')}/{repo}"
+    
+    state = dict(context.__dict__)
+    state["metadata"] = {k: v for k, v in context.metadata.items() if k != PREFETCH_KEY}
+    
+    return submit_run(
+        redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379")),
+        job_id=context.task_id,
+        executor=context.executor or executor_registry.get().name,
+        task={
+            "repo": repo,
+            "instruction": context.request,
+            "constraints": context.constraints,
+            # No branch_base: the executor uses the repo's default branch
+        },
+        resume={"context": state, "skills": remaining}
+    )
+
+
+def resume_job(resume: Dict[str, Any], run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Continue a job after its executor run (queued by the supervisor).
+    
+    The run's artifacts become outputs for the remaining skills.
+    """
+    context = TaskContext(**resume["context"])
+    artifacts = run.get("artifacts") or {}
+    context.artifacts["executor_run"] = run
+    context.outputs.update({k: v for k, v in artifacts.items() if v})
+    
+    loop = asyncio.get_event_loop()
+    try:
+        return loop.run_until_complete(_resume_job_async(context, resume["skills"], run))
+    finally:
+        flush_buffered_writes()
+
+
+async def _resume_job_async(context: TaskContext, skills: List[str], run: Dict[str, Any]) -> Dict[str, Any]:
+    logs = [f"Resuming job {context.task_id} after executor run {run['request_id']} ({run['status']})"]
+    
+    if run["status"] != "completed":
+        logs.append(f"✗ Executor run {run['status']}: {run.get('error', 'see run logs')}")
+        return {
+            "status": "failed",
+            "task_id": context.task_id,
+            "error": run.get("error") or f"Executor run {run['status']}",
+            "artifacts": context.artifacts,
+            "logs": logs
+        }
+    
+    try:
+        executor_run = await _run_skills(context, skills, logs)
+        logs.append(f"\n✓ Job completed successfully" if not executor_run else f"\n✓ Job handed off again ({executor_run})")
+        return {
+            "status": "awaiting_executor" if executor_run else "completed",
+            "executor_run": executor_run,
+            "task_id": context.task_id,
+            "persona": context.persona,
+            "skills_executed": context.skills,
+            "outputs": context.outputs,
+            "artifacts": context.artifacts,
+            "logs": logs
+        }
+    except Exception as e:
+        logs.append(f"\n✗ Job failed with error: {str(e)}")
+        return {
+            "status": "failed",
+            "task_id": context.task_id,
+            "error": str(e),
+            "logs": logs
+        }
+
+
+async def _close_prefetch(context: TaskContext, prefetcher: Prefetcher, logs: list) -> Dict[str, Any]:
+    """Drop unused prefetches and log this job's hit/waste counts"""
+    context.metadata.pop(PREFETCH_KEY, None)
+    summary = await prefetcher.close()
+    if summary["started"]:
+        logs.append(
+            f"Prefetch: {summary['hits']}/{summary['started']} used, "
+            f"{summary['wasted'] + summary['cancelled']} dropped, {summary['failed']} failed, "
+            f"~{summary['saved_ms']:.0f}ms overlapped"
+        )
+    return summary
@@ -3,6 +3,7 @@ Router - determines persona + skills for a task using LLM
 """
 
 import os
+import asyncio
 from typing import Dict, Any
 from anthropic import Anthropic
 from src.interfaces import TaskContext
@@ -35,8 +36,9 @@ class Router:
         # Build routing prompt
         prompt = self._build_routing_prompt(context)
         
-        # Call Claude for routing decision
-        message = self.client.messages.create(
+        # Call Claude for routing decision (off the loop, so prefetches run meanwhile)
+        message = await asyncio.to_thread(
+            self.client.messages.create,
             model=self.model,
             max_tokens=1024,
             messages=[{
@@ -73,6 +75,7 @@ Available personas:
 - communicator: Summaries, PR descriptions
 
 Available skills:
+- knowledge_search: Search indexed code, docs and tickets (fast, local; prefer it for context)
 - github_context: Fetch issue/PR/file context
 - netlify_deploy: Get deploy preview URL
 - openhands_pr: Execute code changes (uses OpenHands)
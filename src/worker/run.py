@@ -6,6 +6,8 @@ import os
 import redis
 from rq import Worker, Queue
 
+from src.worker.index_sync import schedule_notion_sync
+
 
 def main():
     """Start RQ worker"""
@@ -15,6 +17,8 @@ def main():
     worker = Worker(["agent-jobs"], connection=redis_conn)
     print(f"🚀 Worker started, listening on queue: agent-jobs")
     print(f"   Redis: {redis_url}")
+    if os.getenv("NOTION_TOKEN"):
+        schedule_notion_sync(redis_conn)
     worker.work(with_scheduler=True)
 
 